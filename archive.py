@@ -0,0 +1,68 @@
+"""
+Eski hareketlerin arşivlenmesi. Ufuktan (HAREKET_ARSIV_GUN) eski hareketler
+parça parça ekipman_hareket_arsiv tablosuna taşınır; canlı tablo ve
+indeksleri küçük kalır. Arşiv aynı kolonlara ve indekslere sahiptir,
+/api/hareket?arsiv=1 ile listelenir.
+
+Bir ekipmanın güncel zimmetinin kaynağı olan hareket ne kadar eski olursa
+olsun taşınmaz: zimmet projeksiyonu canlı geçmişten yeniden kurulabilir
+kalır. Aylık özet (rollups) taşımadan etkilenmez. Her parça olay günlüğüne
+bir 'arsivlendi' olayı yazar: listeler ve ETag'ler taşımayı görür.
+"""
+from datetime import datetime, timedelta
+
+from models import db, Ekipman, EkipmanHareket, EkipmanHareketArsiv, EkipmanZimmet
+import events
+
+_hareket = EkipmanHareket.__table__
+_arsiv = EkipmanHareketArsiv.__table__
+_zimmet = EkipmanZimmet.__table__
+
+VARSAYILAN_PARCA = 5000
+# Arşive olduğu gibi kopyalanan kolonlar (kategori ayrıca, eski satırlar için yedekli)
+KOLONLAR = [c.name for c in _hareket.columns if c.name != 'kategori']
+
+
+def arsivlenecekler(ufuk, limit):
+    """Ufuktan eski, zimmet kaynağı olmayan en eski `limit` hareketin id'leri"""
+    zimmet_kaynagi = db.select(_zimmet.c.ekipman_id).where(
+        _zimmet.c.ekipman_id == _hareket.c.ekipman_id,
+        _zimmet.c.hareket_id == _hareket.c.id,
+    ).exists()
+    return db.select(_hareket.c.id).where(_hareket.c.tarih < ufuk, ~zimmet_kaynagi) \
+        .order_by(_hareket.c.tarih, _hareket.c.id).limit(limit)
+
+
+def _parca_tasi(connection, idler, simdi):
+    kaynak = db.select(
+        *[_hareket.c[k] for k in KOLONLAR],
+        db.func.coalesce(_hareket.c.kategori, Ekipman.kategori), db.literal(simdi)
+    ).select_from(
+        _hareket.outerjoin(Ekipman.__table__, Ekipman.id == _hareket.c.ekipman_id)
+    ).where(_hareket.c.id.in_(idler))
+    connection.execute(_arsiv.insert().from_select(KOLONLAR + ['kategori', 'arsiv_tarihi'], kaynak))
+    # Core DELETE: mapper olayları çalışmaz, özet ve zimmet değişmez
+    connection.execute(_hareket.delete().where(_hareket.c.id.in_(idler)))
+    events.olaylari_yaz(connection, [
+        {'varlik': 'hareket', 'id': None, 'islem': 'arsivlendi', 'alanlar': {'adet': len(idler)}}
+    ])
+
+
+def hareketleri_arsivle(gun, parca=VARSAYILAN_PARCA, cikti=None):
+    """
+    `gun` günden eski hareketleri arşive taşı. Her parça ayrı transaction'dır:
+    yazma kilidi kısa tutulur, yarıda kesilen arşivleme kaldığı yerden sürer.
+    Taşınan hareket sayısını döner.
+    """
+    ufuk = datetime.utcnow() - timedelta(days=gun)
+    toplam = 0
+    while True:
+        with db.engine.begin() as connection:
+            idler = connection.execute(arsivlenecekler(ufuk, parca)).scalars().all()
+            if not idler:
+                return toplam
+            _parca_tasi(connection, idler, datetime.utcnow())
+        events.olaylar_yazildi()
+        toplam += len(idler)
+        if cikti:
+            cikti(f'  {toplam} hareket arşivlendi...')
@@ -0,0 +1,419 @@
+"""
+API yük ve gecikme benchmark'ı. Sentetik veritabanında (benchmarks/seed.py)
+app.py'deki listeleme, arama, istatistik, detay, hareket ekleme ve dışa
+aktarma uçları iki aşamada ölçülür:
+
+1. istemci: Flask test istemcisiyle her senaryo sırayla çağrılır; gecikme,
+   istek başına SQL sorgu sayısı ve senaryo süresince tepe RSS.
+2. yuk: uygulama ayrı süreçte thread'li HTTP sunucusunda çalışır (veya
+   --hedef ile çalışan bir sunucu kullanılır); eşzamanlı istemciler ağırlıklı
+   karışık trafik üretir. Senaryo başına gecikme, toplam işlem/sn ve
+   sunucunun tepe RSS'i.
+
+Sonuç JSON olarak basılır. --temel ile önceki bir sonucun p95 değerleriyle
+karşılaştırılır; --esik oranını aşan gerileme varsa çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmarks/api.py --boyut 10k
+    python benchmarks/api.py --db /tmp/stok_100k.db --cikti yeni.json --temel eski.json
+    python benchmarks/api.py --db /tmp/stok_100k.db --hedef http://127.0.0.1:8000
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import quote, urlsplit
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from measure import gecikme_ozeti, tepe_rss_mb, tepe_rss_sifirla
+import seed
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+
+DURUMLAR = ('Depoda', 'Kullanımda', 'Arızalı')
+# Yazma senaryosunun kullandığı ekipmanlar (en yüksek id'ler); yük aşamasında
+# her istemci thread'ine ayrı bir dilim verilir
+YAZMA_HAVUZU = 5000
+
+Senaryo = namedtuple('Senaryo', 'ad istek agirlik export')
+
+
+class Havuz:
+    """Yazma senaryosu için ekipman durumları; geçerli hareket tipini seçer"""
+
+    SONRAKI = {'Depoda': 'Çıkış', 'Kullanımda': 'İade', 'Arızalı': 'Giriş'}
+
+    def __init__(self, durumlar):
+        self.durumlar = dict(durumlar)
+        self.idler = list(self.durumlar)
+
+    def sec(self, rng):
+        id = rng.choice(self.idler)
+        return id, self.SONRAKI[self.durumlar[id]]
+
+    def uygula(self, id, tip):
+        self.durumlar[id] = {'Çıkış': 'Kullanımda', 'İade': 'Depoda', 'Giriş': 'Depoda'}[tip]
+
+
+class Baglam:
+    """Senaryoların kullandığı örnek değerler (veritabanından bir kez okunur)"""
+
+    def __init__(self, app, istemci):
+        from models import db, Ekipman, EkipmanZimmet, Kategori
+        with app.app_context():
+            self.en_buyuk_id = db.session.query(db.func.max(Ekipman.id)).scalar() or 0
+            self.kategoriler = [k.ad for k in Kategori.query.order_by(Kategori.id)]
+            self.birimler = [b for b, in db.session.query(EkipmanZimmet.birim).distinct().limit(20) if b]
+            self.markalar = [m for m, in db.session.query(Ekipman.marka).distinct().limit(20) if m]
+            havuz = db.session.query(Ekipman.id, Ekipman.durum) \
+                .filter(Ekipman.durum.in_(DURUMLAR)) \
+                .order_by(Ekipman.id.desc()).limit(YAZMA_HAVUZU).all()
+        self.havuz = dict(havuz)
+        self.imlec = istemci.get('/api/ekipman?limit=100').headers.get('X-Next-Cursor', '')
+
+    def havuzlar(self, adet):
+        """Yazma havuzunu çakışmayan `adet` parçaya böl"""
+        idler = sorted(self.havuz)
+        return [Havuz({id: self.havuz[id] for id in idler[i::adet]}) for i in range(adet)]
+
+    def rastgele_id(self, rng):
+        return rng.randint(1, max(1, self.en_buyuk_id))
+
+
+def senaryolar(b):
+    """(ad, istek(rng, havuz) -> (yöntem, yol, gövde), yük ağırlığı, dışa aktarma mı)"""
+    def get(yol):
+        return lambda rng, havuz: ('GET', yol(rng), None)
+
+    def hareket_ekle(rng, havuz):
+        id, tip = havuz.sec(rng)
+        return 'POST', '/api/hareket', {
+            'ekipman_id': id, 'hareket_tipi': tip, 'kullanici_adi': 'Benchmark Kullanıcı',
+            'kullanici_personel_no': 'P00000', 'birim': 'Bilgi İşlem',
+        }
+
+    kategori = lambda rng: quote(rng.choice(b.kategoriler))
+    return [
+        Senaryo('kategoriler', get(lambda rng: '/api/kategoriler'), 1, False),
+        Senaryo('ekipman_liste', get(lambda rng: '/api/ekipman?limit=100'), 5, False),
+        Senaryo('ekipman_liste_filtre', get(
+            lambda rng: f'/api/ekipman?kategori={kategori(rng)}&durum={quote(rng.choice(DURUMLAR))}&limit=100'
+        ), 3, False),
+        Senaryo('ekipman_liste_sayfa2', get(lambda rng: f'/api/ekipman?limit=100&cursor={b.imlec}'), 1, False),
+        Senaryo('ekipman_arama', get(
+            lambda rng: f'/api/ekipman?arama={quote(rng.choice(b.markalar or ["Dell"]))}&limit=100'
+        ), 2, False),
+        Senaryo('ekipman_ara_barkod', get(
+            lambda rng: f'/api/ekipman/ara?q=BK{b.rastgele_id(rng):08d}'
+        ), 2, False),
+        Senaryo('istatistikler', get(lambda rng: '/api/istatistikler'), 3, False),
+        Senaryo('ekipman_detay', get(
+            lambda rng: f'/api/ekipman/{b.rastgele_id(rng)}?include=hareketler'
+        ), 3, False),
+        Senaryo('hareket_liste', get(lambda rng: '/api/hareket?limit=50'), 2, False),
+        Senaryo('hareket_ekipman', get(
+            lambda rng: f'/api/hareket?ekipman_id={b.rastgele_id(rng)}&limit=50'
+        ), 1, False),
+        Senaryo('zimmet_birim', get(
+            lambda rng: f'/api/zimmet?birim={quote(rng.choice(b.birimler or ["Bilgi İşlem"]))}&limit=100'
+        ), 1, False),
+        Senaryo('hareket_ekle', hareket_ekle, 3, False),
+        Senaryo('export_excel', get(lambda rng: '/api/export/excel'), 0, True),
+        Senaryo('export_pdf_kategori', get(lambda rng: f'/api/export/pdf?kategori={kategori(rng)}'), 0, True),
+    ]
+
+
+# --- İstek taşıyıcıları: (yöntem, yol, gövde) -> (durum kodu, gövde baytları) ---
+
+class TestIstemcisi:
+    def __init__(self, app):
+        self.istemci = app.test_client()
+
+    def __call__(self, yontem, yol, govde=None):
+        yanit = self.istemci.open(yol, method=yontem, json=govde)
+        return yanit.status_code, yanit.get_data()
+
+
+class HttpIstemcisi:
+    def __init__(self, taban):
+        parca = urlsplit(taban)
+        self.host, self.port = parca.hostname, parca.port or 80
+
+    def __call__(self, yontem, yol, govde=None):
+        baglanti = http.client.HTTPConnection(self.host, self.port, timeout=300)
+        try:
+            basliklar = {}
+            veri = None
+            if govde is not None:
+                veri = json.dumps(govde).encode()
+                basliklar['Content-Type'] = 'application/json'
+            baglanti.request(yontem, yol, body=veri, headers=basliklar)
+            yanit = baglanti.getresponse()
+            return yanit.status, yanit.read()
+        finally:
+            baglanti.close()
+
+
+def calistir(istek, senaryo, rng, havuz):
+    """Senaryoyu bir kez çalıştır. Arka plan dışa aktarma işi bitene kadar beklenir"""
+    yontem, yol, govde = senaryo.istek(rng, havuz)
+    durum, icerik = istek(yontem, yol, govde)
+    if senaryo.export and durum == 202:
+        is_durumu = json.loads(icerik)
+        while durum == 202:
+            time.sleep(0.2)
+            durum, icerik = istek('GET', is_durumu['durum_url'])
+            is_durumu = json.loads(icerik)
+        if durum == 200 and 'indir_url' in is_durumu:
+            durum, icerik = istek('GET', is_durumu['indir_url'])
+    if senaryo.ad == 'hareket_ekle' and durum == 201:
+        havuz.uygula(govde['ekipman_id'], govde['hareket_tipi'])
+    return durum
+
+
+# --- 1. aşama: test istemcisi ---
+
+def istemci_asamasi(app, baglam, args, onbellek_dizini):
+    from sqlalchemy import event
+    from models import db
+
+    sayac = [0]
+
+    def dinleyici(*_):
+        sayac[0] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', dinleyici)
+
+    istek = TestIstemcisi(app)
+    rng = random.Random(1)
+    havuz = baglam.havuzlar(1)[0]
+    rapor = {}
+    try:
+        for senaryo in senaryolar(baglam):
+            tekrar = args.export_tekrar if senaryo.export else args.tekrar
+            if tekrar <= 0:
+                continue
+            if not senaryo.export:
+                calistir(istek, senaryo, rng, havuz)  # ısınma
+            tepe_rss_sifirla()
+            sureler, sorgular, hatali = [], [], 0
+            for _ in range(tekrar):
+                if senaryo.export:
+                    # Önbellekten değil, her seferinde üretim ölçülür
+                    shutil.rmtree(onbellek_dizini, ignore_errors=True)
+                sayac[0] = 0
+                t0 = time.perf_counter()
+                durum = calistir(istek, senaryo, rng, havuz)
+                sureler.append(time.perf_counter() - t0)
+                sorgular.append(sayac[0])
+                hatali += durum >= 400
+            rapor[senaryo.ad] = {
+                **gecikme_ozeti(sureler),
+                'islem_per_sn': round(len(sureler) / sum(sureler), 1),
+                'hatali': hatali,
+                'sorgu_ort': round(sum(sorgular) / len(sorgular), 1),
+                'sorgu_maks': max(sorgular),
+                'tepe_rss_mb': tepe_rss_mb(),
+            }
+            print(f'  {senaryo.ad}: p95 {rapor[senaryo.ad]["p95_ms"]} ms, '
+                  f'{rapor[senaryo.ad]["sorgu_ort"]} sorgu', file=sys.stderr)
+    finally:
+        event.remove(engine, 'before_cursor_execute', dinleyici)
+        # Yük aşaması güncel durumlardan başlasın
+        baglam.havuz.update(havuz.durumlar)
+    return rapor
+
+
+# --- 2. aşama: eşzamanlı HTTP yükü ---
+
+class _SessizIstek(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def _sunucu(ortam, hazir, dur, sonuc):
+    """Ayrı süreç: uygulamayı thread'li HTTP sunucusunda çalıştır"""
+    os.environ.update(ortam)
+    from app import app
+    sunucu = make_server('127.0.0.1', 0, app, threaded=True, request_handler=_SessizIstek)
+    threading.Thread(target=sunucu.serve_forever, daemon=True).start()
+    tepe_rss_sifirla()
+    hazir.put(sunucu.server_port)
+    dur.wait()
+    sunucu.shutdown()
+    sonuc.put(tepe_rss_mb())
+
+
+def _yuk_istemcisi(istek, baglam, havuz, sure, tohum, sonuclar):
+    rng = random.Random(tohum)
+    karisim = [s for s in senaryolar(baglam) if s.agirlik > 0]
+    agirliklar = [s.agirlik for s in karisim]
+    bitis = time.perf_counter() + sure
+    while time.perf_counter() < bitis:
+        senaryo = rng.choices(karisim, agirliklar)[0]
+        t0 = time.perf_counter()
+        try:
+            durum = calistir(istek, senaryo, rng, havuz)
+        except (OSError, http.client.HTTPException):
+            durum = 599
+        sonuclar.append((senaryo.ad, time.perf_counter() - t0, durum))
+
+
+def yuk_asamasi(baglam, args, ortam):
+    ctx = multiprocessing.get_context('spawn')
+    surec = None
+    if args.hedef:
+        istek = HttpIstemcisi(args.hedef)
+    else:
+        hazir, dur, sonuc = ctx.Queue(), ctx.Event(), ctx.Queue()
+        surec = ctx.Process(target=_sunucu, args=(ortam, hazir, dur, sonuc))
+        surec.start()
+        istek = HttpIstemcisi(f'http://127.0.0.1:{hazir.get(timeout=120)}')
+
+    sonuclar = []
+    threadler = [
+        threading.Thread(target=_yuk_istemcisi,
+                         args=(istek, baglam, havuz, args.sure, i, sonuclar))
+        for i, havuz in enumerate(baglam.havuzlar(args.esz))
+    ]
+    baslangic = time.perf_counter()
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    gecen = time.perf_counter() - baslangic
+
+    sunucu_rss = None
+    if surec is not None:
+        dur.set()
+        sunucu_rss = sonuc.get(timeout=60)
+        surec.join()
+
+    rapor = {'senaryolar': {}}
+    for ad in dict.fromkeys(ad for ad, _, _ in sonuclar):
+        sureler = [s for a, s, _ in sonuclar if a == ad]
+        rapor['senaryolar'][ad] = {
+            **gecikme_ozeti(sureler),
+            'hatali': sum(1 for a, _, d in sonuclar if a == ad and d >= 400),
+        }
+    tum = [s for _, s, _ in sonuclar]
+    rapor['toplam'] = {
+        **gecikme_ozeti(tum),
+        'islem_per_sn': round(len(tum) / gecen, 1),
+        'hatali': sum(1 for _, _, d in sonuclar if d >= 400),
+        'sunucu_tepe_rss_mb': sunucu_rss,
+    }
+    return rapor
+
+
+# --- Karşılaştırma ---
+
+def karsilastir(rapor, temel, esik):
+    """p95 oranları ve eşiği aşan gerilemeler"""
+    oranlar, gerilemeler = {}, []
+    ciftler = [('istemci', rapor.get('istemci', {}), temel.get('istemci', {})),
+               ('yuk', rapor.get('yuk', {}).get('senaryolar', {}),
+                temel.get('yuk', {}).get('senaryolar', {}))]
+    for asama, yeni, eski in ciftler:
+        for ad, olcum in yeni.items():
+            if ad not in eski or not eski[ad].get('p95_ms') or olcum.get('p95_ms') is None:
+                continue
+            oran = round(olcum['p95_ms'] / eski[ad]['p95_ms'], 2)
+            oranlar[f'{asama}.{ad}'] = {'temel_p95_ms': eski[ad]['p95_ms'],
+                                        'p95_ms': olcum['p95_ms'], 'oran': oran}
+            # 1 ms altındaki farklar ölçüm gürültüsü sayılır
+            if oran > esik and olcum['p95_ms'] - eski[ad]['p95_ms'] > 1:
+                gerilemeler.append(f'{asama}.{ad}')
+    return {'p95': oranlar, 'esik': esik, 'gerilemeler': gerilemeler}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', help='Kullanılacak SQLite dosyası (yoksa --boyut ile tohumlanır)')
+    parser.add_argument('--boyut', type=seed.boyut_oku, default='10k',
+                        help='Tohumlanacak ekipman sayısı: 10k, 100k, 1M veya tam sayı')
+    parser.add_argument('--hareket-orani', type=int, default=10)
+    parser.add_argument('--tekrar', type=int, default=30, help='İstemci aşamasında senaryo başına istek')
+    parser.add_argument('--export-tekrar', type=int, default=2, help='Dışa aktarma senaryosu başına istek')
+    parser.add_argument('--sure', type=float, default=20, help='Yük aşaması süresi (sn); 0 atlar')
+    parser.add_argument('--esz', type=int, default=8, help='Yük aşamasında eşzamanlı istemci')
+    parser.add_argument('--hedef', help='Yük aşaması için çalışan sunucu (ör. http://127.0.0.1:8000)')
+    parser.add_argument('--ortam', action='append', default=[], metavar='ANAHTAR=DEGER',
+                        help='Uygulama ortam değişkeni (ör. SQLITE_TUNING=0); tekrarlanabilir')
+    parser.add_argument('--cikti', help='Sonuç JSON dosyası (varsayılan stdout)')
+    parser.add_argument('--temel', help='Karşılaştırılacak önceki sonuç JSON dosyası')
+    parser.add_argument('--esik', type=float, default=1.25, help='Gerileme sayılan p95 oranı')
+    args = parser.parse_args()
+
+    gecici = tempfile.mkdtemp(prefix='stok_bench_')
+    db_yolu = os.path.abspath(args.db or os.path.join(gecici, 'bench.db'))
+    ortam = dict(o.split('=', 1) for o in args.ortam)
+    ortam['DATABASE_URL'] = f'sqlite:///{db_yolu}'
+    ortam.setdefault('EXPORT_CACHE_DIR', os.path.join(gecici, 'export'))
+    os.environ.update(ortam)
+
+    try:
+        if not os.path.exists(db_yolu):
+            print(f'Tohumlanıyor: {args.boyut} ekipman -> {db_yolu}', file=sys.stderr)
+            ctx = multiprocessing.get_context('spawn')
+            # Ayrı süreç: tohumlamanın belleği ölçülen RSS'e karışmasın
+            surec = ctx.Process(target=_tohumla, args=(ortam, args.boyut, args.hareket_orani))
+            surec.start()
+            surec.join()
+            if surec.exitcode:
+                sys.exit('Tohumlama başarısız.')
+
+        from app import app
+        from models import db, Ekipman, EkipmanHareket
+        with app.app_context():
+            veri = {'ekipman': db.session.query(db.func.count(Ekipman.id)).scalar(),
+                    'hareket': db.session.query(db.func.count(EkipmanHareket.id)).scalar()}
+        baglam = Baglam(app, app.test_client())
+
+        rapor = {'parametreler': {k: v for k, v in vars(args).items() if k not in ('cikti', 'temel')},
+                 'veri': veri}
+        print('1. aşama: test istemcisi', file=sys.stderr)
+        rapor['istemci'] = istemci_asamasi(app, baglam, args, ortam['EXPORT_CACHE_DIR'])
+        if args.sure > 0:
+            print(f'2. aşama: {args.esz} eşzamanlı istemci, {args.sure} sn', file=sys.stderr)
+            rapor['yuk'] = yuk_asamasi(baglam, args, ortam)
+        if args.temel:
+            with open(args.temel) as f:
+                rapor['karsilastirma'] = karsilastir(rapor, json.load(f), args.esik)
+    finally:
+        shutil.rmtree(gecici, ignore_errors=True)
+
+    metin = json.dumps(rapor, indent=2, ensure_ascii=False)
+    if args.cikti:
+        with open(args.cikti, 'w') as f:
+            f.write(metin + '\n')
+    else:
+        print(metin)
+    if rapor.get('karsilastirma', {}).get('gerilemeler'):
+        print('Gerileme: ' + ', '.join(rapor['karsilastirma']['gerilemeler']), file=sys.stderr)
+        sys.exit(1)
+
+
+def _tohumla(ortam, adet, oran):
+    os.environ.update(ortam)
+    from app import app
+    # stdout sonuç JSON'u için ayrılmış
+    with contextlib.redirect_stdout(sys.stderr):
+        seed.tohumla(app, adet, oran)
+
+
+if __name__ == '__main__':
+    main()
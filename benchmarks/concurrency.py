@@ -0,0 +1,172 @@
+"""
+Eşzamanlılık benchmark'ı: ayrı süreçlerde (gunicorn işçileri gibi) yazıcılar
+POST /api/hareket çağırırken okuyucular dışa aktarmadaki gibi tüm ekipman
+tablosunu tarar. Aynı senaryo SQLite profili kapalı (varsayılan ayarlar) ve
+açık (WAL, pragmalar, yazma tekrarı) çalıştırılıp sonuç JSON olarak basılır.
+
+Kullanım:
+    python benchmarks/concurrency.py --sure 10 --yazici 4 --okuyucu 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from measure import yuzdelik
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+
+PROFILLER = {
+    'once': {'SQLITE_TUNING': '0', 'DB_WRITE_RETRIES': '0'},
+    'sonra': {'SQLITE_TUNING': '1'},
+}
+
+
+def _uygulama(db_yolu, profil):
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_yolu}'
+    os.environ.update(PROFILLER[profil])
+    from app import app
+    return app
+
+
+def _tohumla(db_yolu, profil, adet):
+    app = _uygulama(db_yolu, profil)
+    from models import db, Ekipman
+    import init_db
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Ekipman), [
+            {'kategori': 'Laptop', 'marka': f'Marka{i % 20}', 'model': f'M{i}',
+             'seri_no': f'SN{i:07d}', 'barkod': f'BK{i:07d}', 'durum': 'Depoda'}
+            for i in range(adet)
+        ])
+        db.session.commit()
+        # Olay günlüğü, sayaçlar, zimmet ve özet tabloları uygulamadaki gibi kurulur
+        init_db.veritabani_kur()
+
+
+def _bekle(engel, sure):
+    """Tüm süreçler import'u bitirince aynı anda başla; bitiş zamanını döndür"""
+    engel.wait()
+    return time.time() + sure
+
+
+# Ekipmanın durumuna göre geçerli hareket: Çıkış / İade döngüsü
+SONRAKI_HAREKET = {'Depoda': ('Çıkış', 'Kullanımda'), 'Kullanımda': ('İade', 'Depoda')}
+
+
+def _yazici(db_yolu, profil, engel, sure, adet, no, yazici_sayisi, kuyruk):
+    app = _uygulama(db_yolu, profil)
+    istemci = app.test_client()
+    # Her yazıcı kendi ekipman dilimini işler: durum yerelde izlenir ve
+    # geçersiz geçiş (409) kilit / sunucu hatalarıyla karışmaz
+    durumlar = {i: 'Depoda' for i in range(no + 1, adet + 1, yazici_sayisi)}
+    idler = list(durumlar)
+    bitis = _bekle(engel, sure)
+    basarili, cakisma, hatali, sureler = 0, 0, 0, []
+    while time.time() < bitis:
+        ekipman_id = random.choice(idler)
+        tip, hedef = SONRAKI_HAREKET[durumlar[ekipman_id]]
+        t0 = time.perf_counter()
+        yanit = istemci.post('/api/hareket', json={
+            'ekipman_id': ekipman_id,
+            'hareket_tipi': tip,
+            'kullanici_adi': 'benchmark',
+        })
+        sureler.append(time.perf_counter() - t0)
+        if yanit.status_code == 201:
+            basarili += 1
+            durumlar[ekipman_id] = hedef
+        elif yanit.status_code == 409:
+            cakisma += 1
+        else:
+            hatali += 1
+    kuyruk.put(('yazici', basarili, hatali, sureler, cakisma))
+
+
+def _okuyucu(db_yolu, profil, engel, sure, kuyruk):
+    app = _uygulama(db_yolu, profil)
+    import exporters
+    bitis = _bekle(engel, sure)
+    basarili, hatali, sureler = 0, 0, []
+    while time.time() < bitis:
+        t0 = time.perf_counter()
+        try:
+            with app.app_context():
+                for _ in exporters.ekipman_satirlari([]):
+                    pass
+            basarili += 1
+        except Exception:
+            hatali += 1
+        sureler.append(time.perf_counter() - t0)
+    kuyruk.put(('okuyucu', basarili, hatali, sureler))
+
+
+def calistir(profil, args):
+    ctx = multiprocessing.get_context('spawn')
+    dizin = tempfile.mkdtemp(prefix='stok_bench_')
+    db_yolu = os.path.join(dizin, 'bench.db')
+    try:
+        tohum = ctx.Process(target=_tohumla, args=(db_yolu, profil, args.ekipman))
+        tohum.start()
+        tohum.join()
+
+        kuyruk = ctx.Queue()
+        engel = ctx.Barrier(args.yazici + args.okuyucu)
+        surecler = [ctx.Process(target=_yazici,
+                                args=(db_yolu, profil, engel, args.sure, args.ekipman,
+                                      no, args.yazici, kuyruk))
+                    for no in range(args.yazici)]
+        surecler += [ctx.Process(target=_okuyucu, args=(db_yolu, profil, engel, args.sure, kuyruk))
+                     for _ in range(args.okuyucu)]
+        for s in surecler:
+            s.start()
+        sonuclar = [kuyruk.get() for _ in surecler]
+        for s in surecler:
+            s.join()
+    finally:
+        shutil.rmtree(dizin, ignore_errors=True)
+
+    rapor = {}
+    for tur in ('yazici', 'okuyucu'):
+        parcalar = [s for s in sonuclar if s[0] == tur]
+        sureler = [t for s in parcalar for t in s[3]]
+        basarili = sum(s[1] for s in parcalar)
+        rapor[tur] = {
+            'basarili': basarili,
+            'hatali': sum(s[2] for s in parcalar),
+            'islem_per_sn': round(basarili / args.sure, 1),
+            'p50_ms': yuzdelik(sureler, 0.50),
+            'p95_ms': yuzdelik(sureler, 0.95),
+            'p99_ms': yuzdelik(sureler, 0.99),
+        }
+    # Yazıcı hataları kilit zaman aşımı, 5xx vb.; durum makinesi reddi (409) ayrı sayılır
+    rapor['yazici']['cakisma_409'] = sum(s[4] for s in sonuclar if s[0] == 'yazici')
+    return rapor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sure', type=float, default=10, help='Ölçüm süresi (sn)')
+    parser.add_argument('--yazici', type=int, default=4, help='Yazıcı süreç sayısı')
+    parser.add_argument('--okuyucu', type=int, default=4, help='Okuyucu süreç sayısı')
+    parser.add_argument('--ekipman', type=int, default=20000, help='Tohum ekipman sayısı')
+    parser.add_argument('--profil', choices=['ikisi'] + list(PROFILLER), default='ikisi')
+    args = parser.parse_args()
+
+    profiller = list(PROFILLER) if args.profil == 'ikisi' else [args.profil]
+    rapor = {
+        'parametreler': vars(args),
+        'sonuclar': {p: calistir(p, args) for p in profiller},
+    }
+    print(json.dumps(rapor, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark betiklerinin ortak ölçüm yardımcıları"""
+import re
+import resource
+import sys
+
+
+def yuzdelik(degerler, oran):
+    """Saniye listesinin yüzdeliği (ms)"""
+    if not degerler:
+        return None
+    sirali = sorted(degerler)
+    return round(sirali[min(len(sirali) - 1, int(len(sirali) * oran))] * 1000, 2)
+
+
+def gecikme_ozeti(sureler):
+    return {
+        'adet': len(sureler),
+        'p50_ms': yuzdelik(sureler, 0.50),
+        'p95_ms': yuzdelik(sureler, 0.95),
+        'p99_ms': yuzdelik(sureler, 0.99),
+    }
+
+
+def tepe_rss_sifirla():
+    """Linux: süreç tepe RSS'ini (VmHWM) sıfırla; başka sistemlerde etkisiz"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def tepe_rss_mb():
+    """Son sıfırlamadan (veya süreç başından) beri tepe RSS (MB)"""
+    try:
+        with open('/proc/self/status') as f:
+            return round(int(re.search(r'VmHWM:\s+(\d+)', f.read()).group(1)) / 1024, 1)
+    except (OSError, AttributeError):
+        tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS bayt, Linux KB döndürür
+        return round(tepe / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
@@ -0,0 +1,130 @@
+"""
+Benchmark veritabanı tohumlama: gerçek modeller ve init_db.py kategorileriyle
+istenen boyutta sentetik envanter. Her ekipmanın ortalama `--hareket-orani`
+hareketi olur (Giriş, ardından Çıkış / Transfer / İade döngüsü, az sayıda
+Arıza); ekipman durumu son hareketle tutarlıdır. Satırlar Core toplu
+INSERT ile yazılır, ardından arama indeksi, sayaçlar, zimmet projeksiyonu
+ve aylık hareket özeti init_db.py'deki adımlarla kurulur.
+
+Kullanım:
+    python benchmarks/seed.py --ekipman 100000 --db /tmp/stok_100k.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+
+BOYUTLAR = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000}
+
+MARKALAR = ('Dell', 'HP', 'Lenovo', 'Asus', 'Acer', 'Apple', 'Samsung', 'LG', 'Cisco', 'Epson')
+BIRIMLER = ('Bilgi İşlem', 'Mühendislik Fakültesi', 'Hukuk Fakültesi', 'İktisat Fakültesi',
+            'Kütüphane', 'Rektörlük', 'İletişim Fakültesi', 'Fen Edebiyat Fakültesi')
+ISIMLER = ('Ayşe', 'Mehmet', 'Zeynep', 'Ali', 'Elif', 'Mustafa', 'Şule', 'Can', 'Gökçe', 'Ömer')
+SOYADLAR = ('Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Öztürk', 'Aydın', 'Arslan')
+
+# Tohum parça boyutu (ekipman); hareketler aynı parçada yazılır
+PARCA = 10_000
+
+
+def _gecmis(rng, ekipman_id, baslangic, ortalama):
+    """Bir ekipmanın hareket listesi ve son durumu"""
+    adet = rng.randint(1, max(1, 2 * ortalama - 1))
+    tarih = baslangic
+    hareketler = []
+    durum = 'Depoda'
+    for i in range(adet):
+        tarih += timedelta(days=rng.randint(1, 60), seconds=rng.randint(0, 86399))
+        if i == 0:
+            tip = 'Giriş'
+        elif i == adet - 1 and rng.random() < 0.02:
+            tip = 'Arıza'
+        elif durum == 'Depoda':
+            tip = 'Çıkış'
+        else:
+            tip = 'Transfer' if rng.random() < 0.2 else 'İade'
+        kayit = {'ekipman_id': ekipman_id, 'hareket_tipi': tip, 'tarih': tarih,
+                 'birim': rng.choice(BIRIMLER), 'lokasyon': f'Blok {rng.choice("ABCDE")}-{rng.randint(1, 400)}',
+                 'kullanici_adi': None, 'kullanici_personel_no': None}
+        if tip in ('Çıkış', 'Transfer'):
+            kayit['kullanici_adi'] = f'{rng.choice(ISIMLER)} {rng.choice(SOYADLAR)}'
+            kayit['kullanici_personel_no'] = f'P{rng.randint(1, 20000):05d}'
+        hareketler.append(kayit)
+        durum = {'Giriş': 'Depoda', 'İade': 'Depoda', 'Arıza': 'Arızalı'}.get(tip, 'Kullanımda')
+    return hareketler, durum
+
+
+def tohumla(app, ekipman_adedi, hareket_orani=10, tohum=42, cikti=print):
+    """Boş veritabanını doldur; (ekipman, hareket) sayılarını döndürür"""
+    from sqlalchemy import insert
+    from models import db, Ekipman, EkipmanHareket, Kategori
+    import init_db
+
+    rng = random.Random(tohum)
+    with app.app_context():
+        db.create_all()
+        init_db.init_indeksler()
+        init_db.init_kategoriler()
+        kategoriler = [k.ad for k in Kategori.query.order_by(Kategori.id)]
+
+        simdi = datetime.utcnow()
+        hareket_toplam = 0
+        baslangic = time.perf_counter()
+        for parca_basi in range(0, ekipman_adedi, PARCA):
+            ekipmanlar, hareketler = [], []
+            for id in range(parca_basi + 1, min(parca_basi + PARCA, ekipman_adedi) + 1):
+                temin = simdi - timedelta(days=rng.randint(30, 8 * 365))
+                gecmis, durum = _gecmis(rng, id, temin, hareket_orani)
+                ekipmanlar.append({
+                    'id': id, 'kategori': rng.choice(kategoriler), 'marka': rng.choice(MARKALAR),
+                    'model': f'M{rng.randint(100, 9999)}', 'seri_no': f'SN{id:08d}',
+                    'barkod': f'BK{id:08d}', 'durum': durum, 'temin_tarihi': temin,
+                    'temin_fiyati': round(rng.uniform(150, 60000), 2),
+                    'tedarikci': f'Tedarikçi {rng.randint(1, 40)}',
+                    'olusturma_tarihi': temin, 'guncelleme_tarihi': gecmis[-1]['tarih'],
+                })
+                for kayit in gecmis:
+                    kayit['kategori'] = ekipmanlar[-1]['kategori']
+                hareketler += gecmis
+            with db.engine.begin() as connection:
+                connection.execute(insert(Ekipman), ekipmanlar)
+                connection.execute(insert(EkipmanHareket), hareketler)
+            hareket_toplam += len(hareketler)
+            cikti(f'  {min(parca_basi + PARCA, ekipman_adedi)}/{ekipman_adedi} ekipman, '
+                  f'{hareket_toplam} hareket ({time.perf_counter() - baslangic:.0f} sn)')
+
+        # Core INSERT türetilmiş tabloları güncellemez: init_db adımlarıyla kur
+        init_db.init_arama_indeksi()
+        init_db.init_sayaclar()
+        init_db.init_zimmet()
+        init_db.init_hareket_ozeti()
+    return ekipman_adedi, hareket_toplam
+
+
+def boyut_oku(deger):
+    return BOYUTLAR.get(deger) or int(deger)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ekipman', type=boyut_oku, default='10k',
+                        help='Ekipman sayısı: 10k, 100k, 1M veya tam sayı')
+    parser.add_argument('--hareket-orani', type=int, default=10, help='Ekipman başına ortalama hareket')
+    parser.add_argument('--db', required=True, help='Oluşturulacak SQLite dosyası')
+    parser.add_argument('--tohum', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        parser.error(f'{args.db} zaten var')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.db)}'
+    from app import app
+    ekipman, hareket = tohumla(app, args.ekipman, args.hareket_orani, args.tohum)
+    print(f'Tamamlandı: {ekipman} ekipman, {hareket} hareket -> {args.db}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Serileştirme benchmark'ı: aynı ekipman listesi eski yolla (ORM nesnesi +
+to_dict + jsonify) ve yeni yolla (Core demeti + Eslestirme + orjson/json)
+üretilir. Gövdelerin bayt bayt aynı olduğu doğrulanır, süreler JSON basılır.
+
+Kullanım:
+    python benchmarks/serialization.py --adet 20000 --tekrar 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+
+
+def _olc(fonksiyon, tekrar):
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        govde = fonksiyon()
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return govde, {'medyan_ms': round(statistics.median(sureler), 1),
+                   'en_iyi_ms': round(min(sureler), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--adet', type=int, default=20000)
+    parser.add_argument('--tekrar', type=int, default=5)
+    args = parser.parse_args()
+
+    db_yolu = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_yolu}'
+    from flask import jsonify
+    from app import app
+    from models import db, Ekipman
+    import serialization
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Ekipman), [
+            {'kategori': 'Monitör' if i % 2 else 'Laptop', 'marka': f'Marka{i % 20}',
+             'model': f'Model Ş{i}', 'seri_no': f'SN{i:07d}', 'barkod': f'BK{i:07d}',
+             'durum': 'Kullanımda' if i % 3 else 'Depoda', 'temin_fiyati': 1000 + i * 0.25,
+             'notlar': 'Bilgi İşlem deposu'}
+            for i in range(args.adet)
+        ])
+        db.session.commit()
+
+        sorgu = db.select(Ekipman).order_by(Ekipman.id)
+        eslestirme = serialization.EKIPMAN
+        kolonlar = db.select(*eslestirme.kolonlar).order_by(Ekipman.id)
+
+        def eski():
+            db.session.expunge_all()
+            return jsonify([e.to_dict() for e in db.session.scalars(sorgu)]).get_data()
+
+        def yeni():
+            satirlar = db.session.execute(kolonlar).all()
+            return serialization.json_yanit(eslestirme.satirlar(satirlar)).get_data()
+
+        def sadece_kodlama_eski(veri):
+            return lambda: jsonify(veri).get_data()
+
+        def sadece_kodlama_yeni(veri):
+            return lambda: serialization.json_yanit(veri).get_data()
+
+        eski_govde, eski_sure = _olc(eski, args.tekrar)
+        yeni_govde, yeni_sure = _olc(yeni, args.tekrar)
+        veri = eslestirme.satirlar(db.session.execute(kolonlar).all())
+        _, eski_kodlama = _olc(sadece_kodlama_eski(veri), args.tekrar)
+        _, yeni_kodlama = _olc(sadece_kodlama_yeni(veri), args.tekrar)
+
+    print(json.dumps({
+        'adet': args.adet,
+        'orjson': serialization.orjson is not None,
+        'ayni_govde': eski_govde == yeni_govde,
+        'bayt': len(yeni_govde),
+        'uctan_uca': {'eski': eski_sure, 'yeni': yeni_sure},
+        'sadece_kodlama': {'eski': eski_kodlama, 'yeni': yeni_kodlama},
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Açılış benchmark'ı: her senaryo ayrı, soğuk bir Python sürecinde --tekrar
+kez çalıştırılır; süre (import + kurulum), tepe RSS ve yüklenen ağır
+kütüphaneler JSON basılır.
+
+Senaryolar:
+    uygulama           create_app() (gunicorn işçisi, flask run)
+    isci               dışa aktarma işçi sürecinin kurulumu (jobs + engine)
+    init_db            init_db.py CLI'nin kurulumu
+    uygulama_export    create_app() + openpyxl/reportlab (ilk dışa aktarmadaki
+                       ek maliyet; tembel yüklemeden önceki açılışa denk)
+
+Kullanım:
+    python benchmarks/startup.py --tekrar 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGIR_MODULLER = ('openpyxl', 'reportlab', 'PIL', 'numpy')
+
+
+def _uygulama():
+    from app import create_app
+    create_app()
+
+
+def _isci():
+    from flask import Flask
+    import database
+    import jobs  # noqa: F401 (işçi süreç bu modülü yükler)
+    app = Flask('jobs')
+    app.config.update({'SQLALCHEMY_DATABASE_URI': os.environ['DATABASE_URL'], 'DB_POOL_SIZE': 1})
+    database.init_app(app)
+
+
+def _init_db():
+    import init_db  # noqa: F401
+    from app import create_app
+    create_app()
+
+
+def _uygulama_export():
+    import openpyxl  # noqa: F401
+    import reportlab.platypus  # noqa: F401
+    import reportlab.pdfbase.ttfonts  # noqa: F401
+    _uygulama()
+
+
+SENARYOLAR = {
+    'uygulama': _uygulama,
+    'isci': _isci,
+    'init_db': _init_db,
+    'uygulama_export': _uygulama_export,
+}
+
+
+def _cocuk(senaryo):
+    """Ölçülen süreç: senaryoyu çalıştır, sonucu stdout'a JSON yaz"""
+    baslangic = time.perf_counter()
+    sys.path.insert(0, KOK)
+    SENARYOLAR[senaryo]()
+    sure = time.perf_counter() - baslangic
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from measure import tepe_rss_mb
+    print(json.dumps({
+        'sure_ms': round(sure * 1000, 1),
+        'tepe_rss_mb': tepe_rss_mb(),
+        'agir_moduller': [m for m in AGIR_MODULLER if m in sys.modules],
+    }))
+
+
+def olc(senaryo, tekrar, ortam):
+    sonuclar = []
+    for _ in range(tekrar):
+        cikti = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--cocuk', senaryo],
+            env=ortam, capture_output=True, text=True, check=True,
+        ).stdout
+        sonuclar.append(json.loads(cikti.strip().splitlines()[-1]))
+    sureler = [s['sure_ms'] for s in sonuclar]
+    return {
+        'medyan_ms': round(statistics.median(sureler), 1),
+        'en_iyi_ms': min(sureler),
+        'tepe_rss_mb': round(statistics.median(s['tepe_rss_mb'] for s in sonuclar), 1),
+        'agir_moduller': sonuclar[-1]['agir_moduller'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tekrar', type=int, default=5)
+    parser.add_argument('--senaryo', action='append', choices=sorted(SENARYOLAR),
+                        help='Sadece bu senaryolar (birden çok verilebilir)')
+    parser.add_argument('--cocuk', choices=sorted(SENARYOLAR), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cocuk:
+        _cocuk(args.cocuk)
+        return
+
+    ortam = dict(os.environ)
+    # Açılış veritabanına dokunmaz; yine de gerçek dosyaya bağlanmasın
+    ortam.setdefault('DATABASE_URL', f'sqlite:///{os.path.join(tempfile.mkdtemp(), "startup.db")}')
+    rapor = {ad: olc(ad, args.tekrar, ortam) for ad in (args.senaryo or SENARYOLAR)}
+    print(json.dumps(rapor, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Varlık değerleme benchmark'ı: tohumlanmış bir veritabanında (seed.py)
+değerleme görüntüsünün okunma süresi ve belleği, senaryo başına vektörel
+hesap süresi ve /api/raporlar/varlik uç gecikmesi (soğuk, önbellekten,
+304) ölçülür. --python ile saf Python yedeği de ölçülür ve sonuçların
+NumPy ile aynı olduğu doğrulanır.
+
+Kullanım:
+    python benchmarks/seed.py --ekipman 1M --hareket-orani 1 --db /tmp/stok_1m.db
+    python benchmarks/valuation.py --db /tmp/stok_1m.db --tekrar 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+
+from measure import tepe_rss_mb, tepe_rss_sifirla  # noqa: E402
+
+SENARYOLAR = {
+    'kategori': 'grupla=kategori',
+    'kategori_durum_azalan': 'grupla=kategori,durum&yontem=azalan',
+    'birim_laptop': 'grupla=birim&kategori=Laptop',
+    'uc_boyut': 'grupla=kategori,durum,birim&kovalar=0.5,1,2,4,8&tahmin_yil=10',
+}
+
+
+def _olc(fonksiyon, tekrar):
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        sonuc = fonksiyon()
+        sureler.append((time.perf_counter() - baslangic) * 1000)
+    return sonuc, {'medyan_ms': round(statistics.median(sureler), 1),
+                   'en_iyi_ms': round(min(sureler), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', required=True, help='seed.py ile oluşturulmuş SQLite dosyası')
+    parser.add_argument('--tekrar', type=int, default=5)
+    parser.add_argument('--python', action='store_true', help='Saf Python yedeğini de ölç (yavaş)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.db)}'
+    from werkzeug.datastructures import MultiDict
+    from app import create_app
+    import valuation
+
+    numpy = valuation.numpy_modulu()
+    if numpy is None:
+        parser.error('NumPy kurulu değil (pip install numpy); --python ile sadece yedek ölçülebilir')
+    app = create_app({'TARAMA_ON_YUKLEME': False})
+    istemci = app.test_client()
+    rapor = {'numpy': numpy.__version__}
+
+    with app.app_context():
+        tepe_rss_sifirla()
+        rss_once = tepe_rss_mb()
+        anlik, rapor['goruntu_yukleme'] = _olc(lambda: valuation.AnlikGoruntu(0).yukle(), 1)
+        rapor['goruntu_yukleme'].update({
+            'ekipman': anlik.adet,
+            'tepe_rss_artisi_mb': round(tepe_rss_mb() - rss_once, 1),
+            'dizi_mb': round(sum(d.nbytes for d in (anlik.fiyat, anlik.gun, *anlik.kodlar.values()))
+                             / 2 ** 20, 1),
+        })
+
+        hesap = {}
+        for ad, sorgu in SENARYOLAR.items():
+            p = valuation.parametreleri_oku(MultiDict(kv.split('=', 1) for kv in sorgu.split('&')))
+            sonuc, hesap[ad] = _olc(lambda: valuation.hesapla(anlik, p, 'numpy'), args.tekrar)
+            hesap[ad]['grup'] = len(sonuc['gruplar'])
+            if args.python:
+                yedek, hesap[ad]['python'] = _olc(lambda: valuation.hesapla(anlik, p, 'python'), 1)
+                hesap[ad]['ayni_sonuc'] = {**sonuc, 'motor': None} == {**yedek, 'motor': None}
+        rapor['hesap'] = hesap
+
+    # Uç: ilk istek görüntüyü okur; sonrakiler önbellekten, ETag ile 304
+    uc = {}
+    for ad, sorgu in SENARYOLAR.items():
+        yol = f'/api/raporlar/varlik?{sorgu}'
+        baslangic = time.perf_counter()
+        yanit = istemci.get(yol)
+        uc[ad] = {'ilk_ms': round((time.perf_counter() - baslangic) * 1000, 1)}
+        _, uc[ad]['onbellek'] = _olc(lambda: istemci.get(yol), args.tekrar)
+        etag = yanit.headers['ETag']
+        _, uc[ad]['kosullu_304'] = _olc(lambda: istemci.get(yol, headers={'If-None-Match': etag}),
+                                        args.tekrar)
+    rapor['uc'] = uc
+    rapor['goruntu_okuma'] = app.extensions['degerleme'].yukleme
+    print(json.dumps(rapor, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
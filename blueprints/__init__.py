@@ -0,0 +1,9 @@
+"""Alt sistem blueprint'leri (kategori, ekipman, hareket, tarama, raporlar, dışa aktarma, genel)"""
+from blueprints import ekipman, export, genel, hareket, kategori, rapor, tarama
+
+BLUEPRINTLER = (genel.bp, kategori.bp, ekipman.bp, hareket.bp, tarama.bp, rapor.bp, export.bp)
+
+
+def kaydet(app):
+    for blueprint in BLUEPRINTLER:
+        app.register_blueprint(blueprint)
@@ -0,0 +1,173 @@
+"""Ekipman uçları: liste, arama, detay, ekleme/güncelleme/silme, toplu içe aktarma"""
+from datetime import datetime
+
+from flask import Blueprint, abort, request, jsonify
+from models import db, Ekipman, Kategori
+from pagination import sayfali_liste, SayfalamaHatasi
+import categories
+import details
+import http_cache
+import importers
+import search
+import serialization
+from http_cache import kosullu_get
+from database import yazma_tekrar_dene
+from serialization import json_yanit
+
+bp = Blueprint('ekipman', __name__)
+
+@bp.route('/api/ekipman', methods=['GET'])
+@kosullu_get(http_cache.veri_damgasi)
+def get_ekipman():
+    """
+    Ekipmanları getir (filtreleme, keyset sayfalama ve alan seçimi destekli).
+    ?ids=1,2,3 verilirse sadece o ekipmanlar istenen sırayla döner
+    (sayfalama yok); ?include=hareketler ile her birinin son hareketleri.
+    """
+    if request.args.get('ids'):
+        try:
+            idler = details.idleri_oku(request.args['ids'])
+            ekler = details.ekleri_oku(request.args)
+            limit = details.hareket_limiti(request.args)
+        except details.DetayHatasi as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        ekipmanlar = details.ekipmanlari_getir(idler, 'hareketler' in ekler, limit)
+        return json_yanit([details.ekipman_detayi(e, ekler, limit) for e in ekipmanlar])
+    try:
+        return sayfali_liste(Ekipman, Ekipman.olusturma_tarihi,
+                             search.ekipman_filtreleri(request.args), request.args)
+    except SayfalamaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/ekipman/toplu', methods=['POST'])
+def ekipman_toplu_ekle():
+    """
+    Toplu ekipman ekle (JSON dizisi, CSV veya XLSX).
+    ?mod=atomik|kismi, ?batch_size=N
+    """
+    try:
+        mod, batch_size = importers.parse_parametreler(request.args)
+        sonuc = importers.ekipman_ice_aktar(importers.satirlari_oku(request), mod, batch_size)
+    except importers.IceAktarmaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sonuc.to_dict()), 201 if sonuc.eklenen else 400
+
+@bp.route('/api/ekipman/ara', methods=['GET'])
+@kosullu_get(http_cache.veri_damgasi)
+def ekipman_ara():
+    """Sıralı ekipman araması (barkod/seri no tam eşleşme + FTS5 önek)"""
+    terim = request.args.get('q', '').strip()
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    if not terim:
+        return jsonify({'success': False, 'error': 'Arama terimi (q) boş olamaz.'}), 400
+
+    ekipmanlar, eslesme = search.ara(terim, limit=limit)
+    return json_yanit({
+        'eslesme': eslesme,
+        'sonuclar': [serialization.EKIPMAN.nesne(e) for e in ekipmanlar]
+    })
+
+@bp.route('/api/ekipman/<int:id>', methods=['GET'])
+@kosullu_get(http_cache.ekipman_detay_damgasi)
+def get_ekipman_detay(id):
+    """Belirli bir ekipmanın detaylarını getir (?include=hareketler&hareket_limit=N)"""
+    try:
+        ekler = details.ekleri_oku(request.args)
+        limit = details.hareket_limiti(request.args)
+    except details.DetayHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    ekipmanlar = details.ekipmanlari_getir([id], 'hareketler' in ekler, limit)
+    if not ekipmanlar:
+        abort(404)
+    return json_yanit(details.ekipman_detayi(ekipmanlar[0], ekler, limit))
+
+@bp.route('/api/ekipman', methods=['POST'])
+@yazma_tekrar_dene
+def ekipman_ekle():
+    """Yeni ekipman ekle"""
+    data = request.json
+    
+    try:
+        # Kategori kontrolü - eğer veritabanında yoksa ekle
+        kategori_adi = data['kategori']
+        if categories.aktif_kayit().id_bul(kategori_adi) is None:
+            # Yeni kategori oluştur
+            yeni_kategori = Kategori(ad=kategori_adi, aciklama='Kullanıcı tanımlı')
+            db.session.add(yeni_kategori)
+            db.session.commit()
+            print(f"Yeni kategori eklendi: {kategori_adi}")
+        
+        # Tarih dönüşümü
+        temin_tarihi = None
+        if data.get('temin_tarihi'):
+            temin_tarihi = datetime.fromisoformat(data['temin_tarihi'].replace('Z', '+00:00'))
+        
+        ekipman = Ekipman(
+            kategori=data['kategori'],
+            marka=data.get('marka'),
+            model=data.get('model'),
+            seri_no=data.get('seri_no'),
+            barkod=data.get('barkod'),
+            durum=data.get('durum', 'Depoda'),
+            notlar=data.get('notlar'),
+            temin_tarihi=temin_tarihi,
+            temin_fiyati=data.get('temin_fiyati'),
+            tedarikci=data.get('tedarikci')
+        )
+        
+        db.session.add(ekipman)
+        db.session.commit()
+        
+        return jsonify({'success': True, 'id': ekipman.id, 'data': ekipman.to_dict()}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/ekipman/<int:id>', methods=['PUT'])
+@yazma_tekrar_dene
+def ekipman_guncelle(id):
+    """Ekipman bilgilerini güncelle"""
+    ekipman = Ekipman.query.get_or_404(id)
+    data = request.json
+    
+    try:
+        if 'kategori' in data:
+            ekipman.kategori = data['kategori']
+        if 'marka' in data:
+            ekipman.marka = data['marka']
+        if 'model' in data:
+            ekipman.model = data['model']
+        if 'seri_no' in data:
+            ekipman.seri_no = data['seri_no']
+        if 'barkod' in data:
+            ekipman.barkod = data['barkod']
+        if 'durum' in data:
+            ekipman.durum = data['durum']
+        if 'notlar' in data:
+            ekipman.notlar = data['notlar']
+        if 'temin_tarihi' in data and data['temin_tarihi']:
+            ekipman.temin_tarihi = datetime.fromisoformat(data['temin_tarihi'].replace('Z', '+00:00'))
+        if 'temin_fiyati' in data:
+            ekipman.temin_fiyati = data['temin_fiyati']
+        if 'tedarikci' in data:
+            ekipman.tedarikci = data['tedarikci']
+        
+        db.session.commit()
+        return jsonify({'success': True, 'data': ekipman.to_dict()})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/ekipman/<int:id>', methods=['DELETE'])
+@yazma_tekrar_dene
+def ekipman_sil(id):
+    """Ekipman sil"""
+    ekipman = Ekipman.query.get_or_404(id)
+    
+    try:
+        db.session.delete(ekipman)
+        db.session.commit()
+        return jsonify({'success': True, 'message': 'Ekipman başarıyla silindi'})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
@@ -0,0 +1,77 @@
+"""Dışa aktarma uçları: senkron Excel/PDF ve arka plan işleri"""
+from flask import Blueprint, request, jsonify, current_app, url_for
+from models import db, Ekipman
+import exporters
+import jobs
+import search
+
+bp = Blueprint('export', __name__)
+
+
+def _export_yaniti(isi):
+    """İş durumunu 202 (devam ediyor) veya 200 (hazır) olarak döndür"""
+    sonuc = isi.to_dict()
+    sonuc['durum_url'] = url_for('.export_is_durumu', is_id=isi.id)
+    if isi.durum == 'tamamlandi':
+        sonuc['indir_url'] = url_for('.export_is_dosyasi', is_id=isi.id)
+    response = jsonify(sonuc)
+    if isi.durum in ('bekliyor', 'calisiyor'):
+        response.status_code = 202
+        response.headers['Location'] = sonuc['durum_url']
+    return response
+
+def _dosya_indir(isi):
+    return exporters.dosya_akisi(isi.dosya_yolu, isi.mimetype, isi.indirme_adi, sil=False)
+
+@bp.route('/api/export/excel')
+def export_excel():
+    """Envanteri Excel olarak dışa aktar (kategori/durum/arama filtreleri geçerli)"""
+    isi = jobs.senkron_uret(current_app._get_current_object(), 'excel', request.args)
+    return _dosya_indir(isi)
+
+@bp.route('/api/export/pdf')
+def export_pdf():
+    """
+    Envanteri PDF olarak dışa aktar. Büyük listeler (veya async=1) için
+    arka plan işi başlatılır ve 202 ile iş durumu adresi döner.
+    """
+    args = request.args.to_dict()
+    arka_plan = args.pop('async', None) in ('1', 'true')
+    if not arka_plan:
+        toplam = db.session.query(db.func.count(Ekipman.id)) \
+            .filter(*search.ekipman_filtreleri(args)).scalar()
+        arka_plan = toplam > current_app.config['PDF_SENKRON_LIMIT']
+
+    app_ = current_app._get_current_object()
+    if arka_plan:
+        return _export_yaniti(jobs.is_baslat(app_, 'pdf', args))
+    return _dosya_indir(jobs.senkron_uret(app_, 'pdf', args))
+
+@bp.route('/api/export/jobs', methods=['POST'])
+def export_is_baslat():
+    """Dışa aktarma işi başlat: {"format": "excel"|"pdf", "filtreler": {...}}"""
+    data = request.json or {}
+    format = data.get('format')
+    if format not in exporters.FORMATLAR:
+        return jsonify({'success': False, 'error': 'format "excel" veya "pdf" olmalı.'}), 400
+
+    isi = jobs.is_baslat(current_app._get_current_object(), format, data.get('filtreler') or {})
+    return _export_yaniti(isi)
+
+@bp.route('/api/export/jobs/<is_id>')
+def export_is_durumu(is_id):
+    """Dışa aktarma işinin durumu ve ilerlemesi"""
+    isi = jobs.is_getir(current_app._get_current_object(), is_id)
+    if isi is None:
+        return jsonify({'success': False, 'error': 'İş bulunamadı.'}), 404
+    return _export_yaniti(isi)
+
+@bp.route('/api/export/jobs/<is_id>/dosya')
+def export_is_dosyasi(is_id):
+    """Tamamlanan dışa aktarma işinin dosyasını indir"""
+    isi = jobs.is_getir(current_app._get_current_object(), is_id)
+    if isi is None:
+        return jsonify({'success': False, 'error': 'İş bulunamadı.'}), 404
+    if isi.durum != 'tamamlandi':
+        return jsonify({'success': False, 'error': 'İş henüz tamamlanmadı.', **isi.to_dict()}), 409
+    return _dosya_indir(isi)
@@ -0,0 +1,47 @@
+"""Arayüz sayfaları, olay akışı, istatistikler ve /metrics"""
+from flask import Blueprint, Response, current_app, render_template, request, jsonify
+import counters
+import events
+import http_cache
+import metrics
+from http_cache import kosullu_get
+
+bp = Blueprint('genel', __name__)
+
+# Ana sayfa
+@bp.route('/')
+def index():
+    return render_template('index.html')
+
+@bp.route('/test')
+def test():
+    return render_template('test.html')
+
+# Olay akışı (Server-Sent Events)
+@bp.route('/api/olaylar', methods=['GET'])
+def olay_akisi():
+    """
+    Değişiklik olayları. Yeniden bağlanan tarayıcı Last-Event-ID gönderir;
+    ilk bağlantıda aynı değer ?son= ile verilebilir.
+    """
+    son = request.headers.get('Last-Event-ID') or request.args.get('son')
+    try:
+        son = int(son) if son else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Geçersiz Last-Event-ID.'}), 400
+    return Response(events.akis(son, current_app.config['OLAY_PING_SN']), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # nginx arabelleğe almasın
+    })
+
+# İstatistik endpoints
+@bp.route('/api/istatistikler', methods=['GET'])
+@kosullu_get(http_cache.veri_damgasi)
+def get_istatistikler():
+    """Genel istatistikleri sayaç tablosundan getir"""
+    return jsonify(counters.istatistik_ozeti())
+
+@bp.route('/metrics')
+def prometheus_metrikleri():
+    """Prometheus formatında metrikler"""
+    return Response(metrics.prometheus_metni(), mimetype='text/plain; version=0.0.4')
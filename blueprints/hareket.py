@@ -0,0 +1,105 @@
+"""Hareket ve zimmet uçları (/api/hareket, /api/zimmet)"""
+from flask import Blueprint, request, jsonify
+from models import db, Ekipman, EkipmanHareket, EkipmanHareketArsiv, EkipmanZimmet
+from pagination import sayfali_liste, SayfalamaHatasi
+import custody
+import http_cache
+import importers
+import movements
+from http_cache import kosullu_get
+from database import yazma_tekrar_dene
+from idempotency import idempotent, islemi_bitir
+
+bp = Blueprint('hareket', __name__)
+
+@bp.route('/api/hareket', methods=['GET'])
+@kosullu_get(http_cache.veri_damgasi)
+def get_hareketler():
+    """Hareketleri getir (keyset sayfalama ve alan seçimi destekli; ?arsiv=1 ile arşivdekiler)"""
+    ekipman_id = request.args.get('ekipman_id', type=int)
+    model = EkipmanHareketArsiv if request.args.get('arsiv') in ('1', 'true') else EkipmanHareket
+    
+    filtreler = []
+    if ekipman_id:
+        filtreler.append(model.ekipman_id == ekipman_id)
+    
+    try:
+        return sayfali_liste(model, model.tarih, filtreler, request.args)
+    except SayfalamaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/hareket', methods=['POST'])
+@yazma_tekrar_dene
+@idempotent
+def hareket_ekle():
+    """
+    Yeni hareket ekle. Ekipman durumu durum makinesine göre tek koşullu
+    UPDATE ile değişir; Idempotency-Key başlığıyla tekrarlar no-op olur.
+    """
+    data = request.get_json(silent=True)
+    
+    try:
+        hareket = movements.hareket_kaydet(data)
+        islemi_bitir()
+        
+        return jsonify({'success': True, 'id': hareket.id, 'data': hareket.to_dict()}), 201
+    except movements.HareketHatasi as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e), **e.detay}), e.durum_kodu
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/hareket/toplu-cikis', methods=['POST'])
+@yazma_tekrar_dene
+@idempotent
+def hareket_toplu_cikis():
+    """Birden çok ekipmanı tek transaction'da zimmetle (hepsi ya da hiçbiri)"""
+    data = request.get_json(silent=True)
+    
+    try:
+        idler = movements.toplu_cikis(data)
+        islemi_bitir()
+        return jsonify({'success': True, 'adet': len(idler), 'hareket_idler': idler}), 201
+    except movements.HareketHatasi as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e), **e.detay}), e.durum_kodu
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/hareket/toplu', methods=['POST'])
+def hareket_toplu_ekle():
+    """
+    Toplu hareket / zimmet ekle (JSON dizisi, CSV veya XLSX).
+    Ekipman; ekipman_id, barkod veya seri_no ile belirtilebilir.
+    """
+    try:
+        mod, batch_size = importers.parse_parametreler(request.args)
+        sonuc = importers.hareket_ice_aktar(importers.satirlari_oku(request), mod, batch_size)
+    except importers.IceAktarmaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify(sonuc.to_dict()), 201 if sonuc.eklenen else 400
+
+# Zimmet endpoints (güncel zimmet projeksiyonu)
+@bp.route('/api/zimmet', methods=['GET'])
+@kosullu_get(http_cache.veri_damgasi)
+def get_zimmetler():
+    """Personel no, birim veya lokasyona göre güncel zimmetli ekipmanlar"""
+    filtreler = custody.zimmet_filtreleri(request.args)
+    if filtreler is None:
+        return jsonify({'success': False, 'error': 'personel_no, birim veya lokasyon gerekli.'}), 400
+    try:
+        return sayfali_liste(EkipmanZimmet, EkipmanZimmet.tarih, filtreler, request.args,
+                             id_kolonu=EkipmanZimmet.ekipman_id,
+                             ek_kolonlar=custody.EKIPMAN_ALANLARI)
+    except SayfalamaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/ekipman/<int:id>/zimmet', methods=['GET'])
+@kosullu_get(http_cache.zimmet_satir_damgasi)
+def get_ekipman_zimmet(id):
+    """Ekipman şu an kimde / nerede (hiç hareketi yoksa alanlar boş)"""
+    Ekipman.query.get_or_404(id)
+    zimmet = db.session.get(EkipmanZimmet, id) or EkipmanZimmet(ekipman_id=id)
+    return jsonify(zimmet.to_dict())
@@ -0,0 +1,78 @@
+"""Kategori uçları (/api/kategoriler)"""
+from flask import Blueprint, request, jsonify
+from models import db, Ekipman, Kategori
+import categories
+import counters
+import http_cache
+from http_cache import kosullu_get
+from database import yazma_tekrar_dene
+
+bp = Blueprint('kategori', __name__)
+
+def _kategori_listesi_damgasi():
+    # with_counts sayıları ekipman yazımlarına bağlıdır: olay günlüğü sırası
+    if request.args.get('with_counts') in ('1', 'true'):
+        return http_cache.veri_damgasi()
+    return http_cache.kategori_damgasi()
+
+@bp.route('/api/kategoriler', methods=['GET'])
+@kosullu_get(_kategori_listesi_damgasi)
+def get_kategoriler():
+    """Tüm kategorileri getir (with_counts=1 ile ekipman sayılarıyla)"""
+    if request.args.get('with_counts') in ('1', 'true'):
+        sayilar = counters.kategori_sayilari()
+        return jsonify([
+            {**k, 'ekipman_sayisi': sayilar.get(k['ad'], 0)}
+            for k in categories.aktif_kayit().liste()
+        ])
+    return jsonify(categories.aktif_kayit().liste())
+
+@bp.route('/api/kategoriler', methods=['POST'])
+@yazma_tekrar_dene
+def add_kategori():
+    """Yeni kategori ekle"""
+    data = request.json
+    try:
+        ad = data.get('ad', '').strip()
+        if not ad:
+            return jsonify({'success': False, 'error': 'Kategori adı boş olamaz.'}), 400
+        
+        if categories.aktif_kayit().id_bul(ad) is not None:
+            return jsonify({'success': False, 'error': f'"{ad}" kategorisi zaten mevcut.'}), 400
+        
+        kategori = Kategori(ad=ad, aciklama=data.get('aciklama', ''))
+        db.session.add(kategori)
+        db.session.commit()
+        return jsonify({'success': True, 'data': kategori.to_dict()}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/kategoriler/<int:id>', methods=['DELETE'])
+@yazma_tekrar_dene
+def delete_kategori(id):
+    """Kategori sil"""
+    try:
+        kategori = Kategori.query.get_or_404(id)
+        
+        # Bu kategoride ekipman var mı kontrol et; güvenlik denetimi türetilmiş
+        # sayaçlara değil ekipman tablosuna (kategori indeksi) bakar
+        ekipman_sayisi = db.session.query(db.func.count(Ekipman.id)) \
+            .filter(Ekipman.kategori == kategori.ad).scalar()
+        if ekipman_sayisi > 0:
+            return jsonify({
+                'success': False, 
+                'error': f'Bu kategoride {ekipman_sayisi} adet ekipman var. Önce ekipmanları silin veya başka kategoriye taşıyın.'
+            }), 400
+        
+        kategori_adi = kategori.ad
+        db.session.delete(kategori)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True, 
+            'message': f'"{kategori_adi}" kategorisi silindi.'
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
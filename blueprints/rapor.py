@@ -0,0 +1,37 @@
+"""Rapor uçları (/api/raporlar): özet tablolarından ve bellekteki değerleme görüntüsünden"""
+from flask import Blueprint, request, jsonify
+import rollups
+import valuation
+import http_cache
+from http_cache import kosullu_get
+from serialization import json_yanit
+
+bp = Blueprint('rapor', __name__)
+
+@bp.route('/api/raporlar/hareket', methods=['GET'])
+@kosullu_get(http_cache.veri_damgasi)
+def hareket_raporu():
+    """
+    Aylık hareket sayıları. Filtreler: kategori, birim, hareket_tipi,
+    baslangic / bitis (YYYY-AA, dahil). ?grupla=ay,birim ile sadece bu
+    kolonlara göre toplanır (varsayılan: ay, birim, hareket_tipi, kategori).
+    """
+    try:
+        return json_yanit(rollups.hareket_raporu(request.args))
+    except rollups.RaporHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@bp.route('/api/raporlar/varlik', methods=['GET'])
+@kosullu_get(valuation.rapor_damgasi)
+def varlik_raporu():
+    """
+    Varlık değerleme ve yaş raporu. yontem=dogrusal|azalan, omur (yıl),
+    kalinti (oran), oran (azalan bakiyeler), tarih (YYYY-AA-GG),
+    grupla=kategori,durum,birim, kovalar (yaş sınırları, yıl), tahmin_yil;
+    kategori / durum / birim filtreleri.
+    """
+    try:
+        parametreler = valuation.parametreleri_oku(request.args)
+    except valuation.DegerlemeHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return json_yanit(valuation.aktif_onbellek().rapor(parametreler))
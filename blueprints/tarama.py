@@ -0,0 +1,90 @@
+"""Barkod okuyucu uçları: kod çözme (/api/tara) ve stok sayımı oturumları"""
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+from models import db, SayimOturumu
+import details
+import scanner
+import serialization
+from database import yazma_tekrar_dene
+from idempotency import idempotent, islemi_bitir
+from serialization import json_yanit
+
+bp = Blueprint('tarama', __name__)
+
+@bp.route('/api/tara', methods=['GET', 'POST'])
+def tara():
+    """
+    Bir veya birden çok barkod / seri no çöz. GET ?kod=X (tekrarlanabilir)
+    veya ?kodlar=X,Y; POST {"kodlar": [...]}. ?detay=1 ile bulunan
+    ekipmanların alanları tek sorguda eklenir.
+    """
+    try:
+        if request.method == 'POST':
+            kodlar = scanner.kodlari_oku((request.get_json(silent=True) or {}).get('kodlar'))
+        else:
+            kodlar = scanner.kodlari_oku(request.args.getlist('kod') or request.args.get('kodlar', ''))
+    except scanner.TaramaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    sonuclar = scanner.cozum_sozlukleri(scanner.aktif_kayit().coz(kodlar))
+    if request.args.get('detay') in ('1', 'true'):
+        idler = list(dict.fromkeys(s['ekipman_id'] for s in sonuclar if s['ekipman_id'] is not None))
+        ekipmanlar = {e.id: serialization.EKIPMAN.nesne(e)
+                      for e in details.ekipmanlari_getir(idler)} if idler else {}
+        for s in sonuclar:
+            s['ekipman'] = ekipmanlar.get(s['ekipman_id'])
+    bulunan = sum(1 for s in sonuclar if s['ekipman_id'] is not None)
+    return json_yanit({'sonuclar': sonuclar, 'bulunan': bulunan, 'bulunamayan': len(sonuclar) - bulunan})
+
+# Stok sayımı
+@bp.route('/api/tara/sayim', methods=['POST'])
+@yazma_tekrar_dene
+def sayim_baslat():
+    """Sayım oturumu aç: {"kategori": ..., "lokasyon": ..., "aciklama": ...} (hepsi isteğe bağlı)"""
+    data = request.get_json(silent=True) or {}
+    oturum = SayimOturumu(
+        kategori=(data.get('kategori') or '').strip() or None,
+        lokasyon=(data.get('lokasyon') or '').strip() or None,
+        aciklama=data.get('aciklama'),
+    )
+    db.session.add(oturum)
+    db.session.commit()
+    return jsonify({'success': True, 'data': oturum.to_dict()}), 201
+
+@bp.route('/api/tara/sayim/<int:id>', methods=['GET'])
+def sayim_raporu(id):
+    """Oturum ve fark raporu: eksik, beklenmeyen, tekrar okunan ve bilinmeyen kodlar"""
+    oturum = SayimOturumu.query.get_or_404(id)
+    return json_yanit({**oturum.to_dict(), 'rapor': scanner.sayim_raporu(oturum)})
+
+@bp.route('/api/tara/sayim/<int:id>/okuma', methods=['POST'])
+@yazma_tekrar_dene
+@idempotent
+def sayim_okuma_ekle(id):
+    """Okutulan kodları oturuma ekle: {"kodlar": [...]}; her kodun çözümü döner"""
+    oturum = SayimOturumu.query.get_or_404(id)
+    if oturum.kapanis_tarihi is not None:
+        return jsonify({'success': False, 'error': 'Sayım oturumu kapatılmış.'}), 409
+    try:
+        kodlar = scanner.kodlari_oku((request.get_json(silent=True) or {}).get('kodlar'))
+    except scanner.TaramaHatasi as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    try:
+        cozulen = scanner.okuma_ekle(oturum, kodlar)
+        islemi_bitir()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'eklenen': len(kodlar),
+                    'sonuclar': scanner.cozum_sozlukleri(cozulen)}), 201
+
+@bp.route('/api/tara/sayim/<int:id>/kapat', methods=['POST'])
+@yazma_tekrar_dene
+def sayim_kapat(id):
+    """Oturumu kapat (yeni okuma eklenemez) ve son raporu döndür"""
+    oturum = SayimOturumu.query.get_or_404(id)
+    if oturum.kapanis_tarihi is None:
+        oturum.kapanis_tarihi = datetime.utcnow()
+        db.session.commit()
+    return json_yanit({**oturum.to_dict(), 'rapor': scanner.sayim_raporu(oturum)})
@@ -0,0 +1,132 @@
+"""
+Süreç içi kategori önbelleği. Kategoriler nadiren değişir; liste ve
+ad -> id eşlemesi bellekte tutulur. Her değişiklik `tablo_surum`
+tablosundaki sürümü artırır, böylece diğer gunicorn işçileri de en geç
+KONTROL_ARALIGI saniye sonra önbelleklerini yeniler. Önbellek uygulama
+başınadır (app.extensions['kategoriler']).
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Kategori, TabloSurum
+import metrics
+
+SURUM_ADI = 'kategori'
+# Veritabanındaki sürüm en fazla bu aralıkla kontrol edilir (saniye)
+KONTROL_ARALIGI = 1.0
+
+_surum_tablosu = TabloSurum.__table__
+
+
+def surum_artir(connection):
+    """Kategori sürümünü aynı transaction içinde bir artır"""
+    insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    stmt = insert(_surum_tablosu).values(ad=SURUM_ADI, surum=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_surum_tablosu.c.ad],
+        set_={'surum': _surum_tablosu.c.surum + 1}
+    )
+    connection.execute(stmt)
+    aktif_kayit().gecersiz_kil()
+
+
+def _db_surumu():
+    surum = db.session.execute(
+        db.select(_surum_tablosu.c.surum).where(_surum_tablosu.c.ad == SURUM_ADI)
+    ).scalar()
+    return surum or 0
+
+
+class KategoriKaydi:
+    """Kategori listesi ve ad -> id eşlemesi için önbellek"""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._liste = None
+        self._ad_id = {}
+        self._surum = None
+        self._son_kontrol = 0.0
+        self.isabet = 0
+        self.iskalama = 0
+
+    def gecersiz_kil(self):
+        with self._kilit:
+            self._liste = None
+            self._son_kontrol = 0.0
+
+    def _guncelle(self, zorla=False):
+        simdi = time.monotonic()
+        with self._kilit:
+            if not zorla and self._liste is not None and \
+                    simdi - self._son_kontrol < KONTROL_ARALIGI:
+                self.isabet += 1
+                return
+        surum = _db_surumu()
+        with self._kilit:
+            self._son_kontrol = simdi
+            if self._liste is not None and surum == self._surum:
+                self.isabet += 1
+                return
+            self.iskalama += 1
+        kategoriler = [k.to_dict() for k in Kategori.query.order_by(Kategori.id)]
+        with self._kilit:
+            self._liste = kategoriler
+            self._ad_id = {k['ad']: k['id'] for k in kategoriler}
+            self._surum = surum
+
+    def liste(self):
+        """Kategori sözlüklerinin listesi (değiştirilmemeli)"""
+        self._guncelle()
+        return self._liste
+
+    def id_bul(self, ad):
+        """
+        Kategori adından id; yoksa None. Olumsuz sonuçta sürüm hemen
+        yeniden kontrol edilir (başka işçi az önce eklemiş olabilir).
+        """
+        self._guncelle()
+        if ad not in self._ad_id:
+            self._guncelle(zorla=True)
+        return self._ad_id.get(ad)
+
+    def surum(self):
+        self._guncelle()
+        return self._surum
+
+    def istatistikler(self):
+        return {
+            'isabet': self.isabet,
+            'iskalama': self.iskalama,
+            'surum': self._surum,
+            'boyut': len(self._ad_id)
+        }
+
+
+def aktif_kayit():
+    """Geçerli uygulamanın kategori önbelleği (app context içinde)"""
+    return current_app.extensions['kategoriler']
+
+
+def init_app(app):
+    app.extensions['kategoriler'] = KategoriKaydi()
+
+
+@event.listens_for(Kategori, 'after_insert')
+@event.listens_for(Kategori, 'after_update')
+@event.listens_for(Kategori, 'after_delete')
+def _kategori_degisti(mapper, connection, target):
+    surum_artir(connection)
+
+
+@metrics.toplayici_ekle
+def _kategori_metrikleri():
+    kayit = aktif_kayit()
+    yield ('stok_kategori_cache_hits_total', 'counter',
+           'Kategori önbelleği isabetleri', [({}, kayit.isabet)])
+    yield ('stok_kategori_cache_misses_total', 'counter',
+           'Kategori önbelleği ıskalamaları (yeniden yükleme)', [({}, kayit.iskalama)])
+    yield ('stok_kategori_cache_version', 'gauge',
+           'Önbellekteki kategori sürümü', [({}, kayit._surum or 0)])
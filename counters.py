@@ -0,0 +1,110 @@
+"""Kategori x durum sayaç tablosunun artımlı bakımı"""
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Ekipman, EkipmanSayac
+
+_sayac = EkipmanSayac.__table__
+
+# durum NULL olabilir, birincil anahtarda boş metinle tutulur
+def _anahtar(kategori, durum):
+    return kategori, durum or ''
+
+
+def sayac_degistir(connection, degisimler):
+    """
+    {(kategori, durum): fark} sözlüğünü sayaç tablosuna uygula.
+    Ekipman yazımıyla aynı transaction içinde çalışır.
+    """
+    degisimler = {k: v for k, v in degisimler.items() if v}
+    if not degisimler:
+        return
+    insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    for (kategori, durum), fark in degisimler.items():
+        stmt = insert(_sayac).values(kategori=kategori, durum=durum, adet=fark)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_sayac.c.kategori, _sayac.c.durum],
+            set_={'adet': _sayac.c.adet + fark}
+        )
+        connection.execute(stmt)
+
+
+@event.listens_for(Ekipman, 'after_insert')
+def _ekipman_eklendi(mapper, connection, target):
+    sayac_degistir(connection, {_anahtar(target.kategori, target.durum): 1})
+
+
+@event.listens_for(Ekipman, 'after_update')
+def _ekipman_guncellendi(mapper, connection, target):
+    attrs = inspect(target).attrs
+    kategori_gecmis = attrs.kategori.history
+    durum_gecmis = attrs.durum.history
+    if not kategori_gecmis.has_changes() and not durum_gecmis.has_changes():
+        return
+
+    eski = _anahtar(
+        kategori_gecmis.deleted[0] if kategori_gecmis.deleted else target.kategori,
+        durum_gecmis.deleted[0] if durum_gecmis.deleted else target.durum
+    )
+    yeni = _anahtar(target.kategori, target.durum)
+    if eski != yeni:
+        sayac_degistir(connection, {eski: -1, yeni: 1})
+
+
+@event.listens_for(Ekipman, 'after_delete')
+def _ekipman_silindi(mapper, connection, target):
+    sayac_degistir(connection, {_anahtar(target.kategori, target.durum): -1})
+
+
+def sayaclari_yeniden_hesapla(connection):
+    """Sayaç tablosunu Ekipman tablosundan tek GROUP BY ile yeniden kur"""
+    connection.execute(_sayac.delete())
+    satirlar = connection.execute(
+        db.select(Ekipman.kategori, Ekipman.durum, db.func.count(Ekipman.id))
+        .group_by(Ekipman.kategori, Ekipman.durum)
+    ).all()
+    veriler = {}
+    for kategori, durum, adet in satirlar:
+        anahtar = _anahtar(kategori, durum)
+        veriler[anahtar] = veriler.get(anahtar, 0) + adet
+    if veriler:
+        connection.execute(_sayac.insert(), [
+            {'kategori': k, 'durum': d, 'adet': a} for (k, d), a in veriler.items()
+        ])
+    return len(veriler)
+
+
+def sayac_matrisi(connection=None):
+    """{kategori: {durum: adet}} matrisi (sadece sıfırdan büyük hücreler)"""
+    matris = {}
+    for kategori, durum, adet in (connection or db.session).execute(
+        db.select(_sayac.c.kategori, _sayac.c.durum, _sayac.c.adet)
+        .where(_sayac.c.adet > 0)
+    ):
+        matris.setdefault(kategori, {})[durum] = adet
+    return matris
+
+
+def kategori_sayilari(matris=None):
+    """{kategori: toplam adet}"""
+    if matris is None:
+        matris = sayac_matrisi()
+    return {k: sum(d.values()) for k, d in matris.items()}
+
+
+def istatistik_ozeti(matris=None):
+    """/api/istatistikler yanıtı: toplamlar, dağılımlar ve matris"""
+    if matris is None:
+        matris = sayac_matrisi()
+    durum_dagilim = {}
+    for durumlar in matris.values():
+        for durum, adet in durumlar.items():
+            durum_dagilim[durum] = durum_dagilim.get(durum, 0) + adet
+    return {
+        'toplam_ekipman': sum(durum_dagilim.values()),
+        'depodaki': durum_dagilim.get('Depoda', 0),
+        'kullanimda': durum_dagilim.get('Kullanımda', 0),
+        'arizali': durum_dagilim.get('Arızalı', 0),
+        'kategori_dagilim': kategori_sayilari(matris),
+        'durum_dagilim': durum_dagilim,
+        'kategori_durum_matrisi': matris
+    }
@@ -0,0 +1,136 @@
+"""
+Güncel zimmet projeksiyonu (ekipman_zimmet_guncel): her ekipman için son
+hareketten türetilen zimmetli kişi, personel no, birim ve lokasyon.
+Hareket yazımıyla aynı transaction içinde güncellenir, geçmişten yeniden
+kurulabilir. Depoya dönüş hareketleri (İade, Giriş) kişi bilgisini temizler.
+Ekipman silinince satırı veritabanında ON DELETE CASCADE ile silinir (Core
+silmeleri dahil).
+"""
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Ekipman, EkipmanHareket, EkipmanZimmet
+
+_zimmet = EkipmanZimmet.__table__
+_hareket = EkipmanHareket.__table__
+
+IADE_TIPLERI = ('İade', 'Giriş')
+KISI_ALANLARI = ('kullanici_adi', 'kullanici_personel_no')
+YER_ALANLARI = ('birim', 'lokasyon')
+
+
+def _satir(hareket):
+    """Hareket satırından (id + hareket kolonları) projeksiyon satırı üret"""
+    iade = hareket['hareket_tipi'] in IADE_TIPLERI
+    satir = {
+        'ekipman_id': hareket['ekipman_id'],
+        'hareket_id': hareket['id'],
+        'hareket_tipi': hareket['hareket_tipi'],
+        'tarih': hareket['tarih'],
+    }
+    for alan in KISI_ALANLARI:
+        satir[alan] = None if iade else hareket.get(alan)
+    for alan in YER_ALANLARI:
+        satir[alan] = hareket.get(alan)
+    return satir
+
+
+def _nesne_satiri(hareket):
+    alanlar = ('id', 'ekipman_id', 'hareket_tipi', 'tarih') + KISI_ALANLARI + YER_ALANLARI
+    return {k: getattr(hareket, k) for k in alanlar}
+
+
+def _upsert(connection):
+    insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    stmt = insert(_zimmet)
+    return stmt.on_conflict_do_update(
+        index_elements=[_zimmet.c.ekipman_id],
+        set_={k.name: stmt.excluded[k.name] for k in _zimmet.c if k.name != 'ekipman_id'},
+        # Geç gelen eski tarihli hareket (ör. toplu içe aktarma) güncel kaydı ezmez
+        where=db.tuple_(_zimmet.c.tarih, _zimmet.c.hareket_id)
+        <= db.tuple_(stmt.excluded.tarih, stmt.excluded.hareket_id)
+    )
+
+
+def zimmet_guncelle(connection, hareketler):
+    """
+    Verilen hareket satırlarını (id + hareket kolonları) projeksiyona uygula.
+    Aynı ekipmanın birden çok hareketi varsa sadece en sonuncusu yazılır.
+    """
+    son = {}
+    for hareket in hareketler:
+        anahtar = (hareket['tarih'], hareket['id'])
+        mevcut = son.get(hareket['ekipman_id'])
+        if mevcut is None or anahtar >= (mevcut['tarih'], mevcut['id']):
+            son[hareket['ekipman_id']] = hareket
+    if son:
+        connection.execute(_upsert(connection), [_satir(h) for h in son.values()])
+
+
+def ekipman_icin_yeniden_hesapla(connection, ekipman_id):
+    """Tek ekipmanın projeksiyonunu kalan geçmişinden (indeksli) yeniden kur"""
+    connection.execute(_zimmet.delete().where(_zimmet.c.ekipman_id == ekipman_id))
+    son = connection.execute(
+        db.select(_hareket).where(_hareket.c.ekipman_id == ekipman_id)
+        .order_by(_hareket.c.tarih.desc(), _hareket.c.id.desc()).limit(1)
+    ).first()
+    if son is not None:
+        connection.execute(_zimmet.insert(), [_satir(son._mapping)])
+
+
+@event.listens_for(EkipmanHareket, 'after_insert')
+def _hareket_eklendi(mapper, connection, target):
+    zimmet_guncelle(connection, [_nesne_satiri(target)])
+
+
+@event.listens_for(EkipmanHareket, 'after_delete')
+def _hareket_silindi(mapper, connection, target):
+    guncel = connection.execute(
+        db.select(_zimmet.c.hareket_id).where(_zimmet.c.ekipman_id == target.ekipman_id)
+    ).scalar()
+    if guncel == target.id:
+        ekipman_icin_yeniden_hesapla(connection, target.ekipman_id)
+
+
+def zimmet_yeniden_olustur(connection, batch_size=1000):
+    """Projeksiyonu hareket geçmişinden baştan kur. Yazılan satır sayısını döner"""
+    connection.execute(_zimmet.delete())
+    sira = db.func.row_number().over(
+        partition_by=_hareket.c.ekipman_id,
+        order_by=(_hareket.c.tarih.desc(), _hareket.c.id.desc())
+    ).label('sira')
+    alt = db.select(_hareket, sira).subquery()
+    sonuc = connection.execution_options(yield_per=batch_size).execute(
+        db.select(alt).where(alt.c.sira == 1)
+    )
+    toplam = 0
+    for parca in sonuc.partitions():
+        veriler = [_satir(satir._mapping) for satir in parca]
+        connection.execute(_zimmet.insert(), veriler)
+        toplam += len(veriler)
+    return toplam
+
+
+# Listelerde projeksiyona eklenen ekipman bilgileri
+EKIPMAN_ALANLARI = {
+    'kategori': Ekipman.kategori,
+    'marka': Ekipman.marka,
+    'model': Ekipman.model,
+    'seri_no': Ekipman.seri_no,
+    'barkod': Ekipman.barkod,
+    'durum': Ekipman.durum,
+}
+
+# Sorgu parametresi -> indeksli projeksiyon kolonu
+FILTRE_KOLONLARI = {
+    'personel_no': EkipmanZimmet.kullanici_personel_no,
+    'birim': EkipmanZimmet.birim,
+    'lokasyon': EkipmanZimmet.lokasyon,
+}
+
+
+def zimmet_filtreleri(args):
+    """personel_no / birim / lokasyon parametrelerinden filtre listesi"""
+    filtreler = [kolon == args[ad] for ad, kolon in FILTRE_KOLONLARI.items() if args.get(ad)]
+    if not filtreler:
+        return None
+    return filtreler + [EkipmanZimmet.ekipman_id == Ekipman.id]
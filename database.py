@@ -0,0 +1,181 @@
+"""
+Veritabanı engine profili: bağlantı havuzu, SQLite pragmaları (WAL,
+synchronous, busy_timeout, mmap, cache) ve SQLITE_BUSY durumunda yazma
+isteklerinin geri çekilmeli olarak yeniden denenmesi. PostgreSQL için
+DATABASE_URL ile sadece havuz ayarları uygulanır. Yabancı anahtarlar
+(ON DELETE CASCADE dahil) profil kapalıyken de her SQLite bağlantısında açıktır.
+"""
+import random
+import sqlite3
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from models import db
+import metrics
+
+# PostgreSQL'de yeniden denenebilir hatalar: serialization_failure, deadlock_detected
+_PG_TEKRAR_KODLARI = ('40001', '40P01')
+
+_tekrar_sayisi = 0
+
+
+def varsayilan_ayarlar(config):
+    """Profil ayarlarının varsayılanları (ortam değişkenleri app.py'de okunur)"""
+    config.setdefault('SQLITE_TUNING', True)
+    config.setdefault('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    config.setdefault('SQLITE_CACHE_SIZE_KB', 65536)
+    config.setdefault('SQLITE_MMAP_SIZE_MB', 256)
+    config.setdefault('DB_POOL_SIZE', 5)
+    config.setdefault('DB_MAX_OVERFLOW', 10)
+    config.setdefault('DB_WRITE_RETRIES', 5)
+    config.setdefault('DB_RETRY_BACKOFF_MS', 50)
+
+
+def veritabani_adresi(adres):
+    """Heroku tarzı postgres:// adreslerini SQLAlchemy'nin beklediği biçime çevir"""
+    if adres.startswith('postgres://'):
+        return 'postgresql://' + adres[len('postgres://'):]
+    return adres
+
+
+def _dosya_sqlite_mi(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def engine_secenekleri(config):
+    """SQLALCHEMY_ENGINE_OPTIONS için havuz ve bağlantı ayarları"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        if not _dosya_sqlite_mi(url) or not config['SQLITE_TUNING']:
+            # Bellek içi veritabanında Flask-SQLAlchemy StaticPool kullanır
+            return {}
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'connect_args': {
+                # sqlite3 modülünün kendi bekleme süresi; pragma ile aynı değer
+                'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                # Havuzdaki bağlantılar farklı istek thread'lerine verilebilir
+                'check_same_thread': False,
+            },
+        }
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+
+
+def _pragma_dinleyicisi(config):
+    pragmalar = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA cache_size={-int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE_MB']) * 1024 * 1024}",
+        'PRAGMA temp_store=MEMORY',
+    )
+
+    def baglandi(dbapi_baglantisi, baglanti_kaydi):
+        cursor = dbapi_baglantisi.cursor()
+        try:
+            for pragma in pragmalar:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    return baglandi
+
+
+def _yabanci_anahtarlari_ac(dbapi_baglantisi, baglanti_kaydi):
+    # SQLite yabancı anahtarları bağlantı başına ve varsayılan olarak kapalıdır
+    cursor = dbapi_baglantisi.cursor()
+    try:
+        cursor.execute('PRAGMA foreign_keys=ON')
+    finally:
+        cursor.close()
+
+
+def mesgul_hatasi_mi(hata):
+    """Kilit/çakışma kaynaklı, yeniden denenebilir hata mı?"""
+    orijinal = getattr(hata, 'orig', hata)
+    if isinstance(orijinal, sqlite3.OperationalError):
+        mesaj = str(orijinal).lower()
+        return 'locked' in mesaj or 'busy' in mesaj
+    return getattr(orijinal, 'pgcode', None) in _PG_TEKRAR_KODLARI
+
+
+def _hata_yakalandi(context):
+    """Görünümler hataları kendileri yakaladığı için meşgul durumu g'ye işaretlenir"""
+    if has_app_context() and mesgul_hatasi_mi(context.original_exception):
+        g.db_mesgul = True
+
+
+def _bekleme(deneme, taban):
+    """Üstel geri çekilme + rastgele sapma (aynı anda tekrar denemeyi önler)"""
+    return min(2.0, taban * (2 ** deneme)) * random.uniform(0.5, 1.0)
+
+
+def yazma_tekrar_dene(gorunum):
+    """
+    Yazma görünümünü SQLITE_BUSY / serileştirme hatasında baştan çalıştır.
+    Görünüm her denemede kendi işlemini geri alıp yeniden kurar; bu yüzden
+    sadece istek gövdesini tekrar okuyabilen (JSON) görünümlerde kullanılır.
+    """
+    @wraps(gorunum)
+    def sarmalayici(*args, **kwargs):
+        global _tekrar_sayisi
+        maks = current_app.config['DB_WRITE_RETRIES']
+        taban = current_app.config['DB_RETRY_BACKOFF_MS'] / 1000
+        deneme = 0
+        while True:
+            g.db_mesgul = False
+            try:
+                yanit = gorunum(*args, **kwargs)
+            except OperationalError as e:
+                db.session.rollback()
+                if not mesgul_hatasi_mi(e) or deneme >= maks:
+                    raise
+            else:
+                if not g.db_mesgul or deneme >= maks:
+                    return yanit
+                db.session.rollback()
+            time.sleep(_bekleme(deneme, taban))
+            deneme += 1
+            _tekrar_sayisi += 1
+    return sarmalayici
+
+
+def init_app(app):
+    """Engine profilini uygula ve db'yi uygulamaya bağla (db.init_app yerine)"""
+    varsayilan_ayarlar(app.config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = veritabani_adresi(app.config['SQLALCHEMY_DATABASE_URI'])
+    secenekler = engine_secenekleri(app.config)
+    secenekler.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = secenekler
+
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'handle_error', _hata_yakalandi)
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _yabanci_anahtarlari_ac)
+            if engine.dialect.name == 'sqlite' and app.config['SQLITE_TUNING'] \
+                    and _dosya_sqlite_mi(engine.url):
+                event.listen(engine, 'connect', _pragma_dinleyicisi(app.config))
+
+
+@metrics.toplayici_ekle
+def _metrikler():
+    yield ('stok_db_write_retries_total', 'counter',
+           'SQLITE_BUSY / serileştirme hatası sonrası yeniden denenen yazma istekleri',
+           [({}, _tekrar_sayisi)])
+    if has_app_context():
+        havuz = db.engine.pool
+        if hasattr(havuz, 'checkedout'):
+            yield ('stok_db_pool_checked_out', 'gauge',
+                   'Havuzdan alınmış bağlantı sayısı', [({}, havuz.checkedout())])
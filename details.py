@@ -0,0 +1,86 @@
+"""
+Ekipman + hareket geçmişi tek istekte (?include=hareketler).
+
+Geçmiş selectinload ile tek ek sorguda yüklenir; ekipman başına en fazla
+`hareket_limit` kayıt, istenen ekipmanların hareketleri üzerinde tek geçişte
+row_number() penceresiyle ((ekipman_id, tarih) indeksi) seçilir. Bir fazlası
+okunur: kesilen geçmiş `hareketler_kesildi` ile işaretlenir, ayrıca COUNT
+sorgusu gerekmez.
+"""
+from sqlalchemy.orm import aliased, selectinload
+from models import db, Ekipman, EkipmanHareket
+import serialization
+
+EKLER = ('hareketler',)
+VARSAYILAN_HAREKET_LIMITI = 20
+MAKS_HAREKET_LIMITI = 200
+# ?ids= ile tek istekte istenebilecek en fazla ekipman
+MAKS_ID = 100
+
+
+class DetayHatasi(ValueError):
+    """Geçersiz include / ids / hareket_limit parametresi"""
+
+
+def ekleri_oku(args):
+    """`include=a,b` parametresini doğrula"""
+    ekler = [e.strip() for e in args.get('include', '').split(',') if e.strip()]
+    bilinmeyen = [e for e in ekler if e not in EKLER]
+    if bilinmeyen:
+        raise DetayHatasi(f'Bilinmeyen include: {", ".join(bilinmeyen)}. Geçerli: {", ".join(EKLER)}')
+    return ekler
+
+
+def hareket_limiti(args):
+    limit = args.get('hareket_limit', VARSAYILAN_HAREKET_LIMITI, type=int)
+    if limit is None or limit < 1:
+        raise DetayHatasi('hareket_limit pozitif tam sayı olmalı.')
+    return min(limit, MAKS_HAREKET_LIMITI)
+
+
+def idleri_oku(deger):
+    """`ids=1,2,3` -> tekrarsız id listesi (sıra korunur)"""
+    try:
+        idler = list(dict.fromkeys(int(d) for d in deger.split(',') if d.strip()))
+    except ValueError:
+        raise DetayHatasi('ids virgülle ayrılmış tam sayılar olmalı.')
+    if not idler:
+        raise DetayHatasi('ids boş olamaz.')
+    if len(idler) > MAKS_ID:
+        raise DetayHatasi(f'Tek istekte en fazla {MAKS_ID} ekipman istenebilir.')
+    return idler
+
+
+def _son_hareketler(idler, limit):
+    """Her ekipmanın en yeni `limit` hareketini seçen yükleme kriteri"""
+    h = aliased(EkipmanHareket)
+    sira = db.func.row_number().over(
+        partition_by=h.ekipman_id, order_by=(h.tarih.desc(), h.id.desc())
+    ).label('sira')
+    sirali = db.select(h.id, sira).where(h.ekipman_id.in_(idler)).subquery()
+    return EkipmanHareket.id.in_(db.select(sirali.c.id).where(sirali.c.sira <= limit))
+
+
+def ekipmanlari_getir(idler, hareketler=False, limit=VARSAYILAN_HAREKET_LIMITI):
+    """
+    Ekipmanları istenen sırayla döndür (bulunamayanlar atlanır). hareketler
+    True ise geçmiş 2 sorguda yüklenir: ekipmanlar + tüm geçmişler.
+    """
+    sorgu = db.select(Ekipman).where(Ekipman.id.in_(idler))
+    if hareketler:
+        # limit + 1: kesilip kesilmediği anlaşılsın
+        sorgu = sorgu.options(
+            selectinload(Ekipman.hareketler.and_(_son_hareketler(idler, limit + 1)))
+        )
+    bulunan = {e.id: e for e in db.session.scalars(sorgu)}
+    return [bulunan[i] for i in idler if i in bulunan]
+
+
+def ekipman_detayi(ekipman, ekler, limit=VARSAYILAN_HAREKET_LIMITI):
+    """Ekipman alanları + istenen ekler"""
+    veri = serialization.EKIPMAN.nesne(ekipman)
+    if 'hareketler' in ekler:
+        gecmis = sorted(ekipman.hareketler, key=lambda h: (h.tarih, h.id), reverse=True)
+        veri['hareketler'] = [serialization.HAREKET.nesne(h) for h in gecmis[:limit]]
+        veri['hareketler_kesildi'] = len(gecmis) > limit
+    return veri
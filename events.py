@@ -0,0 +1,366 @@
+"""
+Değişiklik olay akışı (/api/olaylar, Server-Sent Events).
+
+Olaylar ORM flush'ından (after_flush) ve ORM'i atlayan Core yazımlarından
+(olay_ekle) toplanır ve olay_gunlugu tablosuna değişikliğin kendi
+transaction'ında yazılır. Geri alınan değişiklik olay üretmez. Tablonun
+artan `sira` kolonu SSE `id` alanıdır; istemci Last-Event-ID ile kaldığı
+yerden devam eder.
+
+Her uygulamanın kendi Broker'ı vardır (app.extensions['olaylar']) ve
+current_app üzerinden bulunur; aynı süreçteki uygulamalar birbirinin
+veritabanından okumaz. Broker'ın tek thread'i arka uçtan yeni olayları alıp bu
+süreçteki tüm SSE bağlantılarına dağıtır. Varsayılan arka uç
+(VeritabaniArkaUcu) tabloyu yoklar; ek altyapı olmadan gunicorn işçileri
+arasında çalışır. Başka bir arka uç (ör. Redis pub/sub) aynı metodları
+(son_sira, olaylar, en_eski_sira, buda) sağlayarak init_app'e verilebilir.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import date, datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, insert, text
+from sqlalchemy.orm import Session
+from models import db, Ekipman, EkipmanHareket, Kategori, Olay
+import counters
+import metrics
+
+logger = logging.getLogger(__name__)
+
+IZLENEN = {Ekipman: 'ekipman', EkipmanHareket: 'hareket', Kategori: 'kategori'}
+# Bu varlıklardaki değişiklikler sayaçları etkiler; olaya güncel sayaçlar eklenir
+SAYAC_VARLIKLARI = ('ekipman', 'hareket')
+
+_BEKLEYEN = 'bekleyen_olaylar'
+_YAZILDI = 'olay_yazildi'
+# PostgreSQL: olay ekleyen transaction'lar commit sırasıyla sira alsın
+_PG_KILIT_ANAHTARI = 726351
+
+_olay = Olay.__table__
+
+
+def _json_deger(deger):
+    if isinstance(deger, (datetime, date)):
+        return deger.isoformat()
+    return deger
+
+
+def olay_ekle(varlik, id, islem, alanlar=None):
+    """ORM flush'ını atlayan yazımlar için olayı mevcut transaction'a ekle"""
+    db.session.info.setdefault(_BEKLEYEN, []).append({
+        'varlik': varlik, 'id': id, 'islem': islem,
+        'alanlar': {k: _json_deger(v) for k, v in (alanlar or {}).items()},
+    })
+
+
+def _degisen_alanlar(nesne):
+    durum = inspect(nesne)
+    alanlar = {}
+    for kolon in durum.mapper.column_attrs:
+        gecmis = durum.attrs[kolon.key].history
+        if gecmis.has_changes():
+            alanlar[kolon.key] = _json_deger(getattr(nesne, kolon.key))
+    return alanlar
+
+
+def olaylari_yaz(connection, olaylar):
+    """
+    Olayları verilen bağlantının transaction'ında olay_gunlugu'na yaz.
+    Session dışı Core yazımları (ör. arşivleme) da bununla olay üretir.
+    """
+    if any(o['varlik'] in SAYAC_VARLIKLARI for o in olaylar):
+        # Sayaçlar mapper olaylarıyla aynı flush'ta güncellendi; son hali eklenir
+        ozet = counters.istatistik_ozeti(counters.sayac_matrisi(connection))
+        olaylar[-1]['sayaclar'] = {k: ozet[k] for k in (
+            'toplam_ekipman', 'depodaki', 'kullanimda', 'arizali', 'kategori_dagilim'
+        )}
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:k)'), {'k': _PG_KILIT_ANAHTARI})
+    connection.execute(insert(_olay), [
+        {'veri': json.dumps(o, ensure_ascii=False, separators=(',', ':'))} for o in olaylar
+    ])
+
+
+def _yaz(session):
+    """Bekleyen olayları olay_gunlugu'na yaz (aynı transaction)"""
+    olaylar = session.info.pop(_BEKLEYEN, None)
+    if not olaylar:
+        return
+    olaylari_yaz(session.connection(), olaylar)
+    session.info[_YAZILDI] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    olaylar = session.info.setdefault(_BEKLEYEN, [])
+    for nesne in session.new:
+        varlik = IZLENEN.get(type(nesne))
+        if varlik:
+            olaylar.append({'varlik': varlik, 'id': nesne.id, 'islem': 'eklendi',
+                            'alanlar': nesne.to_dict()})
+    for nesne in session.dirty:
+        varlik = IZLENEN.get(type(nesne))
+        if varlik:
+            alanlar = _degisen_alanlar(nesne)
+            if alanlar:
+                olaylar.append({'varlik': varlik, 'id': nesne.id, 'islem': 'guncellendi',
+                                'alanlar': alanlar})
+    for nesne in session.deleted:
+        varlik = IZLENEN.get(type(nesne))
+        if varlik:
+            olaylar.append({'varlik': varlik, 'id': nesne.id, 'islem': 'silindi', 'alanlar': {}})
+    _yaz(session)
+
+
+@event.listens_for(Session, 'before_commit')
+def _commit_oncesi(session):
+    # flush'sız Core yazımlarından kalan olaylar
+    _yaz(session)
+
+
+# Olay yazılan her commit'ten sonra çağrılır (süreç içi önbellekler için)
+_commit_dinleyicileri = []
+
+
+def commit_dinleyicisi_ekle(fonksiyon):
+    """Olay yazan commit sonrası çağrılacak fonksiyonu kaydet (dekoratör olarak da)"""
+    _commit_dinleyicileri.append(fonksiyon)
+    return fonksiyon
+
+
+def olaylar_yazildi():
+    """Session dışı bir transaction olay yazıp commit edildikten sonra çağrılır"""
+    for dinleyici in _commit_dinleyicileri:
+        dinleyici()
+    broker = current_app.extensions.get('olaylar') if has_app_context() else None
+    if broker is not None:
+        broker.uyandir()
+        broker.gerekirse_buda()
+
+
+@event.listens_for(Session, 'after_commit')
+def _commit_sonrasi(session):
+    if session.info.pop(_YAZILDI, False):
+        olaylar_yazildi()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _geri_alindi(session):
+    session.info.pop(_BEKLEYEN, None)
+    session.info.pop(_YAZILDI, None)
+
+
+# --- Arka uç ve dağıtım ---
+
+class VeritabaniArkaUcu:
+    """olay_gunlugu tablosunu yoklayan arka uç (süreçler arası, ek altyapısız)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _baglanti(self):
+        with self.app.app_context():
+            return db.engine.connect()
+
+    def son_sira(self):
+        with self._baglanti() as connection:
+            return connection.execute(db.select(db.func.max(_olay.c.sira))).scalar() or 0
+
+    def en_eski_sira(self):
+        with self._baglanti() as connection:
+            return connection.execute(db.select(db.func.min(_olay.c.sira))).scalar()
+
+    def olaylar(self, sonra, limit=500):
+        """sira > sonra olan olaylar: [(sira, json metni)]"""
+        with self._baglanti() as connection:
+            return connection.execute(
+                db.select(_olay.c.sira, _olay.c.veri).where(_olay.c.sira > sonra)
+                .order_by(_olay.c.sira).limit(limit)
+            ).all()
+
+    def buda(self, saklanacak):
+        """En yeni `saklanacak` olay dışındakileri sil; silinen sayısını döner"""
+        with self._baglanti() as connection:
+            son = connection.execute(db.select(db.func.max(_olay.c.sira))).scalar()
+            if son is None or son <= saklanacak:
+                return 0
+            silinen = connection.execute(
+                _olay.delete().where(_olay.c.sira <= son - saklanacak)
+            ).rowcount
+            connection.commit()
+            return silinen
+
+
+# Abone kuyruğu taşarsa (çok yavaş istemci) gönderilen işaret
+TASMA = (None, None)
+
+
+class Broker:
+    """Süreç içi dağıtıcı: tek yoklama thread'i, her SSE bağlantısına bir kuyruk"""
+
+    def __init__(self, arka_uc, aralik=0.5, saklanacak=10000, kuyruk_boyu=1000,
+                 budama_araligi=60):
+        self.arka_uc = arka_uc
+        self.aralik = aralik
+        self.saklanacak = saklanacak
+        self.budama_araligi = budama_araligi
+        self.kuyruk_boyu = kuyruk_boyu
+        self._aboneler = set()
+        self._kilit = threading.Lock()
+        self._uyari = threading.Event()
+        self._thread = None
+        self._son_sira = None
+        self._son_budama = float('-inf')
+
+    def abone_ol(self):
+        kuyruk = queue.Queue(maxsize=self.kuyruk_boyu)
+        with self._kilit:
+            self._aboneler.add(kuyruk)
+            if self._thread is None:
+                self._son_sira = self.arka_uc.son_sira()
+                self._thread = threading.Thread(target=self._calis, name='olay-broker', daemon=True)
+                self._thread.start()
+        return kuyruk
+
+    def ayril(self, kuyruk):
+        with self._kilit:
+            self._aboneler.discard(kuyruk)
+
+    def abone_sayisi(self):
+        return len(self._aboneler)
+
+    def uyandir(self):
+        """Bu süreçte commit edilen olaylar yoklama aralığı beklenmeden dağıtılır"""
+        self._uyari.set()
+
+    def gerekirse_buda(self):
+        """
+        Olay yazan commit'ten sonra çağrılır: günlük abone olsun olmasın
+        büyümesin diye süreç başına en fazla budama_araligi'nda bir budanır.
+        """
+        simdi = time.monotonic()
+        with self._kilit:
+            if simdi - self._son_budama < self.budama_araligi:
+                return
+            self._son_budama = simdi
+        try:
+            self.arka_uc.buda(self.saklanacak)
+        except Exception:
+            # Budama yazımı etkilemez; sonraki aralıkta tekrar denenir
+            logger.exception('Olay günlüğü budanamadı')
+
+    def _dagit(self, olaylar):
+        with self._kilit:
+            aboneler = list(self._aboneler)
+        for kuyruk in aboneler:
+            for olay in olaylar:
+                try:
+                    kuyruk.put_nowait(olay)
+                except queue.Full:
+                    # İstemci yeniden bağlanıp Last-Event-ID ile devam eder
+                    self.ayril(kuyruk)
+                    with kuyruk.mutex:
+                        kuyruk.queue.clear()
+                    kuyruk.put_nowait(TASMA)
+                    break
+
+    def _calis(self):
+        while True:
+            self._uyari.wait(self.aralik)
+            self._uyari.clear()
+            if not self._aboneler:
+                continue
+            try:
+                while True:
+                    olaylar = self.arka_uc.olaylar(self._son_sira)
+                    if not olaylar:
+                        break
+                    self._son_sira = olaylar[-1][0]
+                    self._dagit(olaylar)
+            except Exception:
+                logger.exception('Olay yoklama hatası')
+
+
+def aktif_broker():
+    """Geçerli uygulamanın Broker'ı (app context içinde)"""
+    return current_app.extensions['olaylar']
+
+
+def son_sira():
+    """
+    Son olayın sırası: olay üreten her commit'te artar. Tablo boyutundan
+    bağımsız (PK üzerinde MAX) bir veri sürümü olarak kullanılır.
+    """
+    return aktif_broker().arka_uc.son_sira()
+
+
+def _sse(sira, veri):
+    return f'id: {sira}\ndata: {veri}\n\n'
+
+
+def akis(son_sira, ping_araligi=15):
+    """
+    SSE gövdesi üreteci. son_sira verilirse (Last-Event-ID) aradaki olaylar
+    önce günlükten gönderilir; günlükte artık yoksa istemciye yeniden
+    yükleme olayı gönderilir. Broker üreteç oluşturulurken (istek içinde)
+    alınır; gövde app context dışında akar.
+    """
+    return _akis(aktif_broker(), son_sira, ping_araligi)
+
+
+def _akis(broker, son_sira, ping_araligi):
+    kuyruk = broker.abone_ol()
+    arka_uc = broker.arka_uc
+    try:
+        yield 'retry: 3000\n\n'
+        if son_sira is None:
+            son_sira = arka_uc.son_sira()
+        else:
+            en_eski = arka_uc.en_eski_sira()
+            if en_eski is not None and son_sira < en_eski - 1:
+                yield 'event: yeniden-yukle\ndata: {}\n\n'
+                son_sira = arka_uc.son_sira()
+            while True:
+                olaylar = arka_uc.olaylar(son_sira)
+                if not olaylar:
+                    break
+                for sira, veri in olaylar:
+                    yield _sse(sira, veri)
+                son_sira = olaylar[-1][0]
+
+        while True:
+            try:
+                sira, veri = kuyruk.get(timeout=ping_araligi)
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            if sira is None:
+                yield 'event: yeniden-yukle\ndata: {}\n\n'
+                return
+            if sira <= son_sira:
+                continue  # geçmişten zaten gönderildi
+            son_sira = sira
+            yield _sse(sira, veri)
+    finally:
+        broker.ayril(kuyruk)
+
+
+def init_app(app, arka_uc=None):
+    app.extensions['olaylar'] = Broker(
+        arka_uc or VeritabaniArkaUcu(app),
+        aralik=app.config.get('OLAY_YOKLAMA_ARALIGI', 0.5),
+        saklanacak=app.config.get('OLAY_SAKLAMA_ADEDI', 10000),
+        budama_araligi=app.config.get('OLAY_BUDAMA_ARALIGI', 60),
+    )
+
+
+@metrics.toplayici_ekle
+def _olay_metrikleri():
+    broker = current_app.extensions.get('olaylar')
+    if broker is not None:
+        yield ('stok_sse_subscribers', 'gauge',
+               'Bu süreçteki açık /api/olaylar bağlantıları', [({}, broker.abone_sayisi())])
@@ -0,0 +1,324 @@
+"""
+Envanter dışa aktarma motorları (Excel, PDF) ve dosya akışı yardımcıları.
+
+openpyxl ve reportlab ilk dışa aktarmada yüklenir: uygulama, init_db.py ve
+işçi süreçlerinin açılışı bu kütüphanelerin maliyetini ödemez.
+"""
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+from flask import Response
+from models import db, Ekipman
+import search
+
+EXPORT_BATCH_SIZE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PDF_MIMETYPE = 'application/pdf'
+
+# format -> (dosya uzantısı, mimetype)
+FORMATLAR = {
+    'excel': ('xlsx', XLSX_MIMETYPE),
+    'pdf': ('pdf', PDF_MIMETYPE),
+}
+
+# Dışa aktarılan kolonlar (sıra önemli)
+EXPORT_KOLONLARI = (
+    Ekipman.id, Ekipman.kategori, Ekipman.marka, Ekipman.model,
+    Ekipman.seri_no, Ekipman.durum, Ekipman.temin_tarihi,
+    Ekipman.temin_fiyati, Ekipman.tedarikci, Ekipman.notlar,
+    Ekipman.olusturma_tarihi,
+)
+
+EXCEL_BASLIKLAR = ["ID", "Kategori", "Marka", "Model", "Seri No", "Durum",
+                   "Temin Tarihi", "Temin Fiyatı (₺)", "Tedarikçi", "Notlar", "Eklenme Tarihi"]
+EXCEL_GENISLIKLER = [6, 15, 15, 20, 20, 12, 15, 18, 20, 30, 20]
+DURUM_KOLONU = 5  # 0 tabanlı
+
+# Durum renk kodları
+DURUM_RENK = {
+    "Depoda":     "D4EDDA",
+    "Kullanımda": "CCE5FF",
+    "Arızalı":    "FFF3CD",
+    "Hurda":      "F8D7DA",
+}
+
+
+def ekipman_satirlari(filtreler=(), batch_size=EXPORT_BATCH_SIZE):
+    """
+    Filtrelenmiş ekipmanları id sırasıyla, ORM nesnesi oluşturmadan
+    yield_per ile parça parça okuyarak tuple olarak üret.
+    """
+    sorgu = db.select(*EXPORT_KOLONLARI).where(*filtreler).order_by(Ekipman.id)
+    sonuc = db.session.execute(sorgu.execution_options(yield_per=batch_size))
+    for parca in sonuc.partitions():
+        yield from parca
+
+
+def _tarih(deger):
+    return deger.strftime('%d.%m.%Y') if deger else ''
+
+
+def _excel_stilleri(wb):
+    """Tüm hücreler için paylaşılan, bir kez kaydedilen stiller"""
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+
+    def dolgu(renk):
+        return PatternFill(start_color=renk, end_color=renk, fill_type="solid")
+
+    def stil(ad, **kwargs):
+        wb.add_named_style(NamedStyle(name=ad, **kwargs))
+        return ad
+
+    orta = Alignment(vertical="center")
+    return {
+        'baslik': stil('baslik', font=Font(bold=True, color="FFFFFF", size=11),
+                       fill=dolgu("8B0000"),
+                       alignment=Alignment(horizontal="center", vertical="center")),
+        'normal': stil('normal_satir', alignment=orta),
+        'zebra': stil('zebra_satir', alignment=orta, fill=dolgu("F9F9F9")),
+        'durum': {durum: stil(f'durum_{i}', alignment=orta, fill=dolgu(renk))
+                  for i, (durum, renk) in enumerate(DURUM_RENK.items())},
+        'durum_bos': stil('durum_bos', alignment=orta, fill=dolgu("FFFFFF")),
+    }
+
+
+def excel_yaz(satirlar, hedef, toplam=None, ilerleme=None):
+    """
+    Satırları write-only çalışma sayfasına akıt ve `hedef` dosya yoluna
+    kaydet. Bellek kullanımı satır sayısından bağımsızdır.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Envanter")
+    stiller = _excel_stilleri(wb)
+
+    for col_idx, width in enumerate(EXCEL_GENISLIKLER, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    ws.row_dimensions[1].height = 25
+    ws.freeze_panes = "A2"
+
+    def hucre(deger, stil):
+        cell = WriteOnlyCell(ws, value=deger)
+        cell.style = stil
+        return cell
+
+    ws.append([hucre(b, stiller['baslik']) for b in EXCEL_BASLIKLAR])
+
+    for row_idx, (id, kategori, marka, model, seri_no, durum, temin_tarihi,
+                  temin_fiyati, tedarikci, notlar, olusturma) in enumerate(satirlar, start=2):
+        satir_stili = stiller['zebra'] if row_idx % 2 == 0 else stiller['normal']
+        durum_stili = stiller['durum'].get(durum, stiller['durum_bos'])
+        degerler = (
+            id, kategori, marka or '', model or '', seri_no or '', durum,
+            _tarih(temin_tarihi), temin_fiyati or '', tedarikci or '',
+            notlar or '', _tarih(olusturma)
+        )
+        ws.append([
+            hucre(deger, durum_stili if col == DURUM_KOLONU else satir_stili)
+            for col, deger in enumerate(degerler)
+        ])
+        if ilerleme and toplam and row_idx % EXPORT_BATCH_SIZE == 0:
+            ilerleme(min((row_idx - 1) / toplam, 1.0))
+
+    wb.save(hedef)
+
+
+# Türkçe karakter destekli font: önce yapılandırılan yol, sonra macOS'taki
+# Arial Unicode, en son depoyla gelen DejaVu Sans denenir.
+PDF_FONT_ADI = 'EnvanterFont'
+_MACOS_FONT = '/System/Library/Fonts/Supplemental/Arial Unicode.ttf'
+_GOMULU_FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'static', 'fonts', 'DejaVuSans.ttf')
+_font = None
+_font_kilidi = threading.Lock()
+
+
+def pdf_fontu(font_yolu=None):
+    """Fontu ilk kullanımda bir kez kaydet ve adını döndür"""
+    global _font
+    if _font:
+        return _font
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    with _font_kilidi:
+        if _font:
+            return _font
+        for aday in (font_yolu, _MACOS_FONT, _GOMULU_FONT):
+            if aday and os.path.exists(aday):
+                pdfmetrics.registerFont(TTFont(PDF_FONT_ADI, aday))
+                _font = PDF_FONT_ADI
+                break
+        else:
+            # Son çare: yerleşik font (Türkçe karakterler eksik görünebilir)
+            _font = 'Helvetica'
+    return _font
+
+
+PDF_BASLIKLAR = ['ID', 'Kategori', 'Marka', 'Model', 'Seri No', 'Durum', 'Temin Tarihi', 'Fiyat (₺)']
+# Kolon genişlikleri (cm)
+PDF_GENISLIKLER_CM = [1.2, 3.5, 3, 4, 4, 2.8, 3, 2.5]
+PDF_SATIR_YUKSEKLIGI = 18
+# SimpleDocTemplate çerçevesinin iç boşluğu (üst + alt, pt)
+_PDF_CERCEVE_BOSLUGU = 12
+
+
+def _pdf_tablo_stili(font):
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('BACKGROUND',     (0, 0), (-1, 0),  colors.HexColor('#8B0000')),
+        ('TEXTCOLOR',      (0, 0), (-1, 0),  colors.white),
+        ('FONTNAME',       (0, 0), (-1, -1), font),
+        ('FONTSIZE',       (0, 0), (-1, 0),  9),
+        ('FONTSIZE',       (0, 1), (-1, -1), 8),
+        ('ALIGN',          (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN',         (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#FFF8F8')]),
+        ('GRID',           (0, 0), (-1, -1), 0.4, colors.HexColor('#DDDDDD')),
+    ])
+
+
+def _pdf_satiri(satir):
+    id, kategori, marka, model, seri_no, durum, temin_tarihi, temin_fiyati = satir[:8]
+    return [
+        str(id), kategori or '', marka or '', model or '', seri_no or '',
+        durum or '', _tarih(temin_tarihi),
+        f'{temin_fiyati:,.0f}' if temin_fiyati else ''
+    ]
+
+
+def pdf_parca_satir(yukseklik):
+    """
+    `yukseklik` pt'ye başlık satırıyla birlikte sığan veri satırı sayısı.
+    Çift tutulur ki zebra renkleri parçalar arasında kaymasın.
+    """
+    adet = int((yukseklik - _PDF_CERCEVE_BOSLUGU) // PDF_SATIR_YUKSEKLIGI) - 1
+    return max(adet - adet % 2, 2)
+
+
+def _pdf_tablolari(satirlar, stil, ilk_parca, parca_boyu):
+    """
+    Satırları sabit yükseklikli, her biri bir sayfayı dolduran Table
+    parçalarına böl (ilk parça başlığın altında kalan alana göre). Her parça
+    ayrı bir Table olur, böylece reportlab düzen maliyeti toplam satır
+    sayısıyla doğrusal kalır.
+    """
+    parca, sinir = [], ilk_parca
+    for satir in satirlar:
+        parca.append(_pdf_satiri(satir))
+        if len(parca) == sinir:
+            yield _pdf_tablo(parca, stil)
+            parca, sinir = [], parca_boyu
+    if parca:
+        yield _pdf_tablo(parca, stil)
+
+
+def _pdf_tablo(parca, stil):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Table
+
+    # repeatRows: parça yine de bölünürse devamı da başlıkla başlar
+    tbl = Table([PDF_BASLIKLAR] + parca, colWidths=[g * cm for g in PDF_GENISLIKLER_CM],
+                rowHeights=PDF_SATIR_YUKSEKLIGI, repeatRows=1)
+    tbl.setStyle(stil)
+    return tbl
+
+
+def pdf_yaz(satirlar, hedef, toplam, font_yolu=None, ilerleme=None):
+    """
+    Satırları sayfa boyutunda tablo parçalarıyla PDF olarak `hedef`
+    dosyasına yaz. `ilerleme(oran)` verilirse 0..1 arası çağrılır.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+    font = pdf_fontu(font_yolu)
+    doc = SimpleDocTemplate(hedef, pagesize=landscape(A4),
+                            leftMargin=1*cm, rightMargin=1*cm,
+                            topMargin=1.5*cm, bottomMargin=1.5*cm)
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('title', parent=styles['Title'],
+                                 fontName=font,
+                                 fontSize=14, textColor=colors.HexColor('#8B0000'),
+                                 spaceAfter=6)
+    sub_style = ParagraphStyle('sub', parent=styles['Normal'],
+                               fontName=font,
+                               fontSize=9, textColor=colors.grey, spaceAfter=12)
+
+    elements = [
+        Paragraph('Galatasaray Üniversitesi - Bilgi İşlem', title_style),
+        Paragraph(f'Envanter Listesi  |  {datetime.now().strftime("%d.%m.%Y %H:%M")}  |  '
+                  f'Toplam: {toplam} ekipman', sub_style),
+    ]
+    baslik = sum(p.wrap(doc.width, doc.height)[1] + p.getSpaceBefore() + p.getSpaceAfter()
+                 for p in elements)
+    elements.extend(_pdf_tablolari(satirlar, _pdf_tablo_stili(font),
+                                   pdf_parca_satir(doc.height - baslik),
+                                   pdf_parca_satir(doc.height)))
+
+    if ilerleme:
+        adim = max(len(elements), 1)
+
+        def geri_cagir(tip, deger):
+            if tip == 'PROGRESS':
+                ilerleme(min(deger / adim, 1.0))
+        doc.setProgressCallBack(geri_cagir)
+
+    doc.build(elements)
+
+
+def uret(format, args, hedef, font_yolu=None, ilerleme=None):
+    """`args` filtreleriyle envanteri verilen formatta `hedef` yoluna yaz"""
+    if format not in FORMATLAR:
+        raise ValueError(f'Desteklenmeyen format: {format}')
+    filtreler = search.ekipman_filtreleri(args)
+    toplam = db.session.query(db.func.count(Ekipman.id)).filter(*filtreler).scalar()
+    satirlar = ekipman_satirlari(filtreler)
+    if format == 'excel':
+        excel_yaz(satirlar, hedef, toplam, ilerleme=ilerleme)
+    else:
+        pdf_yaz(satirlar, hedef, toplam, font_yolu=font_yolu, ilerleme=ilerleme)
+
+
+def gecici_dosya(sonek):
+    """Dışa aktarma için silinmesi çağırana ait geçici dosya yolu"""
+    fd, yol = tempfile.mkstemp(prefix='envanter_', suffix=sonek)
+    os.close(fd)
+    return yol
+
+
+def dosya_akisi(yol, mimetype, download_name, sil=True):
+    """Dosyayı parça parça yanıt olarak akıt; istenirse sonunda sil"""
+    def parcalar():
+        try:
+            with open(yol, 'rb') as f:
+                while True:
+                    parca = f.read(STREAM_CHUNK_SIZE)
+                    if not parca:
+                        break
+                    yield parca
+        finally:
+            if sil:
+                os.remove(yol)
+
+    response = Response(parcalar(), mimetype=mimetype, direct_passthrough=True)
+    response.headers['Content-Length'] = str(os.path.getsize(yol))
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    return response
+
+
+def dosya_adi(uzanti):
+    return f'envanter_{datetime.now().strftime("%Y%m%d_%H%M")}.{uzanti}'
@@ -0,0 +1,147 @@
+"""
+Koşullu GET (ETag / Last-Modified) ve yanıt sıkıştırma.
+
+Tablo geneli listelerin doğrulayıcısı olay günlüğünün son sırasıdır: ekipman,
+hareket ve kategori yazımlarının hepsi (ORM, Core, toplu, arşivleme) aynı
+transaction'da olay yazar, son sıra PK üzerinde MAX ile tablo boyutundan
+bağımsız okunur. Tek satırlık uçlar satırın kendi damgasını kullanır.
+If-None-Match eşleşirse görünüm fonksiyonu hiç çağrılmaz: satır yüklenmez,
+JSON üretilmez.
+"""
+import gzip
+import hashlib
+from functools import wraps
+
+from flask import Response, make_response, request
+from models import db, Ekipman, EkipmanHareket, EkipmanZimmet
+import categories
+import events
+
+try:
+    import brotli
+except ImportError:  # opsiyonel bağımlılık
+    brotli = None
+
+# Bu boyuttan küçük yanıtlar sıkıştırılmaz (bayt)
+SIKISTIRMA_ESIGI = 1024
+SIKISTIRILABILIR = ('application/json', 'text/plain', 'text/csv', 'application/x-ndjson')
+
+
+# --- Sürüm damgaları: (damga metni, son değişiklik zamanı veya None) ---
+
+def veri_damgasi():
+    """Tablo geneli uçlar için: olay günlüğünün son sırası (O(1))"""
+    return f'v{events.son_sira()}', None
+
+
+def ekipman_satir_damgasi(id):
+    """Tek ekipman için: satırın kendi guncelleme_tarihi (PK araması)"""
+    son_guncelleme = db.session.query(Ekipman.guncelleme_tarihi).filter(Ekipman.id == id).scalar()
+    return f'r{id}.{son_guncelleme.isoformat() if son_guncelleme else ""}', son_guncelleme
+
+
+def ekipman_hareket_damgasi(id):
+    """Tek ekipmanın hareketleri: (ekipman_id, tarih) indeksinde aralık"""
+    adet, son_id, son_tarih = db.session.query(
+        db.func.count(EkipmanHareket.id), db.func.max(EkipmanHareket.id),
+        db.func.max(EkipmanHareket.tarih)
+    ).filter(EkipmanHareket.ekipman_id == id).one()
+    return f'h{id}.{adet}.{son_id}', son_tarih
+
+
+def ekipman_detay_damgasi(id):
+    """Tek ekipman; ?include=hareketler varsa o ekipmanın hareketleri de"""
+    if 'hareketler' in request.args.get('include', ''):
+        return damgalar(lambda: ekipman_satir_damgasi(id), lambda: ekipman_hareket_damgasi(id))()
+    return ekipman_satir_damgasi(id)
+
+
+def zimmet_satir_damgasi(id):
+    """Tek ekipmanın zimmeti: projeksiyondaki kaynak hareket id'si (PK araması)"""
+    son_hareket, tarih = db.session.query(
+        EkipmanZimmet.hareket_id, EkipmanZimmet.tarih
+    ).filter(EkipmanZimmet.ekipman_id == id).first() or (None, None)
+    return f'z{id}.{son_hareket or ""}', tarih
+
+
+def kategori_damgasi():
+    return f'k{categories.aktif_kayit().surum()}', None
+
+
+def damgalar(*fonksiyonlar):
+    """Birden çok damgayı tek damgada birleştir"""
+    def birlesik():
+        sonuclar = [f() for f in fonksiyonlar]
+        tarihler = [t for _, t in sonuclar if t]
+        return '|'.join(d for d, _ in sonuclar), (max(tarihler) if tarihler else None)
+    return birlesik
+
+
+def kosullu_get(damga_fonksiyonu):
+    """
+    GET görünümünü ETag ile sar. Damga istek yolu ve sorgu parametreleriyle
+    birleştirilip özetlenir; istemcinin ETag'i eşleşirse 304 döner.
+    """
+    def dekorator(gorunum):
+        @wraps(gorunum)
+        def sarmalayici(*args, **kwargs):
+            damga, son_degisiklik = damga_fonksiyonu(**kwargs) if kwargs else damga_fonksiyonu()
+            sorgu = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+            etag = hashlib.sha1(f'{request.path}?{sorgu}#{damga}'.encode()).hexdigest()[:20]
+
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = gorunum(*args, **kwargs)
+                if not isinstance(response, Response):
+                    response = make_response(response)
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if son_degisiklik:
+                response.last_modified = son_degisiklik
+            # Tarayıcı önbelleği tutsun ama her seferinde doğrulasın
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return sarmalayici
+    return dekorator
+
+
+# --- Sıkıştırma ---
+
+def _kodlama_sec(accept_encoding):
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+
+def sikistir(response):
+    """Büyük metin/JSON yanıtlarını gzip veya (varsa) brotli ile sıkıştır"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.mimetype not in SIKISTIRILABILIR):
+        return response
+
+    kodlama = _kodlama_sec(request.accept_encodings)
+    response.vary.add('Accept-Encoding')
+    if kodlama is None:
+        return response
+
+    govde = response.get_data()
+    if len(govde) < SIKISTIRMA_ESIGI:
+        return response
+
+    if kodlama == 'br':
+        govde = brotli.compress(govde, quality=5)
+    else:
+        govde = gzip.compress(govde, compresslevel=6)
+    response.set_data(govde)
+    response.headers['Content-Encoding'] = kodlama
+    return response
+
+
+def init_app(app):
+    app.after_request(sikistir)
@@ -0,0 +1,116 @@
+"""
+Idempotency-Key desteği: aynı anahtarla tekrarlanan yazma isteği yeniden
+işlenmez, ilk isteğin saklanan yanıtı döner. Anahtar, saklanan yanıt ve
+görünümün yazımları tek transaction'da commit edilir: görünüm commit yerine
+islemi_bitir() çağırır, anahtarlı istekte bu sadece flush eder ve commit'i
+yanıtı kaydeden sarmalayıcı yapar. İstek başarısız olursa ya da süreç
+arada ölürse hiçbiri kalıcı olmaz ve istek aynı anahtarla tekrar denenebilir.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, g, jsonify, make_response, request
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKaydi
+
+BASLIK = 'Idempotency-Key'
+MAKS_ANAHTAR_UZUNLUGU = 200
+# Süresi dolan kayıtlar en fazla bu aralıkla (sn) temizlenir
+TEMIZLIK_ARALIGI = 60
+
+_son_temizlik = 0.0
+
+
+def _istek_ozeti():
+    ozet = hashlib.sha256(f'{request.method} {request.path}\n'.encode())
+    ozet.update(request.get_data())
+    return ozet.hexdigest()
+
+
+def _sinir():
+    return datetime.utcnow() - timedelta(hours=current_app.config.get('IDEMPOTENCY_TTL_SAAT', 24))
+
+
+def _temizle():
+    """Süresi dolmuş anahtarları sil (indeksli aralık silme)"""
+    global _son_temizlik
+    simdi = time.monotonic()
+    if simdi - _son_temizlik < TEMIZLIK_ARALIGI:
+        return
+    _son_temizlik = simdi
+    db.session.query(IdempotencyKaydi).filter(
+        IdempotencyKaydi.olusturma_tarihi < _sinir()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _hata(mesaj, kod):
+    return jsonify({'success': False, 'error': mesaj}), kod
+
+
+def _tekrar_yaniti(kayit, ozet):
+    if kayit is None:
+        # Çakışan istek az önce geri alındı
+        return _hata('Aynı anahtarlı istek hâlâ işleniyor.', 409)
+    if kayit.istek_ozeti != ozet:
+        return _hata(f'{BASLIK} farklı bir istek için kullanılmış.', 422)
+    if kayit.durum_kodu is None:
+        return _hata('Aynı anahtarlı istek hâlâ işleniyor.', 409)
+    response = Response(kayit.yanit, status=kayit.durum_kodu, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def islemi_bitir():
+    """Görünümün commit'i; Idempotency-Key'li istekte sarmalayıcıya bırakılır"""
+    if g.get('idempotency_anahtari'):
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def idempotent(gorunum):
+    """Yazma görünümünü Idempotency-Key başlığıyla tekrar-güvenli yap"""
+    @wraps(gorunum)
+    def sarmalayici(*args, **kwargs):
+        anahtar = request.headers.get(BASLIK)
+        if not anahtar:
+            return gorunum(*args, **kwargs)
+        if len(anahtar) > MAKS_ANAHTAR_UZUNLUGU:
+            return _hata(f'{BASLIK} en fazla {MAKS_ANAHTAR_UZUNLUGU} karakter olabilir.', 400)
+
+        _temizle()
+        ozet = _istek_ozeti()
+        kayit = db.session.get(IdempotencyKaydi, anahtar)
+        if kayit is not None:
+            if kayit.olusturma_tarihi >= _sinir():
+                return _tekrar_yaniti(kayit, ozet)
+            db.session.delete(kayit)
+
+        # Anahtarı hemen yaz: aynı anahtarlı eşzamanlı istek burada çakışır
+        # (ya da ilk istek commit edene kadar bekler)
+        kayit = IdempotencyKaydi(anahtar=anahtar, istek_ozeti=ozet)
+        db.session.add(kayit)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return _tekrar_yaniti(db.session.get(IdempotencyKaydi, anahtar), ozet)
+
+        g.idempotency_anahtari = anahtar
+        try:
+            response = make_response(gorunum(*args, **kwargs))
+        finally:
+            g.idempotency_anahtari = None
+        if 200 <= response.status_code < 300:
+            # Görünümün yazımları, anahtar ve yanıt birlikte kalıcı olur
+            kayit.durum_kodu = response.status_code
+            kayit.yanit = response.get_data(as_text=True)
+            db.session.commit()
+        else:
+            # Başarısız istek saklanmaz; aynı anahtarla tekrar denenebilir
+            db.session.rollback()
+        return response
+    return sarmalayici
@@ -0,0 +1,487 @@
+"""Toplu ekipman ve hareket içe aktarma (JSON dizisi, CSV, XLSX)"""
+import csv
+import io
+from datetime import datetime, timezone
+from itertools import chain, islice
+
+from sqlalchemy import insert, update
+from models import db, Ekipman, EkipmanHareket, EkipmanZimmet, Kategori
+import categories
+import counters
+import custody
+import events
+import movements
+import rollups
+import search
+
+VARSAYILAN_BATCH_SIZE = 500
+MAKS_BATCH_SIZE = 5000
+
+# Modlar: 'atomik' -> tek hata tüm içe aktarmayı geri alır,
+#         'kismi'  -> hatalı satırlar atlanır, geçerliler eklenir
+MODLAR = ('atomik', 'kismi')
+
+EKIPMAN_ALANLARI = ('kategori', 'marka', 'model', 'seri_no', 'barkod', 'durum',
+                    'notlar', 'temin_tarihi', 'temin_fiyati', 'tedarikci')
+HAREKET_ALANLARI = ('ekipman_id', 'barkod', 'seri_no', 'hareket_tipi', 'tarih',
+                    'kullanici_adi', 'kullanici_personel_no', 'birim', 'lokasyon',
+                    'aciklama', 'teslim_alan', 'onaylayan')
+
+# Excel dışa aktarımındaki ve formdaki başlıklar da kabul edilir
+BASLIK_ESLEMELERI = {
+    'kategori': 'kategori', 'marka': 'marka', 'model': 'model',
+    'seri no': 'seri_no', 'barkod': 'barkod', 'durum': 'durum',
+    'notlar': 'notlar', 'temin tarihi': 'temin_tarihi',
+    'temin fiyatı (₺)': 'temin_fiyati', 'temin fiyatı': 'temin_fiyati',
+    'tedarikçi': 'tedarikci', 'ekipman id': 'ekipman_id',
+    'hareket tipi': 'hareket_tipi', 'tarih': 'tarih',
+    'kullanıcı': 'kullanici_adi', 'kullanıcı adı': 'kullanici_adi',
+    'personel no': 'kullanici_personel_no', 'birim': 'birim',
+    'lokasyon': 'lokasyon', 'açıklama': 'aciklama',
+    'teslim alan': 'teslim_alan', 'onaylayan': 'onaylayan',
+}
+
+
+class IceAktarmaHatasi(ValueError):
+    """Dosya veya parametre düzeyinde hata (satır hatası değil)"""
+
+
+class SatirHatasi(ValueError):
+    """Tek bir satırın doğrulama hatası"""
+
+
+def _anahtar(baslik):
+    baslik = str(baslik or '').strip()
+    return BASLIK_ESLEMELERI.get(baslik.lower(), baslik)
+
+
+def _bos_mu(deger):
+    return deger is None or (isinstance(deger, str) and not deger.strip())
+
+
+def _temizle(satir, alanlar):
+    sonuc = {}
+    for baslik, deger in satir.items():
+        anahtar = _anahtar(baslik)
+        if anahtar in alanlar:
+            if isinstance(deger, str):
+                deger = deger.strip()
+            sonuc[anahtar] = None if _bos_mu(deger) else deger
+    return sonuc
+
+
+def _xlsx_satirlari(dosya):
+    # openpyxl sadece XLSX yüklemesinde gerekir
+    from openpyxl import load_workbook
+
+    wb = load_workbook(dosya, read_only=True, data_only=True)
+    try:
+        satirlar = wb.active.iter_rows(values_only=True)
+        basliklar = next(satirlar, None)
+        if basliklar is None:
+            return
+        for degerler in satirlar:
+            if all(_bos_mu(d) for d in degerler):
+                continue
+            yield dict(zip(basliklar, degerler))
+    finally:
+        wb.close()
+
+
+def _csv_satirlari(akis):
+    # Akış geri sarılamayabilir: ayırıcı başlık satırından tahmin edilir
+    metin = io.TextIOWrapper(akis, encoding='utf-8-sig', newline='')
+    baslik = metin.readline()
+    try:
+        dialect = csv.Sniffer().sniff(baslik, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    yield from csv.DictReader(chain([baslik], metin), dialect=dialect)
+
+
+def satirlari_oku(request):
+    """
+    İstekten satırları (dict) akış halinde üret. Kabul edilenler:
+    JSON dizisi, multipart 'dosya' alanında .csv/.xlsx, ya da text/csv gövde.
+    """
+    if request.is_json:
+        veri = request.get_json(silent=True)
+        if not isinstance(veri, list):
+            raise IceAktarmaHatasi('JSON gövdesi bir dizi olmalı.')
+        return iter(veri)
+
+    dosya = request.files.get('dosya') or request.files.get('file')
+    if dosya is not None:
+        ad = (dosya.filename or '').lower()
+        if ad.endswith('.xlsx'):
+            return _xlsx_satirlari(dosya.stream)
+        if ad.endswith('.csv'):
+            return _csv_satirlari(dosya.stream)
+        raise IceAktarmaHatasi('Sadece .csv veya .xlsx dosyaları desteklenir.')
+
+    if request.mimetype == 'text/csv':
+        return _csv_satirlari(request.stream)
+
+    raise IceAktarmaHatasi('JSON dizisi, CSV veya XLSX dosyası gönderin.')
+
+
+def parse_parametreler(args):
+    mod = args.get('mod', 'atomik')
+    if mod not in MODLAR:
+        raise IceAktarmaHatasi(f'mod şunlardan biri olmalı: {", ".join(MODLAR)}')
+    try:
+        batch_size = int(args.get('batch_size', VARSAYILAN_BATCH_SIZE))
+    except ValueError:
+        raise IceAktarmaHatasi('batch_size bir tam sayı olmalı.')
+    return mod, max(1, min(batch_size, MAKS_BATCH_SIZE))
+
+
+def _tarih(deger, alan):
+    if deger is None or isinstance(deger, datetime):
+        return deger
+    metin = str(deger)
+    for bicim in ('%d.%m.%Y', '%d.%m.%Y %H:%M'):
+        try:
+            return datetime.strptime(metin, bicim)
+        except ValueError:
+            pass
+    try:
+        tarih = datetime.fromisoformat(metin.replace('Z', '+00:00'))
+    except ValueError:
+        raise SatirHatasi(f'{alan} tarihi anlaşılamadı: {metin}')
+    if tarih.tzinfo is not None:
+        # Kayıtlı tarihler saat dilimsiz UTC; sıralama karşılaştırması için aynı biçim
+        tarih = tarih.astimezone(timezone.utc).replace(tzinfo=None)
+    return tarih
+
+
+def _sayi(deger, alan):
+    if deger is None or isinstance(deger, (int, float)):
+        return deger
+    try:
+        return float(str(deger).replace(',', '.'))
+    except ValueError:
+        raise SatirHatasi(f'{alan} sayı olmalı: {deger}')
+
+
+def _metin(deger):
+    if deger is None:
+        return None
+    if isinstance(deger, float) and deger.is_integer():
+        deger = int(deger)  # Excel sayısal seri/barkod hücreleri
+    return str(deger)
+
+
+def _parcalar(satirlar, batch_size):
+    numarali = enumerate(satirlar, start=1)
+    while True:
+        parca = list(islice(numarali, batch_size))
+        if not parca:
+            return
+        yield parca
+
+
+class _Sonuc:
+    def __init__(self, mod):
+        self.mod = mod
+        self.toplam = 0
+        self.eklenen = 0
+        self.hatalar = []
+
+    def hata(self, satir_no, mesaj):
+        self.hatalar.append({'satir': satir_no, 'hata': mesaj})
+
+    def to_dict(self):
+        return {
+            'success': not self.hatalar,
+            'mod': self.mod,
+            'toplam': self.toplam,
+            'eklenen': self.eklenen,
+            'hatali': len(self.hatalar),
+            'hatalar': self.hatalar
+        }
+
+
+def _calistir(satirlar, mod, batch_size, parca_isle):
+    """
+    Satırları parça parça işle. Atomik modda ilk hatadan (doğrulama veya
+    ekleme) sonra ekleme yapılmaz ve her şey geri alınır; kısmi modda her
+    parça kendi savepoint'i içinde eklenir. Savepoint'i geri alınan parçanın
+    `gorulen`e yazdıkları da (görülen kodlar, kabul edilen geçişler) geri
+    alınır.
+    """
+    sonuc = _Sonuc(mod)
+    gorulen = {}
+    try:
+        for parca in _parcalar(satirlar, batch_size):
+            sonuc.toplam += len(parca)
+            if mod != 'atomik':
+                yedek = {ad: deger.copy() for ad, deger in gorulen.items()}
+            # hazir: [(satir_no, kayıt)] doğrulamadan geçen satırlar
+            hazir = parca_isle(parca, sonuc, gorulen)
+            if mod == 'atomik':
+                if sonuc.hatalar:
+                    continue  # doğrulamaya devam, ama ekleme yok
+                try:
+                    parca_isle.ekle([k for _, k in hazir])
+                except Exception as e:
+                    # Doğrulamadan sonra başka bir yazım (ör. aynı barkod) eklemeyi
+                    # bozabilir: hepsi hemen geri alınır, kalan parçalar doğrulanır
+                    db.session.rollback()
+                    for satir_no, _ in hazir:
+                        sonuc.hata(satir_no, f'Parça eklenemedi: {e}')
+                    continue
+                sonuc.eklenen += len(hazir)
+            else:
+                try:
+                    with db.session.begin_nested():
+                        parca_isle.ekle([k for _, k in hazir])
+                    sonuc.eklenen += len(hazir)
+                except Exception as e:
+                    gorulen.clear()
+                    gorulen.update(yedek)
+                    for satir_no, _ in hazir:
+                        sonuc.hata(satir_no, f'Parça eklenemedi: {e}')
+        if not sonuc.toplam:
+            raise IceAktarmaHatasi('İçe aktarılacak satır yok.')
+        if mod == 'atomik' and sonuc.hatalar:
+            db.session.rollback()
+            sonuc.eklenen = 0
+        else:
+            if sonuc.eklenen:
+                # Toplu değişiklik: istemciler satır satır değil listeyi yeniden yükler
+                events.olay_ekle(parca_isle.VARLIK, None, 'toplu', {'adet': sonuc.eklenen})
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return sonuc
+
+
+# --- Ekipman ---
+
+class _EkipmanParcasi:
+    """Bir parça ekipman satırını doğrula, kategori ve benzersizlikleri çöz"""
+
+    VARLIK = 'ekipman'
+
+    def __call__(self, parca, sonuc, gorulen):
+        gecerli = []
+        for satir_no, ham in parca:
+            try:
+                if not isinstance(ham, dict):
+                    raise SatirHatasi('Satır bir nesne olmalı.')
+                satir = _temizle(ham, EKIPMAN_ALANLARI)
+                if not satir.get('kategori'):
+                    raise SatirHatasi('kategori zorunlu.')
+                kayit = {alan: satir.get(alan) for alan in EKIPMAN_ALANLARI}
+                for alan in ('kategori', 'marka', 'model', 'seri_no', 'barkod', 'tedarikci', 'notlar'):
+                    kayit[alan] = _metin(kayit[alan])
+                kayit['durum'] = kayit['durum'] or 'Depoda'
+                kayit['temin_tarihi'] = _tarih(kayit['temin_tarihi'], 'temin_tarihi')
+                kayit['temin_fiyati'] = _sayi(kayit['temin_fiyati'], 'temin_fiyati')
+                gecerli.append((satir_no, kayit))
+            except SatirHatasi as e:
+                sonuc.hata(satir_no, str(e))
+
+        # Benzersiz alanlar: parça içi, önceki parçalar ve veritabanı (tek sorgu)
+        for alan in ('seri_no', 'barkod'):
+            kolon = getattr(Ekipman, alan)
+            degerler = {k[alan] for _, k in gecerli if k[alan]}
+            mevcut = {d for (d,) in db.session.query(kolon).filter(kolon.in_(degerler))} \
+                if degerler else set()
+            onceki = gorulen.setdefault(alan, set())
+            kalan = []
+            for satir_no, kayit in gecerli:
+                deger = kayit[alan]
+                if deger and (deger in mevcut or deger in onceki):
+                    sonuc.hata(satir_no, f'{alan} zaten kayıtlı: {deger}')
+                    continue
+                if deger:
+                    onceki.add(deger)
+                kalan.append((satir_no, kayit))
+            gecerli = kalan
+
+        return gecerli
+
+    def ekle(self, kayitlar):
+        if not kayitlar:
+            return
+        connection = db.session.connection()
+
+        # Eksik kategoriler önbellekten bulunur, tek toplu eklemeyle eklenir
+        adlar = {k['kategori'] for k in kayitlar}
+        yeni = [{'ad': ad, 'aciklama': 'Kullanıcı tanımlı'}
+                for ad in sorted(adlar) if categories.aktif_kayit().id_bul(ad) is None]
+        if yeni:
+            connection.execute(insert(Kategori), yeni)
+            categories.surum_artir(connection)
+
+        idler = connection.execute(
+            insert(Ekipman).returning(Ekipman.id, sort_by_parameter_order=True),
+            kayitlar
+        ).scalars().all()
+
+        # Toplu eklemede mapper olayları çalışmaz: sayaç ve arama indeksi elle
+        degisim = {}
+        for kayit in kayitlar:
+            anahtar = (kayit['kategori'], kayit['durum'] or '')
+            degisim[anahtar] = degisim.get(anahtar, 0) + 1
+        counters.sayac_degistir(connection, degisim)
+        search.index_guncelle(connection, [
+            {'id': id, **kayit} for id, kayit in zip(idler, kayitlar)
+        ])
+
+
+def ekipman_ice_aktar(satirlar, mod='atomik', batch_size=VARSAYILAN_BATCH_SIZE):
+    return _calistir(satirlar, mod, batch_size, _EkipmanParcasi())
+
+
+# --- Hareket (toplu zimmet) ---
+
+class _HareketParcasi:
+    """
+    Bir parça hareket satırını doğrula ve ekipmanları tek sorguda çöz.
+    Önceki parçaların durum değişiklikleri aynı transaction'da olduğu için
+    sorgu bunları zaten görür.
+
+    Durum makinesi (movements.GECISLER) POST /api/hareket ile aynıdır:
+    ekipmanın son hareketinden (zimmet projeksiyonu) sonraki satırlar
+    (tarih, satır sırası) ile sırayla mevcut duruma uygulanır, uygunsuz
+    geçiş satır hatasıdır. Son hareketten eski tarihli satırlar geçmiş
+    kaydıdır: denetlenmez, durumu ve zimmeti değiştirmez.
+    """
+
+    VARLIK = 'hareket'
+
+    def __call__(self, parca, sonuc, gorulen):
+        adaylar = []
+        for satir_no, ham in parca:
+            try:
+                if not isinstance(ham, dict):
+                    raise SatirHatasi('Satır bir nesne olmalı.')
+                satir = _temizle(ham, HAREKET_ALANLARI)
+                if not satir.get('hareket_tipi'):
+                    raise SatirHatasi('hareket_tipi zorunlu.')
+                if satir['hareket_tipi'] not in movements.GECISLER:
+                    raise SatirHatasi(f'Geçersiz hareket tipi: {satir["hareket_tipi"]}. '
+                                      f'Geçerli tipler: {", ".join(movements.GECISLER)}')
+                if not (satir.get('ekipman_id') or satir.get('barkod') or satir.get('seri_no')):
+                    raise SatirHatasi('ekipman_id, barkod veya seri_no gerekli.')
+                if satir.get('ekipman_id') is not None:
+                    try:
+                        satir['ekipman_id'] = int(satir['ekipman_id'])
+                    except (TypeError, ValueError):
+                        raise SatirHatasi(f'ekipman_id tam sayı olmalı: {satir["ekipman_id"]}')
+                for alan in ('barkod', 'seri_no'):
+                    satir[alan] = _metin(satir.get(alan))
+                satir['tarih'] = _tarih(satir.get('tarih'), 'tarih')
+                adaylar.append((satir_no, satir))
+            except SatirHatasi as e:
+                sonuc.hata(satir_no, str(e))
+
+        idler = {s['ekipman_id'] for _, s in adaylar if s.get('ekipman_id')}
+        barkodlar = {s['barkod'] for _, s in adaylar if not s.get('ekipman_id') and s.get('barkod')}
+        seriler = {s['seri_no'] for _, s in adaylar if not s.get('ekipman_id') and s.get('seri_no')}
+        kosullar = []
+        if idler:
+            kosullar.append(Ekipman.id.in_(idler))
+        if barkodlar:
+            kosullar.append(Ekipman.barkod.in_(barkodlar))
+        if seriler:
+            kosullar.append(Ekipman.seri_no.in_(seriler))
+        ekipmanlar = db.session.query(
+            Ekipman.id, Ekipman.barkod, Ekipman.seri_no, Ekipman.kategori, Ekipman.durum,
+            EkipmanZimmet.tarih.label('son_tarih')
+        ).outerjoin(EkipmanZimmet, EkipmanZimmet.ekipman_id == Ekipman.id) \
+            .filter(db.or_(*kosullar)).all() if kosullar else []
+
+        id_ile = {e.id: e for e in ekipmanlar}
+        barkod_ile = {e.barkod: e for e in ekipmanlar if e.barkod}
+        seri_ile = {e.seri_no: e for e in ekipmanlar if e.seri_no}
+        cozulen = []
+        for satir_no, satir in adaylar:
+            if satir.get('ekipman_id'):
+                ekipman = id_ile.get(satir['ekipman_id'])
+            else:
+                ekipman = barkod_ile.get(satir.get('barkod')) or seri_ile.get(satir.get('seri_no'))
+            if ekipman is None:
+                sonuc.hata(satir_no, 'Ekipman bulunamadı.')
+                continue
+            kayit = {alan: _metin(satir.get(alan)) for alan in HAREKET_ALANLARI
+                     if alan not in ('ekipman_id', 'barkod', 'seri_no', 'tarih')}
+            kayit['ekipman_id'] = ekipman.id
+            kayit['kategori'] = ekipman.kategori
+            kayit['tarih'] = satir['tarih'] or datetime.utcnow()
+            cozulen.append((satir_no, kayit, ekipman))
+        return self._gecisleri_denetle(cozulen, sonuc, gorulen)
+
+    def _gecisleri_denetle(self, cozulen, sonuc, gorulen):
+        """
+        Satırları (tarih, satır no) sırasıyla durum makinesinden geçir.
+        Hazır satırlar giriş sırasıyla (satir_no, (kayit, ekipman, hedef))
+        döner; hedef, geçmiş kaydı satırlarda None'dır.
+        """
+        # {ekipman_id: (durum, son hareket tarihi)}: önceki parçaların kabul ettikleri
+        durumlar = gorulen.setdefault('durum', {})
+        hazir, hatalar = [], []
+        for satir_no, kayit, ekipman in sorted(cozulen, key=lambda c: (c[1]['tarih'], c[0])):
+            durum, son_tarih = durumlar.get(ekipman.id, (ekipman.durum, ekipman.son_tarih))
+            hedef = None
+            if son_tarih is None or kayit['tarih'] >= son_tarih:
+                tip = kayit['hareket_tipi']
+                gecis = movements.GECISLER[tip]
+                if durum not in gecis.kaynaklar:
+                    hatalar.append((satir_no, f'{tip} hareketi {durum or "durumu boş"} '
+                                              f'durumundaki ekipmana uygulanamaz.'))
+                    continue
+                hedef = gecis.hedef
+                durumlar[ekipman.id] = (hedef, kayit['tarih'])
+            hazir.append((satir_no, (kayit, ekipman, hedef)))
+        for satir_no, mesaj in sorted(hatalar):
+            sonuc.hata(satir_no, mesaj)
+        return sorted(hazir, key=lambda h: h[0])
+
+    def ekle(self, hazir):
+        if not hazir:
+            return
+        connection = db.session.connection()
+        kayitlar = [kayit for kayit, _, _ in hazir]
+        idler = connection.execute(
+            insert(EkipmanHareket).returning(EkipmanHareket.id, sort_by_parameter_order=True),
+            kayitlar
+        ).scalars().all()
+        custody.zimmet_guncelle(connection, [
+            {'id': id, **kayit} for id, kayit in zip(idler, kayitlar)
+        ])
+        rollups.ozete_ekle(connection, kayitlar)
+
+        # Her ekipmanın son durumu, zimmetle aynı sırayla (tarih, id = giriş sırası)
+        # en son hareketinden; sayaçlar eski -> yeni farkıyla güncellenir
+        son = {}
+        for sira, (kayit, ekipman, hedef) in enumerate(hazir):
+            anahtar = (kayit['tarih'], sira)
+            if hedef is not None and (ekipman.id not in son or anahtar > son[ekipman.id][0]):
+                son[ekipman.id] = (anahtar, hedef, ekipman)
+        son_durum = {id: hedef for id, (_, hedef, _) in son.items()}
+        bilgiler = {id: ekipman for id, (_, _, ekipman) in son.items()}
+
+        degisim = {}
+        for durum in set(son_durum.values()):
+            hedefler = [i for i, d in son_durum.items() if d == durum]
+            for ekipman_id in hedefler:
+                ekipman = bilgiler[ekipman_id]
+                if ekipman.durum == durum:
+                    continue
+                eski = (ekipman.kategori, ekipman.durum or '')
+                degisim[eski] = degisim.get(eski, 0) - 1
+                yeni = (ekipman.kategori, durum)
+                degisim[yeni] = degisim.get(yeni, 0) + 1
+            connection.execute(
+                update(Ekipman).where(Ekipman.id.in_(hedefler)).values(durum=durum)
+            )
+        counters.sayac_degistir(connection, degisim)
+
+
+def hareket_ice_aktar(satirlar, mod='atomik', batch_size=VARSAYILAN_BATCH_SIZE):
+    return _calistir(satirlar, mod, batch_size, _HareketParcasi())
@@ -1,3 +1,4 @@
+import sys
 from models import db, Kategori
 
 def init_kategoriler():
@@ -30,9 +31,137 @@ def init_kategoriler():
     db.session.commit()
     print("Kategoriler başarıyla eklendi!")
 
+def init_arama_indeksi():
+    """FTS5 arama indeksini oluştur ve mevcut ekipmanlarla doldur"""
+    import search
+    with db.engine.begin() as connection:
+        if not search.fts_destekleniyor():
+            print("Arama indeksi sadece SQLite için gerekli, atlandı.")
+            return
+        toplam = search.index_yeniden_olustur(connection)
+    print(f"Arama indeksi yeniden oluşturuldu: {toplam} ekipman.")
+
+def init_sayaclar():
+    """Kategori x durum sayaç tablosunu mevcut ekipmanlardan yeniden hesapla"""
+    import counters
+    with db.engine.begin() as connection:
+        hucre = counters.sayaclari_yeniden_hesapla(connection)
+    print(f"Sayaç tablosu yeniden hesaplandı: {hucre} kategori/durum.")
+
+def init_zimmet():
+    """Güncel zimmet projeksiyonunu hareket geçmişinden yeniden kur"""
+    import custody
+    with db.engine.begin() as connection:
+        toplam = custody.zimmet_yeniden_olustur(connection)
+    print(f"Zimmet projeksiyonu yeniden oluşturuldu: {toplam} ekipman.")
+
+def init_hareket_ozeti():
+    """Aylık hareket özetini canlı ve arşivlenmiş hareketlerden yeniden hesapla"""
+    import rollups
+    with db.engine.begin() as connection:
+        hucre = rollups.ozet_yeniden_hesapla(connection)
+    print(f"Hareket özeti yeniden hesaplandı: {hucre} ay/birim/tip/kategori.")
+
+def hareketleri_arsivle(gun):
+    """`gun` günden eski hareketleri arşiv tablosuna taşı"""
+    import archive
+    toplam = archive.hareketleri_arsivle(gun, cikti=print)
+    print(f"{gun} günden eski {toplam} hareket arşivlendi.")
+
+def olaylari_buda():
+    """Olay günlüğünde en yeni OLAY_SAKLAMA_ADEDI olay dışındakileri sil"""
+    import events
+    broker = events.aktif_broker()
+    silinen = broker.arka_uc.buda(broker.saklanacak)
+    print(f"Olay günlüğü budandı: {silinen} olay silindi.")
+
+def init_indeksler():
+    """Modellerde tanımlı indeksleri mevcut veritabanında eksikse oluştur"""
+    with db.engine.begin() as connection:
+        eklenen = 0
+        for tablo in db.metadata.sorted_tables:
+            mevcut = {i['name'] for i in db.inspect(connection).get_indexes(tablo.name)}
+            for indeks in sorted(tablo.indexes, key=lambda i: i.name):
+                if indeks.name not in mevcut:
+                    indeks.create(connection)
+                    print(f"  + {indeks.name}")
+                    eklenen += 1
+    print(f"İndeksler güncel: {eklenen} yeni indeks oluşturuldu.")
+
+def init_kolonlar():
+    """Modellere sonradan eklenen (boş bırakılabilir) kolonları mevcut tablolara ekle"""
+    with db.engine.begin() as connection:
+        eklenen = 0
+        for tablo in db.metadata.sorted_tables:
+            mevcut = {k['name'] for k in db.inspect(connection).get_columns(tablo.name)}
+            for kolon in tablo.columns:
+                if kolon.name not in mevcut and kolon.nullable:
+                    tip = kolon.type.compile(dialect=connection.dialect)
+                    connection.execute(db.text(
+                        f'ALTER TABLE {tablo.name} ADD COLUMN {kolon.name} {tip}'
+                    ))
+                    print(f"  + {tablo.name}.{kolon.name}")
+                    eklenen += 1
+    print(f"Kolonlar güncel: {eklenen} yeni kolon eklendi.")
+
+def veritabani_kur():
+    """Tabloları, eksik kolon ve indeksleri, varsayılan kategorileri ve türetilmiş tabloları kur"""
+    db.create_all()
+    init_kolonlar()
+    init_indeksler()
+    init_kategoriler()
+    init_arama_indeksi()
+    init_sayaclar()
+    init_zimmet()
+    init_hareket_ozeti()
+
+def sorgu_planlarini_kontrol_et(app):
+    """API sorgularının EXPLAIN QUERY PLAN çıktısında tam tablo taraması ara"""
+    import query_plan
+    sorunlar = query_plan.kontrol_et(app)
+    if sorunlar is None:
+        print("Sorgu planı kontrolü sadece SQLite için destekleniyor, atlandı.")
+        return True
+    for yol, sql, plan in sorunlar:
+        print(f"İNDEKSSİZ TARAMA: {yol}")
+        print(f"  {' '.join(sql.split())}")
+        for satir in plan:
+            print(f"    {satir}")
+    if sorunlar:
+        print(f"{len(sorunlar)} sorgu indeks kullanmıyor.")
+        return False
+    print("Tüm API sorguları indeks kullanıyor.")
+    return True
+
 if __name__ == '__main__':
-    from app import app
+    # Kullanım: python init_db.py [arama-indeksi | sayaclar | zimmet | hareket-ozeti |
+    #                              arsivle | olaylari-buda | indeksler | sorgu-plani]
+    komut = sys.argv[1] if len(sys.argv) > 1 else None
+
+    from app import create_app
+    # Tablolar henüz olmayabilir; tarama indeksi ilk kullanımda yüklenir
+    app = create_app({'TARAMA_ON_YUKLEME': False})
     with app.app_context():
-        db.create_all()
-        init_kategoriler()
-        print("Veritabanı başarıyla oluşturuldu!")
+        if komut == 'arama-indeksi':
+            init_arama_indeksi()
+        elif komut == 'sayaclar':
+            init_sayaclar()
+        elif komut == 'zimmet':
+            init_zimmet()
+        elif komut == 'hareket-ozeti':
+            init_hareket_ozeti()
+        elif komut == 'arsivle':
+            hareketleri_arsivle(app.config['HAREKET_ARSIV_GUN'])
+        elif komut == 'olaylari-buda':
+            olaylari_buda()
+        elif komut == 'indeksler':
+            init_indeksler()
+        elif komut == 'sorgu-plani':
+            if not sorgu_planlarini_kontrol_et(app):
+                sys.exit(1)
+        elif komut is None:
+            veritabani_kur()
+            print("Veritabanı başarıyla oluşturuldu!")
+        else:
+            print(f"Bilinmeyen komut: {komut}")
+            sys.exit(1)
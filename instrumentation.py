@@ -0,0 +1,218 @@
+"""
+İstek ölçümleme: rota başına gecikme histogramı, istek başına SQL sorgu
+sayısı ve süresi (before/after_cursor_execute), yavaş sorgu günlüğü ve
+N+1 uyarısı. Sonuçlar /metrics'e eklenir; her yanıta Server-Timing başlığı
+yazılır.
+
+ISTEK_PROFILI açıksa `?_profile=1` o isteğin profil raporunu düz metin
+olarak döndürür (pyinstrument kuruluysa onunla, değilse cProfile ile;
+`?_profile=cprofile` cProfile'ı zorlar).
+"""
+import cProfile
+import io
+import logging
+import pstats
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from models import db
+import metrics
+
+try:
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:  # isteğe bağlı bağımlılık
+    _Pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+GECIKME_KOVALARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SORGU_KOVALARI = (1, 2, 3, 5, 10, 20, 50, 100)
+
+gecikmeler = metrics.Histogram(GECIKME_KOVALARI)
+istek_sorgulari = metrics.Histogram(SORGU_KOVALARI)
+_sayaclar = {ad: Counter() for ad in ('istek', 'sorgu', 'sorgu_sn', 'yavas', 'n_arti_bir')}
+_kilit = threading.Lock()
+
+# IN (?, ?, ?) açılımları ve parametre adları aynı sorgu şekline indirgenir
+_PARAMETRE_LISTESI = re.compile(r'(\?|%s|%\(\w+\)s)(\s*,\s*(\?|%s|%\(\w+\)s))+')
+
+
+def varsayilan_ayarlar(config):
+    config.setdefault('ISTEK_PROFILI', False)
+    config.setdefault('YAVAS_SORGU_MS', 200)
+    config.setdefault('N_ARTI_BIR_ESIGI', 5)
+
+
+def _rota():
+    """Etiket olarak URL kuralı (id'li yollar tek seri olsun)"""
+    return request.url_rule.rule if request.url_rule is not None else 'eslesmeyen'
+
+
+def sorgu_sekli(sql):
+    return _PARAMETRE_LISTESI.sub('?', ' '.join(sql.split()))
+
+
+def _kisalt(deger, uzunluk=300):
+    metin = repr(deger)
+    return metin if len(metin) <= uzunluk else metin[:uzunluk] + '…'
+
+
+# --- SQL dinleyicileri ---
+
+def _sorgu_basladi(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._izleme_baslangic = time.perf_counter()
+
+
+def _sorgu_bitti(conn, cursor, statement, parameters, context, executemany):
+    baslangic = getattr(context, '_izleme_baslangic', None)
+    # Arka plan thread'leri (olay yoklama, işler) istek ölçümüne girmez
+    if baslangic is None or not has_request_context() or 'izleme' not in g:
+        return
+    sure = time.perf_counter() - baslangic
+    izleme = g.izleme
+    izleme['sorgu'] += 1
+    izleme['sorgu_sn'] += sure
+    izleme['sekiller'][sorgu_sekli(statement)] += 1
+
+    esik = izleme['yavas_esigi']
+    if sure * 1000 >= esik:
+        izleme['yavas'] += 1
+        if executemany:
+            parametreler = f'{len(parameters)} satır, ilki {_kisalt(parameters[0] if parameters else None)}'
+        else:
+            parametreler = _kisalt(parameters)
+        logger.warning('Yavaş sorgu (%.1f ms, %s %s): %s | parametreler: %s',
+                       sure * 1000, request.method, izleme['rota'],
+                       _kisalt(' '.join(statement.split()), 500), parametreler)
+
+
+# --- İstek kancaları ---
+
+def _istek_basladi():
+    g.izleme = {
+        'baslangic': time.perf_counter(),
+        'rota': _rota(),
+        'sorgu': 0,
+        'sorgu_sn': 0.0,
+        'yavas': 0,
+        'sekiller': Counter(),
+        'yavas_esigi': current_app.config['YAVAS_SORGU_MS'],
+        'n_arti_bir_esigi': current_app.config['N_ARTI_BIR_ESIGI'],
+    }
+    mod = request.args.get('_profile')
+    if not mod or mod == '0':
+        return None
+    if not current_app.config['ISTEK_PROFILI']:
+        return jsonify({'success': False, 'error': 'İstek profili kapalı (ISTEK_PROFILI=1 ile açılır).'}), 403
+    if mod != 'cprofile' and _Pyinstrument is not None:
+        profil = _Pyinstrument()
+        profil.start()
+        g.profil = ('pyinstrument', profil)
+    else:
+        profil = cProfile.Profile()
+        profil.enable()
+        g.profil = ('cprofile', profil)
+    return None
+
+
+def _istek_bitti(response):
+    if 'izleme' not in g:
+        return response
+    profil = g.pop('profil', None)
+    if profil is not None:
+        # Akış yanıtlarının gövdesi de profile girsin (SSE sonsuz olduğundan hariç)
+        if response.is_streamed and response.mimetype != 'text/event-stream':
+            response.get_data()
+        if profil[0] == 'pyinstrument':
+            profil[1].stop()
+        else:
+            profil[1].disable()
+    izleme = g.pop('izleme')
+
+    sure = time.perf_counter() - izleme['baslangic']
+    rota = izleme['rota']
+    gecikmeler.gozlemle({'route': rota, 'method': request.method}, sure)
+    istek_sorgulari.gozlemle({'route': rota}, izleme['sorgu'])
+
+    tekrarlar = [(sekil, adet) for sekil, adet in izleme['sekiller'].most_common()
+                 if adet >= izleme['n_arti_bir_esigi']]
+    for sekil, adet in tekrarlar:
+        logger.warning('Olası N+1: %s %s isteğinde aynı sorgu %d kez çalıştı: %s',
+                       request.method, rota, adet, _kisalt(sekil, 300))
+    with _kilit:
+        _sayaclar['istek'][(rota, request.method, response.status_code)] += 1
+        _sayaclar['sorgu'][rota] += izleme['sorgu']
+        _sayaclar['sorgu_sn'][rota] += izleme['sorgu_sn']
+        _sayaclar['yavas'][rota] += izleme['yavas']
+        _sayaclar['n_arti_bir'][rota] += bool(tekrarlar)
+
+    if profil is not None:
+        response.close()
+        return _profil_yaniti(profil, izleme, sure, response.status_code)
+    response.headers['Server-Timing'] = (
+        f'db;dur={izleme["sorgu_sn"] * 1000:.1f};desc="{izleme["sorgu"]} sorgu", '
+        f'app;dur={sure * 1000:.1f}'
+    )
+    return response
+
+
+def _profil_yaniti(profil, izleme, sure, durum):
+    """Yanıt gövdesi yerine düz metin profil raporu"""
+    tur, profiler = profil
+    cikti = io.StringIO()
+    cikti.write(f'{request.method} {request.full_path} -> {durum}\n')
+    cikti.write(f'Toplam {sure * 1000:.1f} ms; {izleme["sorgu"]} SQL sorgusu, '
+                f'{izleme["sorgu_sn"] * 1000:.1f} ms, {izleme["yavas"]} yavaş\n\n')
+    cikti.write('En sık sorgu şekilleri:\n')
+    for sekil, adet in izleme['sekiller'].most_common(10):
+        cikti.write(f'  {adet:4d} x {_kisalt(sekil, 200)}\n')
+    cikti.write(f'\n--- {tur} ---\n')
+    if tur == 'pyinstrument':
+        cikti.write(profiler.output_text(unicode=True, color=False))
+    else:
+        pstats.Stats(profiler, stream=cikti).sort_stats('cumulative').print_stats(60)
+    return Response(cikti.getvalue(), status=200, mimetype='text/plain', headers={
+        'Cache-Control': 'no-store', 'X-Profil-Durum': str(durum),
+    })
+
+
+def init_app(app):
+    """İstek kancalarını ve SQL dinleyicilerini bağla (database.init_app'ten sonra)"""
+    varsayilan_ayarlar(app.config)
+    # Önce kaydedilen after_request en son çalışır: ölçüm sıkıştırmayı da kapsar
+    app.before_request(_istek_basladi)
+    app.after_request(_istek_bitti)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _sorgu_basladi)
+            event.listen(engine, 'after_cursor_execute', _sorgu_bitti)
+
+
+@metrics.toplayici_ekle
+def _istek_metrikleri():
+    with _kilit:
+        istekler = list(_sayaclar['istek'].items())
+        sorgular = list(_sayaclar['sorgu'].items())
+        sorgu_sn = list(_sayaclar['sorgu_sn'].items())
+        yavas = list(_sayaclar['yavas'].items())
+        n_arti_bir = list(_sayaclar['n_arti_bir'].items())
+    yield ('stok_http_requests_total', 'counter', 'Tamamlanan HTTP istekleri',
+           [({'route': r, 'method': m, 'status': d}, adet) for (r, m, d), adet in istekler])
+    yield ('stok_http_request_duration_seconds', 'histogram',
+           'Rota başına yanıt süresi (akış yanıtlarında başlıklara kadar)', gecikmeler.ornekler())
+    yield ('stok_sql_statements_per_request', 'histogram',
+           'İstek başına çalışan SQL sorgusu', istek_sorgulari.ornekler())
+    yield ('stok_sql_statements_total', 'counter', 'İsteklerde çalışan SQL sorguları',
+           [({'route': r}, adet) for r, adet in sorgular])
+    yield ('stok_sql_duration_seconds_total', 'counter', 'İsteklerde SQL sorgularına harcanan süre',
+           [({'route': r}, round(sn, 6)) for r, sn in sorgu_sn])
+    yield ('stok_sql_slow_queries_total', 'counter', 'YAVAS_SORGU_MS eşiğini aşan sorgular',
+           [({'route': r}, adet) for r, adet in yavas])
+    yield ('stok_sql_n_plus_one_total', 'counter',
+           'Aynı sorgu şeklinin N_ARTI_BIR_ESIGI kez tekrarlandığı istekler',
+           [({'route': r}, adet) for r, adet in n_arti_bir])
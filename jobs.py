@@ -0,0 +1,325 @@
+"""
+Dışa aktarma iş kuyruğu: işler ayrı süreçlerde (ProcessPoolExecutor)
+üretilir, sonuçlar diskte format + filtreler + veri sürümü anahtarıyla
+önbelleğe alınır. Önbellek boyutu aşılınca en az kullanılan dosyalar silinir.
+
+Süreç içindeki iş kayıtları da sınırlıdır: hatayla biten işler IS_SAKLAMA_SN
+sonra, kayıt sayısı MAKS_IS'i aşınca en eski kullanılandan başlayarak
+atılır; dosyası önbellekten silinen işin kaydı da düşer. Çalışan işler atılmaz.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import Flask
+from models import db
+import database
+import events
+import exporters
+import search
+
+# Filtre anahtarları (önbellek anahtarına sadece bunlar girer)
+FILTRE_ANAHTARLARI = ('kategori', 'durum', 'arama')
+
+# Biten (hatalı) işin durumunun sorgulanabileceği süre ve en fazla iş kaydı
+IS_SAKLAMA_SN = 3600
+MAKS_IS = 1000
+
+_executor = None
+_isler = OrderedDict()  # is_id -> ExportIsi, en eski kullanılan başta
+_kilit = threading.Lock()
+
+
+class ExportIsi:
+    """Tek bir dışa aktarma işinin durumu. id aynı zamanda önbellek anahtarıdır"""
+
+    def __init__(self, id, format, dosya_yolu):
+        self.id = id
+        self.format = format
+        uzanti, self.mimetype = exporters.FORMATLAR[format]
+        self.indirme_adi = exporters.dosya_adi(uzanti)
+        self.dosya_yolu = dosya_yolu
+        self.durum = 'bekliyor'  # bekliyor, calisiyor, tamamlandi, hata
+        self.ilerleme = 0.0
+        self.hata = None
+        self.bitis = None  # time.monotonic(); None: sürüyor
+
+    def bitti_mi(self):
+        return self.durum in ('tamamlandi', 'hata')
+
+    def guncel_ilerleme(self):
+        """Çalışan işin ilerlemesini işçinin yazdığı yan dosyadan oku"""
+        if self.durum == 'calisiyor':
+            try:
+                with open(_ilerleme_dosyasi(self.dosya_yolu)) as f:
+                    self.ilerleme = float(f.read() or 0)
+            except (OSError, ValueError):
+                pass
+        return self.ilerleme
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'format': self.format,
+            'durum': self.durum,
+            'ilerleme': round(self.guncel_ilerleme(), 3),
+            'hata': self.hata
+        }
+
+
+# --- Önbellek ---
+
+def onbellek_dizini(app):
+    dizin = app.config.get('EXPORT_CACHE_DIR') or \
+        os.path.join(tempfile.gettempdir(), 'stok_takip_export')
+    os.makedirs(dizin, exist_ok=True)
+    return dizin
+
+
+def veri_surumu():
+    """Olay günlüğünün son sırası: her ekipman yazımında artar, O(1) okunur"""
+    return events.son_sira()
+
+
+def _filtreler(args):
+    return {k: args.get(k) for k in FILTRE_ANAHTARLARI if args.get(k)}
+
+
+def is_anahtari(format, args):
+    """format + filtreler + veri sürümünden önbellek anahtarı"""
+    ham = json.dumps([format, _filtreler(args), veri_surumu()], sort_keys=True, ensure_ascii=False)
+    return f'{format}-{hashlib.sha256(ham.encode()).hexdigest()[:32]}'
+
+
+def _dosya_yolu(app, is_id):
+    format = is_id.split('-', 1)[0]
+    uzanti = exporters.FORMATLAR[format][0]
+    return os.path.join(onbellek_dizini(app), f'{is_id}.{uzanti}')
+
+
+def _ilerleme_dosyasi(yol):
+    return yol + '.ilerleme'
+
+
+def _onbellekte_mi(yol):
+    if os.path.exists(yol):
+        os.utime(yol)  # LRU: son kullanım zamanını güncelle
+        return True
+    return False
+
+
+def onbellegi_buda(app):
+    """Toplam boyut sınırı aşılırsa en eski kullanılan dosyaları sil"""
+    sinir = app.config.get('EXPORT_CACHE_MAX_MB', 512) * 1024 * 1024
+    dizin = onbellek_dizini(app)
+    dosyalar = []
+    for ad in os.listdir(dizin):
+        if ad.endswith(('.xlsx', '.pdf')):
+            yol = os.path.join(dizin, ad)
+            try:
+                durum = os.stat(yol)
+            except FileNotFoundError:
+                continue
+            dosyalar.append((durum.st_mtime, durum.st_size, yol))
+
+    toplam = sum(boyut for _, boyut, _ in dosyalar)
+    silinen = set()
+    for _, boyut, yol in sorted(dosyalar):
+        if toplam <= sinir:
+            break
+        try:
+            os.remove(yol)
+        except FileNotFoundError:
+            pass
+        silinen.add(yol)
+        toplam -= boyut
+    if silinen:
+        # Dosyası silinen bitmiş işlerin kaydı da atılır
+        with _kilit:
+            for is_id in [i for i, isi in _isler.items()
+                          if isi.bitti_mi() and isi.dosya_yolu in silinen]:
+                del _isler[is_id]
+
+
+def _artiklari_sil(isi):
+    # Sonuç dosyası aynı anahtarla başka bir üretime ait olabilir; onu disk LRU'su siler
+    try:
+        os.remove(_ilerleme_dosyasi(isi.dosya_yolu))
+    except FileNotFoundError:
+        pass
+
+
+def _isleri_buda():
+    """Süresi dolan ve sınırı aşan bitmiş iş kayıtlarını at (_kilit altında çağrılır)"""
+    sinir = time.monotonic() - IS_SAKLAMA_SN
+    atilacak = [isi for isi in _isler.values() if isi.bitti_mi() and isi.bitis < sinir]
+    fazla = len(_isler) - len(atilacak) - MAKS_IS
+    if fazla > 0:
+        # En eski kullanılanlardan başlayarak; çalışan işler sayılmaz
+        atilacak += [isi for isi in _isler.values()
+                     if isi.bitti_mi() and isi.bitis >= sinir][:fazla]
+    for isi in atilacak:
+        del _isler[isi.id]
+        _artiklari_sil(isi)
+
+
+# --- İşçi süreç ---
+
+_isci_app = None
+
+
+def _isci_calistir(format, args, hedef, config):
+    """İşçi süreçte çalışır: kendi app/engine'i ile dosyayı üretir"""
+    global _isci_app
+    if _isci_app is None or \
+            _isci_app.config['SQLALCHEMY_DATABASE_URI'] != config['SQLALCHEMY_DATABASE_URI']:
+        _isci_app = Flask(__name__)
+        _isci_app.config.update(config)
+        database.init_app(_isci_app)
+        search.init_app(_isci_app)
+
+    ilerleme_yolu = _ilerleme_dosyasi(hedef)
+    son = [0.0]
+
+    def ilerleme(oran):
+        if oran - son[0] >= 0.01:
+            son[0] = oran
+            with open(ilerleme_yolu, 'w') as f:
+                f.write(f'{oran:.3f}')
+
+    gecici = f'{hedef}.{uuid.uuid4().hex}.tmp'
+    try:
+        with _isci_app.app_context():
+            exporters.uret(format, args, gecici,
+                           font_yolu=config.get('PDF_FONT_PATH'), ilerleme=ilerleme)
+        os.replace(gecici, hedef)
+    finally:
+        for yol in (gecici, ilerleme_yolu):
+            if os.path.exists(yol):
+                os.remove(yol)
+
+
+def _executor_al(app):
+    global _executor
+    if _executor is None:
+        # spawn: üst süreçteki veritabanı bağlantıları işçilere kopyalanmaz
+        _executor = ProcessPoolExecutor(
+            max_workers=app.config.get('EXPORT_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def _isci_config(app):
+    return {
+        # Göreli sqlite yolları instance klasörüne göre çözülmüş haliyle
+        'SQLALCHEMY_DATABASE_URI': db.engine.url.render_as_string(hide_password=False),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'PDF_FONT_PATH': app.config.get('PDF_FONT_PATH'),
+        # İşçi tek bağlantı kullanır; pragmalar ana uygulamayla aynı
+        **{k: app.config[k] for k in (
+            'SQLITE_TUNING', 'SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_CACHE_SIZE_KB', 'SQLITE_MMAP_SIZE_MB'
+        )},
+        'DB_POOL_SIZE': 1,
+    }
+
+
+def _tamamlandi(app, isi, future):
+    hata = future.exception()
+    isi.bitis = time.monotonic()
+    if hata is None:
+        isi.ilerleme = 1.0
+        isi.durum = 'tamamlandi'
+        # Tamamlanan işler bundan sonra önbellekteki dosyalarından bulunur
+        with _kilit:
+            if _isler.get(isi.id) is isi:
+                del _isler[isi.id]
+        onbellegi_buda(app)
+    else:
+        isi.hata = str(hata)
+        isi.durum = 'hata'
+        with _kilit:
+            _isleri_buda()
+
+
+def is_baslat(app, format, args):
+    """
+    İşi başlat veya mevcut olanı döndür. Veri değişmediyse önbellekteki
+    dosya hemen 'tamamlandi' olarak döner; aynı iş zaten çalışıyorsa
+    yeniden başlatılmaz.
+    """
+    if format not in exporters.FORMATLAR:
+        raise ValueError(f'Desteklenmeyen format: {format}')
+    is_id = is_anahtari(format, args)
+    yol = _dosya_yolu(app, is_id)
+
+    with _kilit:
+        _isleri_buda()
+        isi = _isler.get(is_id)
+        if isi is not None and isi.durum in ('bekliyor', 'calisiyor'):
+            _isler.move_to_end(is_id)
+            return isi
+        isi = ExportIsi(is_id, format, yol)
+        if _onbellekte_mi(yol):
+            isi.durum = 'tamamlandi'
+            isi.ilerleme = 1.0
+            return isi
+        isi.durum = 'calisiyor'
+        _isler[is_id] = isi
+        _isler.move_to_end(is_id)
+
+    future = _executor_al(app).submit(
+        _isci_calistir, format, _filtreler(args), yol, _isci_config(app)
+    )
+    future.add_done_callback(lambda f: _tamamlandi(app, isi, f))
+    return isi
+
+
+def senkron_uret(app, format, args):
+    """İstek içinde üret (veya önbellekten al) ve işi döndür"""
+    is_id = is_anahtari(format, args)
+    isi = ExportIsi(is_id, format, _dosya_yolu(app, is_id))
+    if not _onbellekte_mi(isi.dosya_yolu):
+        gecici = f'{isi.dosya_yolu}.{uuid.uuid4().hex}.tmp'
+        try:
+            exporters.uret(format, args, gecici, font_yolu=app.config.get('PDF_FONT_PATH'))
+            os.replace(gecici, isi.dosya_yolu)
+        finally:
+            if os.path.exists(gecici):
+                os.remove(gecici)
+        onbellegi_buda(app)
+    isi.durum = 'tamamlandi'
+    isi.ilerleme = 1.0
+    return isi
+
+
+def is_getir(app, is_id):
+    """
+    İşi bul. Bu süreçte bilinmiyorsa (ör. başka gunicorn işçisi başlattıysa)
+    önbellekte dosyası varsa tamamlanmış sayılır.
+    """
+    with _kilit:
+        _isleri_buda()
+        isi = _isler.get(is_id)
+        if isi is not None:
+            _isler.move_to_end(is_id)
+    if isi is not None:
+        return isi
+
+    format = is_id.split('-', 1)[0]
+    if format not in exporters.FORMATLAR or not is_id.replace('-', '').isalnum():
+        return None
+    yol = _dosya_yolu(app, is_id)
+    if not _onbellekte_mi(yol):
+        return None
+    isi = ExportIsi(is_id, format, yol)
+    isi.durum = 'tamamlandi'
+    isi.ilerleme = 1.0
+    return isi
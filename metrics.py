@@ -0,0 +1,65 @@
+"""Prometheus metin formatında /metrics çıktısı"""
+import bisect
+import threading
+
+# Her toplayıcı (ad, tip, açıklama, [(etiketler, değer)]) demetleri üretir.
+# Örnek (sonek, etiketler, değer) da olabilir: ad + sonek yazılır (_bucket vb.)
+_toplayicilar = []
+
+
+def toplayici_ekle(fonksiyon):
+    """Metrik toplayıcı fonksiyonu kaydet (dekoratör olarak da kullanılabilir)"""
+    _toplayicilar.append(fonksiyon)
+    return fonksiyon
+
+
+def _etiketler(etiketler):
+    if not etiketler:
+        return ''
+    icerik = ','.join(
+        f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for k, v in etiketler.items()
+    )
+    return '{' + icerik + '}'
+
+
+def prometheus_metni():
+    satirlar = []
+    for toplayici in _toplayicilar:
+        for ad, tip, aciklama, ornekler in toplayici():
+            satirlar.append(f'# HELP {ad} {aciklama}')
+            satirlar.append(f'# TYPE {ad} {tip}')
+            for ornek in ornekler:
+                sonek, etiketler, deger = ornek if len(ornek) == 3 else ('', *ornek)
+                satirlar.append(f'{ad}{sonek}{_etiketler(etiketler)} {deger}')
+    return '\n'.join(satirlar) + '\n'
+
+
+class Histogram:
+    """Etiket kümesi başına kümülatif kovalı histogram (thread güvenli)"""
+
+    def __init__(self, kovalar):
+        self.kovalar = tuple(sorted(kovalar))
+        self._seriler = {}
+        self._kilit = threading.Lock()
+
+    def gozlemle(self, etiketler, deger):
+        anahtar = tuple(sorted(etiketler.items()))
+        with self._kilit:
+            seri = self._seriler.get(anahtar)
+            if seri is None:
+                # [kova sayıları..., +Inf], toplam
+                seri = self._seriler[anahtar] = [[0] * (len(self.kovalar) + 1), 0.0]
+            seri[0][bisect.bisect_left(self.kovalar, deger)] += 1
+            seri[1] += deger
+
+    def ornekler(self):
+        with self._kilit:
+            seriler = [(dict(k), list(sayilar), toplam) for k, (sayilar, toplam) in self._seriler.items()]
+        for etiketler, sayilar, toplam in seriler:
+            kumulatif = 0
+            for sinir, adet in zip(self.kovalar + ('+Inf',), sayilar):
+                kumulatif += adet
+                yield '_bucket', {**etiketler, 'le': sinir}, kumulatif
+            yield '_sum', etiketler, round(toplam, 6)
+            yield '_count', etiketler, kumulatif
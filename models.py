@@ -6,6 +6,16 @@ db = SQLAlchemy()
 class Ekipman(db.Model):
     """Ekipman/Envanter tablosu"""
     __tablename__ = 'ekipman'
+    __table_args__ = (
+        # Liste: ORDER BY olusturma_tarihi DESC, id DESC (keyset sayfalama)
+        db.Index('ix_ekipman_olusturma', 'olusturma_tarihi'),
+        # Liste: kategori (+ durum) filtresi + aynı sıralama
+        db.Index('ix_ekipman_kategori_durum_olusturma', 'kategori', 'durum', 'olusturma_tarihi'),
+        # Liste: sadece durum filtresi + aynı sıralama
+        db.Index('ix_ekipman_durum_olusturma', 'durum', 'olusturma_tarihi'),
+        # Sürüm damgası: MAX(guncelleme_tarihi)
+        db.Index('ix_ekipman_guncelleme', 'guncelleme_tarihi'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     kategori = db.Column(db.String(50), nullable=False)  # Monitör, Klavye, Modem, vs.
@@ -45,6 +55,12 @@ class Ekipman(db.Model):
 class EkipmanHareket(db.Model):
     """Ekipman giriş/çıkış hareketleri tablosu"""
     __tablename__ = 'ekipman_hareket'
+    __table_args__ = (
+        # Ekipman geçmişi: WHERE ekipman_id = ? ORDER BY tarih DESC
+        db.Index('ix_hareket_ekipman_tarih', 'ekipman_id', db.text('tarih DESC')),
+        # Son hareketler: ORDER BY tarih DESC, id DESC
+        db.Index('ix_hareket_tarih', 'tarih'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     ekipman_id = db.Column(db.Integer, db.ForeignKey('ekipman.id'), nullable=False)
@@ -61,6 +77,8 @@ class EkipmanHareket(db.Model):
     aciklama = db.Column(db.Text)
     teslim_alan = db.Column(db.String(200))  # İşlemi yapan kişi
     onaylayan = db.Column(db.String(200))  # Onaylayan yönetici
+    # Hareket yazıldığı andaki ekipman kategorisi (aylık özet bu hücreye sayar)
+    kategori = db.Column(db.String(50))
     
     def to_dict(self):
         return {
@@ -74,10 +92,50 @@ class EkipmanHareket(db.Model):
             'lokasyon': self.lokasyon,
             'aciklama': self.aciklama,
             'teslim_alan': self.teslim_alan,
-            'onaylayan': self.onaylayan
+            'onaylayan': self.onaylayan,
+            'kategori': self.kategori
         }
 
 
+class EkipmanHareketArsiv(db.Model):
+    """Arşivlenen eski hareketler (id ve alanlar ekipman_hareket'teki haliyle)"""
+    __tablename__ = 'ekipman_hareket_arsiv'
+    __table_args__ = (
+        # Ekipman geçmişi ve arşiv listesi: ekipman_hareket ile aynı sorgu şekilleri
+        db.Index('ix_hareket_arsiv_ekipman_tarih', 'ekipman_id', db.text('tarih DESC')),
+        db.Index('ix_hareket_arsiv_tarih', 'tarih'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    ekipman_id = db.Column(db.Integer, nullable=False)  # Ekipman silinse de arşiv kalır
+    hareket_tipi = db.Column(db.String(20), nullable=False)
+    tarih = db.Column(db.DateTime, nullable=False)
+    kullanici_adi = db.Column(db.String(200))
+    kullanici_personel_no = db.Column(db.String(50))
+    birim = db.Column(db.String(200))
+    lokasyon = db.Column(db.String(300))
+    aciklama = db.Column(db.Text)
+    teslim_alan = db.Column(db.String(200))
+    onaylayan = db.Column(db.String(200))
+    kategori = db.Column(db.String(50))  # Hareket yazıldığı andaki ekipman kategorisi
+    arsiv_tarihi = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class HareketOzeti(db.Model):
+    """Ay x birim x hareket tipi x kategori bazında hareket sayıları (raporlar için)"""
+    __tablename__ = 'hareket_ozet_aylik'
+    __table_args__ = (
+        # Rapor: WHERE kategori = ? AND hareket_tipi = ? (+ ay aralığı); ay filtresi PK'dan
+        db.Index('ix_hareket_ozet_kategori_tip_ay', 'kategori', 'hareket_tipi', 'ay'),
+    )
+    
+    ay = db.Column(db.String(7), primary_key=True)  # YYYY-AA
+    birim = db.Column(db.String(200), primary_key=True)  # Boş birim '' olarak tutulur
+    hareket_tipi = db.Column(db.String(20), primary_key=True)
+    kategori = db.Column(db.String(50), primary_key=True)
+    adet = db.Column(db.Integer, nullable=False, default=0)
+
+
 class Kategori(db.Model):
     """Ekipman kategorileri tablosu"""
     __tablename__ = 'kategori'
@@ -92,3 +150,122 @@ class Kategori(db.Model):
             'ad': self.ad,
             'aciklama': self.aciklama
         }
+
+
+class EkipmanSayac(db.Model):
+    """Kategori x durum bazında ekipman sayaçları (istatistikler için)"""
+    __tablename__ = 'ekipman_sayac'
+    
+    kategori = db.Column(db.String(50), primary_key=True)
+    durum = db.Column(db.String(50), primary_key=True)
+    adet = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'kategori': self.kategori,
+            'durum': self.durum,
+            'adet': self.adet
+        }
+
+
+class EkipmanZimmet(db.Model):
+    """Ekipman başına güncel zimmet projeksiyonu (son hareketten türetilir)"""
+    __tablename__ = 'ekipman_zimmet_guncel'
+    __table_args__ = (
+        # Personel / birim / lokasyon listeleri: WHERE x = ? ORDER BY tarih DESC
+        db.Index('ix_zimmet_personel_tarih', 'kullanici_personel_no', 'tarih'),
+        db.Index('ix_zimmet_birim_tarih', 'birim', 'tarih'),
+        db.Index('ix_zimmet_lokasyon_tarih', 'lokasyon', 'tarih'),
+    )
+    
+    ekipman_id = db.Column(db.Integer, db.ForeignKey('ekipman.id', ondelete='CASCADE'), primary_key=True)
+    hareket_id = db.Column(db.Integer, nullable=False)  # Projeksiyonun kaynağı olan son hareket
+    hareket_tipi = db.Column(db.String(20), nullable=False)
+    tarih = db.Column(db.DateTime, nullable=False)
+    kullanici_adi = db.Column(db.String(200))
+    kullanici_personel_no = db.Column(db.String(50))
+    birim = db.Column(db.String(200))
+    lokasyon = db.Column(db.String(300))
+    
+    def to_dict(self):
+        return {
+            'ekipman_id': self.ekipman_id,
+            'hareket_id': self.hareket_id,
+            'hareket_tipi': self.hareket_tipi,
+            'tarih': self.tarih.isoformat() if self.tarih else None,
+            'kullanici_adi': self.kullanici_adi,
+            'kullanici_personel_no': self.kullanici_personel_no,
+            'birim': self.birim,
+            'lokasyon': self.lokasyon
+        }
+
+
+class TabloSurum(db.Model):
+    """Önbellek geçersizleme için tablo bazlı sürüm sayaçları (süreçler arası)"""
+    __tablename__ = 'tablo_surum'
+    
+    ad = db.Column(db.String(50), primary_key=True)
+    surum = db.Column(db.Integer, nullable=False, default=0)
+
+
+class IdempotencyKaydi(db.Model):
+    """Idempotency-Key ile yapılmış yazma isteklerinin saklanan yanıtları"""
+    __tablename__ = 'idempotency_anahtari'
+    __table_args__ = (
+        # Süresi dolan kayıtların temizliği
+        db.Index('ix_idempotency_olusturma', 'olusturma_tarihi'),
+    )
+    
+    anahtar = db.Column(db.String(200), primary_key=True)
+    istek_ozeti = db.Column(db.String(64), nullable=False)  # method + yol + gövde sha256
+    durum_kodu = db.Column(db.Integer)  # NULL: istek henüz tamamlanmadı
+    yanit = db.Column(db.Text)
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class Olay(db.Model):
+    """Değişiklik olay günlüğü: sira, SSE akışında Last-Event-ID olarak kullanılır"""
+    __tablename__ = 'olay_gunlugu'
+    # Silinen en yüksek sıra numarası tekrar verilmesin (istemci imleçleri geçerli kalır)
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    sira = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tarih = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    veri = db.Column(db.Text, nullable=False)  # JSON olay gövdesi
+
+
+class SayimOturumu(db.Model):
+    """Stok sayımı oturumu: beklenen küme kategori ve/veya lokasyondaki 'Depoda' ekipmanlar"""
+    __tablename__ = 'sayim_oturumu'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kategori = db.Column(db.String(50))
+    lokasyon = db.Column(db.String(300))
+    aciklama = db.Column(db.Text)
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    kapanis_tarihi = db.Column(db.DateTime)  # NULL: okuma eklenebilir
+    
+    okumalar = db.relationship('SayimOkuma', backref='oturum', lazy=True, cascade='all, delete-orphan')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kategori': self.kategori,
+            'lokasyon': self.lokasyon,
+            'aciklama': self.aciklama,
+            'olusturma_tarihi': self.olusturma_tarihi.isoformat() if self.olusturma_tarihi else None,
+            'kapanis_tarihi': self.kapanis_tarihi.isoformat() if self.kapanis_tarihi else None
+        }
+
+
+class SayimOkuma(db.Model):
+    """Sayım oturumunda okutulan tek kod (barkod veya seri no, çözümlenmemiş haliyle)"""
+    __tablename__ = 'sayim_okuma'
+    __table_args__ = (
+        db.Index('ix_sayim_okuma_oturum', 'oturum_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    oturum_id = db.Column(db.Integer, db.ForeignKey('sayim_oturumu.id', ondelete='CASCADE'), nullable=False)
+    kod = db.Column(db.String(100), nullable=False)
+    tarih = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,175 @@
+"""
+Hareket kaydı durum makinesi. Ekipman durumu tek bir koşullu UPDATE ile
+(WHERE durum = <okunan durum>) değiştirilir; araya başka bir istek girdiyse
+güncelleme 0 satır etkiler ve hareket reddedilir. PostgreSQL'de satırlar
+ayrıca SELECT ... FOR UPDATE ile kilitlenir.
+"""
+from collections import namedtuple
+
+from sqlalchemy import insert, update
+from models import db, Ekipman, EkipmanHareket
+import counters
+import custody
+import events
+import rollups
+
+Gecis = namedtuple('Gecis', 'kaynaklar hedef')
+
+# Hareket tipi -> (izin verilen mevcut durumlar, yeni durum).
+# None: durumu boş (eski kayıtlar) ekipman
+GECISLER = {
+    'Giriş': Gecis((None, 'Depoda', 'Arızalı'), 'Depoda'),
+    'Çıkış': Gecis(('Depoda',), 'Kullanımda'),
+    'Transfer': Gecis(('Kullanımda',), 'Kullanımda'),
+    'İade': Gecis(('Kullanımda',), 'Depoda'),
+    'Arıza': Gecis((None, 'Depoda', 'Kullanımda'), 'Arızalı'),
+    'Hurda': Gecis((None, 'Depoda', 'Kullanımda', 'Arızalı'), 'Hurda'),
+}
+
+HAREKET_ALANLARI = ('kullanici_adi', 'kullanici_personel_no', 'birim', 'lokasyon',
+                    'aciklama', 'teslim_alan', 'onaylayan')
+
+# Tek istekte işlenebilecek en fazla ekipman
+MAKS_TOPLU = 1000
+
+_ekipman = Ekipman.__table__
+
+
+class HareketHatasi(ValueError):
+    """Hareket uygulanamadı; durum_kodu HTTP yanıt koduna karşılık gelir"""
+
+    def __init__(self, mesaj, durum_kodu=400, **detay):
+        super().__init__(mesaj)
+        self.durum_kodu = durum_kodu
+        self.detay = detay
+
+
+def gecis_al(hareket_tipi):
+    gecis = GECISLER.get(hareket_tipi)
+    if gecis is None:
+        raise HareketHatasi(
+            f'Geçersiz hareket tipi: {hareket_tipi}. Geçerli tipler: {", ".join(GECISLER)}'
+        )
+    return gecis
+
+
+def _ekipman_idleri(degerler):
+    try:
+        idler = list(dict.fromkeys(int(d) for d in degerler))
+    except (TypeError, ValueError):
+        raise HareketHatasi('ekipman_id tam sayı olmalı.')
+    if not idler:
+        raise HareketHatasi('En az bir ekipman_id gerekli.')
+    if len(idler) > MAKS_TOPLU:
+        raise HareketHatasi(f'Tek istekte en fazla {MAKS_TOPLU} ekipman işlenebilir.')
+    return idler
+
+
+def _oku(connection, idler):
+    """{id: (kategori, durum)}; PostgreSQL'de satırlar transaction sonuna kadar kilitlenir"""
+    sorgu = db.select(_ekipman.c.id, _ekipman.c.kategori, _ekipman.c.durum) \
+        .where(_ekipman.c.id.in_(idler))
+    if connection.dialect.name == 'postgresql':
+        sorgu = sorgu.with_for_update()
+    return {id: (kategori, durum) for id, kategori, durum in connection.execute(sorgu)}
+
+
+def _durum_kosulu(durum):
+    return _ekipman.c.durum.is_(None) if durum is None else _ekipman.c.durum == durum
+
+
+def durumlari_degistir(connection, hareket_tipi, idler):
+    """
+    Geçişi kontrol et ve ekipmanların durumunu koşullu UPDATE ile değiştir.
+    Hepsi ya birlikte değişir ya da HareketHatasi fırlatılır (çağıran geri alır).
+    Okunan {id: (kategori, eski durum)} sözlüğünü döner.
+    """
+    gecis = gecis_al(hareket_tipi)
+    mevcut = _oku(connection, idler)
+
+    eksik = [i for i in idler if i not in mevcut]
+    if eksik:
+        raise HareketHatasi('Ekipman bulunamadı.', 404, ekipman_idler=eksik)
+    uygunsuz = [{'ekipman_id': i, 'durum': mevcut[i][1]} for i in idler
+                if mevcut[i][1] not in gecis.kaynaklar]
+    if uygunsuz:
+        raise HareketHatasi(
+            f'{hareket_tipi} hareketi bu durumdaki ekipmana uygulanamaz.', 409,
+            uygunsuz=uygunsuz
+        )
+
+    # Okunan duruma göre grupla: her grup için tek koşullu UPDATE
+    gruplar = {}
+    for i in idler:
+        gruplar.setdefault(mevcut[i][1], []).append(i)
+    degisen = 0
+    for eski, grup in gruplar.items():
+        degisen += connection.execute(
+            update(_ekipman).where(_ekipman.c.id.in_(grup), _durum_kosulu(eski))
+            .values(durum=gecis.hedef)
+        ).rowcount
+    if degisen != len(idler):
+        raise HareketHatasi('Ekipman durumu eşzamanlı olarak değişti, tekrar deneyin.', 409)
+    for i in idler:
+        if mevcut[i][1] != gecis.hedef:
+            events.olay_ekle('ekipman', i, 'guncellendi', {'durum': gecis.hedef})
+
+    # Core UPDATE mapper olaylarını tetiklemez: sayaçlar elle güncellenir
+    degisim = {}
+    for kategori, eski in mevcut.values():
+        if eski != gecis.hedef:
+            degisim[(kategori, eski or '')] = degisim.get((kategori, eski or ''), 0) - 1
+            degisim[(kategori, gecis.hedef)] = degisim.get((kategori, gecis.hedef), 0) + 1
+    counters.sayac_degistir(connection, degisim)
+    return mevcut
+
+
+def _hareket_bilgileri(veri):
+    return {alan: veri.get(alan) for alan in HAREKET_ALANLARI}
+
+
+def hareket_kaydet(veri):
+    """Tek hareket: durum geçişi + hareket kaydı (commit çağıranda)"""
+    if not veri or not veri.get('hareket_tipi') or veri.get('ekipman_id') is None:
+        raise HareketHatasi('ekipman_id ve hareket_tipi zorunlu.')
+    ekipman_id, = _ekipman_idleri([veri['ekipman_id']])
+
+    mevcut = durumlari_degistir(db.session.connection(), veri['hareket_tipi'], [ekipman_id])
+    hareket = EkipmanHareket(
+        ekipman_id=ekipman_id,
+        hareket_tipi=veri['hareket_tipi'],
+        kategori=mevcut[ekipman_id][0],
+        **_hareket_bilgileri(veri)
+    )
+    db.session.add(hareket)
+    db.session.flush()
+    return hareket
+
+
+def toplu_cikis(veri):
+    """
+    Birden çok ekipmanı tek transaction'da aynı kişiye zimmetle. Ekipmanlardan
+    biri bile uygun değilse hiçbiri değişmez. Hareket id'lerini döndürür.
+    """
+    if not veri or not isinstance(veri.get('ekipman_idler'), list):
+        raise HareketHatasi('ekipman_idler listesi zorunlu.')
+    idler = _ekipman_idleri(veri['ekipman_idler'])
+
+    connection = db.session.connection()
+    mevcut = durumlari_degistir(connection, 'Çıkış', idler)
+
+    bilgiler = _hareket_bilgileri(veri)
+    kayitlar = [{'ekipman_id': i, 'hareket_tipi': 'Çıkış', 'kategori': mevcut[i][0], **bilgiler}
+                for i in idler]
+    sonuc = connection.execute(
+        insert(EkipmanHareket).returning(
+            EkipmanHareket.id, EkipmanHareket.tarih, sort_by_parameter_order=True
+        ),
+        kayitlar
+    ).all()
+    hareketler = [{'id': id, 'tarih': tarih, **kayit} for (id, tarih), kayit in zip(sonuc, kayitlar)]
+    custody.zimmet_guncelle(connection, hareketler)
+    rollups.ozete_ekle(connection, hareketler)
+    for hareket in hareketler:
+        events.olay_ekle('hareket', hareket['id'], 'eklendi', hareket)
+    return [id for id, _ in sonuc]
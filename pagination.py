@@ -0,0 +1,132 @@
+"""Keyset (imleç) tabanlı sayfalama ve alan projeksiyonu yardımcıları"""
+import base64
+import itertools
+from datetime import datetime
+
+from models import db
+from serialization import Eslestirme, json_yanit, ndjson_yanit
+
+VARSAYILAN_LIMIT = 100
+MAKS_LIMIT = 1000
+# NDJSON akışında veritabanından tek seferde okunan satır
+NDJSON_PARCA = 1000
+
+
+class SayfalamaHatasi(ValueError):
+    """Geçersiz limit / cursor / fields parametresi"""
+
+
+def parse_limit(deger):
+    """`limit` parametresini doğrula (1..MAKS_LIMIT)"""
+    if deger in (None, ''):
+        return VARSAYILAN_LIMIT
+    try:
+        limit = int(deger)
+    except (TypeError, ValueError):
+        raise SayfalamaHatasi('limit bir tam sayı olmalı.')
+    if limit < 1:
+        raise SayfalamaHatasi('limit en az 1 olmalı.')
+    return min(limit, MAKS_LIMIT)
+
+
+def encode_cursor(sira_degeri, id):
+    """(sıralama değeri, id) çiftini opak bir imlece çevir"""
+    ham = f'{sira_degeri.isoformat() if sira_degeri else ""}|{id}'
+    return base64.urlsafe_b64encode(ham.encode()).decode().rstrip('=')
+
+
+def decode_cursor(imlec):
+    """encode_cursor ile üretilmiş imleci çöz"""
+    try:
+        dolgu = '=' * (-len(imlec) % 4)
+        ham = base64.urlsafe_b64decode(imlec + dolgu).decode()
+        tarih, id = ham.rsplit('|', 1)
+        return (datetime.fromisoformat(tarih) if tarih else None), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise SayfalamaHatasi('Geçersiz cursor.')
+
+
+def parse_fields(model, deger, ek_alanlar=()):
+    """`fields=a,b,c` parametresini modelin (ve birleştirilen) kolon adlarına çevir"""
+    kolonlar = [c.name for c in model.__table__.columns] + list(ek_alanlar)
+    if not deger:
+        return kolonlar
+    alanlar = [a.strip() for a in deger.split(',') if a.strip()]
+    bilinmeyen = [a for a in alanlar if a not in kolonlar]
+    if bilinmeyen:
+        raise SayfalamaHatasi(f'Bilinmeyen alan(lar): {", ".join(bilinmeyen)}')
+    return alanlar
+
+
+def _keyset_kosulu(id_kolonu, sira_kolonu, sira_degeri, id):
+    """
+    (sira DESC NULLS LAST, id DESC) sırasında imleçten sonraki satırlar.
+    `sira <= ?` sınırı indekste aralık araması yapılmasını sağlar; NULL
+    sıralı kuyruk bu koşula girmez, sayfali_liste onu ayrıca ekler.
+    """
+    if sira_degeri is None:
+        return db.and_(sira_kolonu.is_(None), id_kolonu < id)
+    return db.and_(
+        sira_kolonu <= sira_degeri,
+        db.or_(sira_kolonu < sira_degeri, id_kolonu < id),
+    )
+
+
+def sayfali_liste(model, sira_kolonu, filtreler, args, id_kolonu=None, ek_kolonlar=None):
+    """
+    Filtrelenmiş listeyi (sira_kolonu DESC, id DESC) üzerinden keyset
+    sayfalama ile döndür. Sadece istenen kolonlar seçilir, ORM nesnesi
+    yüklenmez. Toplam kayıt `X-Total-Count`, sonraki sayfa imleci
+    `X-Next-Cursor` başlığında döner. `ek_kolonlar` ({ad: kolon}) başka
+    tablodan alanlar ekler; birleştirme koşulu filtrelerde verilir.
+    `format=ndjson` imleçten sonraki tüm satırları limitsiz akıtır.
+    """
+    id_kolonu = model.id if id_kolonu is None else id_kolonu
+    ek_kolonlar = ek_kolonlar or {}
+    ndjson = args.get('format') == 'ndjson'
+    limit = parse_limit(args.get('limit'))
+    alanlar = parse_fields(model, args.get('fields'), ek_kolonlar)
+
+    # İmleç için id ve sıralama kolonu her zaman seçilir
+    secilen = [ek_kolonlar[a] if a in ek_kolonlar else getattr(model, a) for a in alanlar]
+    eslestirme = Eslestirme(list(zip(alanlar, secilen)))
+    secilen += [id_kolonu.label('_id'), sira_kolonu.label('_sira')]
+
+    toplam = db.session.query(db.func.count(id_kolonu)).filter(*filtreler).scalar()
+
+    temel = db.session.query(*secilen).filter(*filtreler)
+    sorgu = temel
+    imlec = args.get('cursor')
+    sira_degeri = None
+    if imlec:
+        sira_degeri, son_id = decode_cursor(imlec)
+        sorgu = sorgu.filter(_keyset_kosulu(id_kolonu, sira_kolonu, sira_degeri, son_id))
+    sorgu = sorgu.order_by(sira_kolonu.desc().nulls_last(), id_kolonu.desc())
+    # Dolu değerlerden sonra gelen NULL sıralı kuyruk (imleç kuyruktan önceyse)
+    kuyruk = None
+    if imlec and sira_degeri is not None and sira_kolonu.expression.nullable:
+        kuyruk = temel.filter(sira_kolonu.is_(None)).order_by(id_kolonu.desc())
+
+    if ndjson:
+        parcalar = [sorgu] + ([kuyruk] if kuyruk is not None else [])
+        response = ndjson_yanit(eslestirme, itertools.chain.from_iterable(
+            p.yield_per(NDJSON_PARCA) for p in parcalar
+        ))
+        response.headers['X-Total-Count'] = str(toplam)
+        return response
+
+    satirlar = sorgu.limit(limit + 1).all()
+    if kuyruk is not None and len(satirlar) <= limit:
+        satirlar += kuyruk.limit(limit + 1 - len(satirlar)).all()
+
+    sonraki = None
+    if len(satirlar) > limit:
+        satirlar = satirlar[:limit]
+        son = satirlar[-1]
+        sonraki = encode_cursor(son._sira, son._id)
+
+    response = json_yanit(eslestirme.satirlar(satirlar))
+    response.headers['X-Total-Count'] = str(toplam)
+    if sonraki:
+        response.headers['X-Next-Cursor'] = sonraki
+    return response
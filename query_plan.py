@@ -0,0 +1,121 @@
+"""
+API sorgularının indeks kullanımını doğrula: okuma uçları test istemcisiyle
+çağrılır, çalışan SELECT'ler yakalanır ve her biri EXPLAIN QUERY PLAN ile
+incelenir. İndekssiz tam tablo taraması (ör. "SCAN ekipman") hata sayılır.
+"""
+import re
+from urllib.parse import quote
+
+from sqlalchemy import event
+from models import db, Ekipman, EkipmanHareket, EkipmanZimmet
+import scanner
+
+# Bilerek tamamen okunan küçük tablolar (kategori kaydı, sayaç matrisi,
+# sürümler, FTS tablosu var mı kontrolü)
+KUCUK_TABLOLAR = {'kategori', 'ekipman_sayac', 'tablo_surum', 'sqlite_master'}
+
+# SQLite 3.36 öncesi "SCAN TABLE ekipman [AS e]", sonrası "SCAN ekipman" yazar;
+# "... USING INDEX" ile biten satırlar indeksli taramadır
+_TAM_TARAMA = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+# Alt sorgu / pencere sonuçları: taranmaları tablo taraması değildir
+_ARA_SONUC = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (\w+)$')
+
+
+def _kontrol_yollari(app):
+    """Gerçek sorgu şekillerini üreten GET istekleri (imleçli sayfalar dahil)"""
+    with app.app_context():
+        ekipman = db.session.query(Ekipman.id, Ekipman.kategori, Ekipman.durum,
+                                   Ekipman.barkod).order_by(Ekipman.id.desc()).first()
+        ekipman_id = db.session.query(db.func.max(EkipmanHareket.ekipman_id)).scalar()
+        zimmet = db.session.query(EkipmanZimmet).order_by(EkipmanZimmet.tarih.desc()).first()
+
+    yollar = ['/api/kategoriler', '/api/kategoriler?with_counts=1', '/api/istatistikler']
+    if ekipman is not None:
+        yollar += [
+            '/api/ekipman?limit=1',
+            f'/api/ekipman?kategori={ekipman.kategori}&limit=1',
+            f'/api/ekipman?durum={ekipman.durum}&limit=1',
+            f'/api/ekipman?kategori={ekipman.kategori}&durum={ekipman.durum}&limit=1',
+            '/api/ekipman?arama=test&limit=1',
+            f'/api/ekipman/{ekipman.id}',
+            '/api/ekipman/ara?q=test',
+        ]
+        if ekipman.barkod:
+            yollar.append(f'/api/ekipman/ara?q={ekipman.barkod}')
+            yollar.append(f'/api/tara?kod={quote(ekipman.barkod)}&detay=1')
+    yollar += ['/api/hareket?limit=1', '/api/hareket?arsiv=1&limit=1',
+               f"/api/raporlar/hareket?kategori=Laptop&hareket_tipi={quote('Çıkış')}&grupla=ay,birim"]
+    if ekipman_id is not None:
+        yollar.append(f'/api/hareket?ekipman_id={ekipman_id}&limit=1')
+        yollar.append(f'/api/hareket?ekipman_id={ekipman_id}&arsiv=1&limit=1')
+        yollar.append(f'/api/ekipman/{ekipman_id}/zimmet')
+        yollar.append(f'/api/ekipman/{ekipman_id}?include=hareketler')
+        yollar.append(f'/api/ekipman?ids={ekipman_id}&include=hareketler')
+    if zimmet is not None:
+        for parametre, deger in (('personel_no', zimmet.kullanici_personel_no),
+                                 ('birim', zimmet.birim), ('lokasyon', zimmet.lokasyon)):
+            if deger:
+                yollar.append(f'/api/zimmet?{parametre}={quote(deger)}&limit=1')
+    return yollar
+
+
+def _sorgulari_yakala(app, yollar):
+    """İstekleri çalıştır; (yol, sql, parametreler) listesi döndür"""
+    yakalanan = []
+    istemci = app.test_client()
+    with app.app_context():
+        engine = db.engine
+        # Tarama indeksinin tek seferlik tam yüklemesi istek yolunda sayılmasın
+        scanner.aktif_kayit().yukle()
+
+    def dinleyici(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            yakalanan.append((aktif[0], statement, parameters))
+
+    aktif = [None]
+    event.listen(engine, 'before_cursor_execute', dinleyici)
+    try:
+        for yol in yollar:
+            aktif[0] = yol
+            yanit = istemci.get(yol)
+            # İlk sayfa imleç döndürdüyse ikinci sayfanın sorgusunu da dene
+            imlec = yanit.headers.get('X-Next-Cursor')
+            if imlec:
+                aktif[0] = f'{yol}&cursor=...'
+                istemci.get(f'{yol}&cursor={imlec}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', dinleyici)
+    return yakalanan
+
+
+def tam_taramalar(plan):
+    """EXPLAIN QUERY PLAN detay satırlarında indekssiz taranan büyük tablolar"""
+    ara_sonuclar = {m.group(1) for m in map(_ARA_SONUC.match, plan) if m}
+    return [m.group(1) for m in map(_TAM_TARAMA.match, plan)
+            if m and m.group(1) not in KUCUK_TABLOLAR | ara_sonuclar]
+
+
+def kontrol_et(app):
+    """
+    Sorunlu sorguları döndür: [(yol, sql, plan satırları)]. SQLite dışındaki
+    veritabanlarında None döner (plan biçimi farklı).
+    """
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            return None
+
+    sorunlar = []
+    gorulen = set()
+    yakalanan = _sorgulari_yakala(app, _kontrol_yollari(app))
+    with app.app_context():
+        connection = db.session.connection()
+        for yol, statement, parametreler in yakalanan:
+            if statement in gorulen:
+                continue
+            gorulen.add(statement)
+            plan = [satir[3] for satir in connection.exec_driver_sql(
+                'EXPLAIN QUERY PLAN ' + statement, parametreler
+            )]
+            if tam_taramalar(plan):
+                sorunlar.append((yol, statement, plan))
+    return sorunlar
@@ -0,0 +1,175 @@
+"""
+Aylık hareket özeti (hareket_ozet_aylik): ay x birim x hareket tipi x
+kategori başına hareket sayısı. Sayaç tablosu gibi hareket yazımıyla aynı
+transaction içinde artımlı güncellenir; /api/raporlar/hareket ham geçmişi
+taramadan buradan okur. Arşive taşınan hareketler özetten düşmez.
+
+Kategori, hareket yazıldığı andaki ekipman kategorisidir ve hareketin
+kendisinde (kategori kolonu) saklanır; silinen hareket, eklendiği hücreden
+düşer. Kolon eklenmeden önce yazılmış (kategorisi boş) hareketlerde güncel
+ekipman kategorisi kullanılır.
+"""
+import re
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Ekipman, EkipmanHareket, EkipmanHareketArsiv, HareketOzeti
+
+_ozet = HareketOzeti.__table__
+_hareket = EkipmanHareket.__table__
+_arsiv = EkipmanHareketArsiv.__table__
+
+GRUPLAR = ('ay', 'birim', 'hareket_tipi', 'kategori')
+_AY = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+class RaporHatasi(ValueError):
+    """Geçersiz rapor parametresi"""
+
+
+# birim NULL olabilir, birincil anahtarda boş metinle tutulur
+def _anahtar(tarih, birim, hareket_tipi, kategori):
+    return tarih.strftime('%Y-%m'), birim or '', hareket_tipi, kategori
+
+
+def ozet_degistir(connection, degisimler):
+    """{(ay, birim, hareket_tipi, kategori): fark} sözlüğünü özet tablosuna uygula"""
+    degisimler = {k: v for k, v in degisimler.items() if v}
+    if not degisimler:
+        return
+    insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    stmt = insert(_ozet)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_ozet.c.ay, _ozet.c.birim, _ozet.c.hareket_tipi, _ozet.c.kategori],
+        set_={'adet': _ozet.c.adet + stmt.excluded.adet}
+    )
+    connection.execute(stmt, [
+        {'ay': ay, 'birim': birim, 'hareket_tipi': tip, 'kategori': kategori, 'adet': fark}
+        for (ay, birim, tip, kategori), fark in degisimler.items()
+    ])
+
+
+def ozete_ekle(connection, hareketler):
+    """
+    Core ile toplu yazılan hareketleri (tarih, birim, hareket_tipi, kategori
+    anahtarlı sözlükler) özete ekle
+    """
+    degisim = {}
+    for hareket in hareketler:
+        anahtar = _anahtar(hareket['tarih'], hareket.get('birim'), hareket['hareket_tipi'],
+                           hareket['kategori'])
+        degisim[anahtar] = degisim.get(anahtar, 0) + 1
+    ozet_degistir(connection, degisim)
+
+
+def _kategori(connection, hareket):
+    if hareket.kategori is not None:
+        return hareket.kategori
+    # Kategorisi kaydedilmemiş eski hareket; ekipman oturumda yüklüyse (ör. cascade silme) sorgu gerekmez
+    ekipman = inspect(hareket).attrs.ekipman.loaded_value
+    if isinstance(ekipman, Ekipman):
+        return ekipman.kategori
+    return connection.execute(
+        db.select(Ekipman.kategori).where(Ekipman.id == hareket.ekipman_id)
+    ).scalar()
+
+
+def _hareket_degisti(connection, hareket, fark):
+    kategori = _kategori(connection, hareket)
+    if kategori is not None:
+        ozet_degistir(connection, {
+            _anahtar(hareket.tarih, hareket.birim, hareket.hareket_tipi, kategori): fark
+        })
+
+
+@event.listens_for(EkipmanHareket, 'after_insert')
+def _hareket_eklendi(mapper, connection, target):
+    _hareket_degisti(connection, target, 1)
+
+
+@event.listens_for(EkipmanHareket, 'after_delete')
+def _hareket_silindi(mapper, connection, target):
+    _hareket_degisti(connection, target, -1)
+
+
+def _ay_ifadesi(connection, kolon):
+    if connection.dialect.name == 'postgresql':
+        return db.func.to_char(kolon, 'YYYY-MM')
+    return db.func.strftime('%Y-%m', kolon)
+
+
+def ozet_yeniden_hesapla(connection):
+    """Özet tablosunu canlı ve arşivlenmiş hareketlerden GROUP BY ile yeniden kur"""
+    connection.execute(_ozet.delete())
+    sorgular = []
+    canli = _hareket.outerjoin(Ekipman.__table__, Ekipman.id == _hareket.c.ekipman_id)
+    canli_kategori = db.func.coalesce(_hareket.c.kategori, Ekipman.kategori)
+    for tablo, kategori, kaynak in ((_hareket, canli_kategori, canli),
+                                    (_arsiv, _arsiv.c.kategori, _arsiv)):
+        ay = _ay_ifadesi(connection, tablo.c.tarih)
+        birim = db.func.coalesce(tablo.c.birim, '')
+        sorgular.append(
+            db.select(ay, birim, tablo.c.hareket_tipi, kategori, db.func.count())
+            .select_from(kaynak).where(kategori.is_not(None))
+            .group_by(ay, birim, tablo.c.hareket_tipi, kategori)
+        )
+    veriler = {}
+    for sorgu in sorgular:
+        for ay, birim, tip, kategori, adet in connection.execute(sorgu):
+            anahtar = (ay, birim, tip, kategori)
+            veriler[anahtar] = veriler.get(anahtar, 0) + adet
+    if veriler:
+        connection.execute(_ozet.insert(), [
+            {'ay': a, 'birim': b, 'hareket_tipi': t, 'kategori': k, 'adet': n}
+            for (a, b, t, k), n in veriler.items()
+        ])
+    return len(veriler)
+
+
+def _ay_parametresi(args, ad):
+    deger = args.get(ad)
+    if deger and not _AY.match(deger):
+        raise RaporHatasi(f'{ad} YYYY-AA biçiminde olmalı.')
+    return deger
+
+
+def hareket_raporu(args):
+    """
+    /api/raporlar/hareket: kategori / birim / hareket_tipi ve ay aralığı
+    (baslangic, bitis dahil) filtreli, `grupla` kolonlarına göre toplamlar
+    """
+    grupla = [g.strip() for g in args.get('grupla', ','.join(GRUPLAR)).split(',') if g.strip()]
+    bilinmeyen = [g for g in grupla if g not in GRUPLAR]
+    if bilinmeyen:
+        raise RaporHatasi(f'Bilinmeyen grup(lar): {", ".join(bilinmeyen)}. '
+                          f'Geçerli gruplar: {", ".join(GRUPLAR)}')
+    grupla = list(dict.fromkeys(grupla))
+    baslangic = _ay_parametresi(args, 'baslangic')
+    bitis = _ay_parametresi(args, 'bitis')
+
+    filtreler = [_ozet.c.adet > 0]
+    for ad in ('kategori', 'hareket_tipi'):
+        if args.get(ad):
+            filtreler.append(_ozet.c[ad] == args[ad])
+    if 'birim' in args:
+        filtreler.append(_ozet.c.birim == args['birim'])
+    if baslangic:
+        filtreler.append(_ozet.c.ay >= baslangic)
+    if bitis:
+        filtreler.append(_ozet.c.ay <= bitis)
+
+    kolonlar = [_ozet.c[g] for g in grupla]
+    sorgu = db.select(*kolonlar, db.func.sum(_ozet.c.adet)).where(*filtreler)
+    if kolonlar:
+        sorgu = sorgu.group_by(*kolonlar).order_by(*kolonlar)
+    satirlar = []
+    for satir in db.session.execute(sorgu):
+        *degerler, adet = satir
+        if not adet:
+            continue
+        kayit = dict(zip(grupla, degerler))
+        if 'birim' in kayit:
+            kayit['birim'] = kayit['birim'] or None
+        kayit['adet'] = adet
+        satirlar.append(kayit)
+    return {'satirlar': satirlar, 'toplam': sum(s['adet'] for s in satirlar), 'grupla': grupla}
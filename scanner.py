@@ -0,0 +1,305 @@
+"""
+Barkod okuyucu sıcak yolu (/api/tara). Barkod ve seri no -> ekipman id
+eşlemesi süreç belleğinde tutulur; okutulan kod veritabanına gitmeden
+çözülür.
+
+İndeks açılışta arka planda yüklenir ve olay günlüğünden (olay_gunlugu)
+güncel tutulur. ORM ve Core yazımlarının hepsi oraya olay düşürür. Bu
+süreçteki commit'ler bir sonraki okumada yansır, başka gunicorn
+işçilerininkiler en geç KONTROL_ARALIGI saniyede. Günlük budanıp aradaki
+olaylar kaybolduysa indeks baştan yüklenir. İndeks uygulama başınadır
+(app.extensions['tarama']).
+
+Stok sayımı: okutulan kodlar sayim_okuma tablosuna yazılır. Rapor tüm
+kodları bellekte çözer, beklenen 'Depoda' kümesini tek sorguyla okur ve
+eksik / beklenmeyen / tekrar okunanları küme işlemleriyle bulur.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+from models import db, Ekipman, EkipmanZimmet, SayimOkuma
+import events
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Başka süreçlerin değişiklikleri için günlük en fazla bu aralıkla okunur (saniye)
+KONTROL_ARALIGI = 1.0
+YUKLEME_PARCASI = 10000
+# Tek istekte çözülebilecek / sayıma eklenebilecek en fazla kod
+MAKS_KOD = 1000
+BEKLENEN_DURUM = 'Depoda'
+
+
+class TaramaHatasi(ValueError):
+    """Geçersiz kod listesi veya sayım isteği"""
+
+
+def kod_normalle(kod):
+    """Okuyucuların eklediği boşluk / satır sonlarını at"""
+    return kod.strip() if isinstance(kod, str) else ''
+
+
+def kodlari_oku(deger):
+    """JSON listesi veya `a,b,c` metninden kod listesi (sıra ve tekrarlar korunur)"""
+    if isinstance(deger, str):
+        deger = deger.split(',')
+    if not isinstance(deger, list):
+        raise TaramaHatasi('kodlar bir liste olmalı.')
+    kodlar = [kod_normalle(k) for k in deger]
+    kodlar = [k for k in kodlar if k]
+    if not kodlar:
+        raise TaramaHatasi('En az bir kod gerekli.')
+    if len(kodlar) > MAKS_KOD:
+        raise TaramaHatasi(f'Tek istekte en fazla {MAKS_KOD} kod gönderilebilir.')
+    return kodlar
+
+
+class TaramaIndeksi:
+    """barkod -> id, seri no -> id ve id -> (barkod, seri no) eşlemeleri"""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._barkod = {}
+        self._seri = {}
+        self._kodlar = {}
+        self._son_sira = None  # None: henüz yüklenmedi
+        self._son_kontrol = 0.0
+        self._kirli = False
+        self.yukleme = 0
+        self.isabet = 0
+        self.iskalama = 0
+
+    def kirlet(self):
+        """Bu süreçte commit edilen değişiklikler bir sonraki okumada uygulansın"""
+        self._kirli = True
+
+    # --- Yükleme ve güncelleme ---
+
+    def yukle(self):
+        """İndeksi Ekipman tablosundan baştan kur (app context içinde)"""
+        with self._kilit:
+            self._yukle()
+
+    def _yukle(self):
+        arka_uc = events.aktif_broker().arka_uc
+        # Önce sıra okunur: yükleme sırasında gelen olaylar sonra tekrar uygulanır
+        son_sira = arka_uc.son_sira()
+        barkod, seri, kodlar = {}, {}, {}
+        with db.engine.connect() as connection:
+            sonuc = connection.execution_options(yield_per=YUKLEME_PARCASI).execute(
+                db.select(Ekipman.id, Ekipman.barkod, Ekipman.seri_no)
+            )
+            for id, b, s in sonuc:
+                kodlar[id] = (b, s)
+                if b:
+                    barkod[b] = id
+                if s:
+                    seri[s] = id
+        self._barkod, self._seri, self._kodlar = barkod, seri, kodlar
+        self._son_sira = son_sira
+        self._son_kontrol = time.monotonic()
+        self.yukleme += 1
+
+    def _ekle(self, id, barkod, seri_no):
+        self._sil(id)
+        self._kodlar[id] = (barkod, seri_no)
+        if barkod:
+            self._barkod[barkod] = id
+        if seri_no:
+            self._seri[seri_no] = id
+
+    def _sil(self, id):
+        eski = self._kodlar.pop(id, None)
+        if eski is None:
+            return
+        barkod, seri_no = eski
+        if barkod and self._barkod.get(barkod) == id:
+            del self._barkod[barkod]
+        if seri_no and self._seri.get(seri_no) == id:
+            del self._seri[seri_no]
+
+    def _yeni_satirlar(self):
+        """Toplu içe aktarma olayı id vermez: bilinen en büyük id'den sonrakiler okunur"""
+        esik = max(self._kodlar, default=0)
+        with db.engine.connect() as connection:
+            for id, barkod, seri_no in connection.execute(
+                db.select(Ekipman.id, Ekipman.barkod, Ekipman.seri_no).where(Ekipman.id > esik)
+            ):
+                self._ekle(id, barkod, seri_no)
+
+    def _uygula(self, veri):
+        olay = json.loads(veri)
+        if olay.get('varlik') != 'ekipman':
+            return
+        islem, id, alanlar = olay['islem'], olay.get('id'), olay.get('alanlar') or {}
+        if islem == 'toplu':
+            self._yeni_satirlar()
+        elif islem == 'silindi':
+            self._sil(id)
+        elif islem == 'eklendi' or 'barkod' in alanlar or 'seri_no' in alanlar:
+            barkod, seri_no = self._kodlar.get(id, (None, None))
+            self._ekle(id, alanlar.get('barkod', barkod), alanlar.get('seri_no', seri_no))
+
+    def _guncelle(self):
+        if self._son_sira is not None and not self._kirli and \
+                time.monotonic() - self._son_kontrol < KONTROL_ARALIGI:
+            return
+        with self._kilit:
+            if self._son_sira is None:
+                self._yukle()
+                return
+            self._kirli = False
+            self._son_kontrol = time.monotonic()
+            arka_uc = events.aktif_broker().arka_uc
+            while True:
+                olaylar = arka_uc.olaylar(self._son_sira)
+                if not olaylar:
+                    return
+                if olaylar[0][0] != self._son_sira + 1:
+                    # Boşluk: budanmış olaylar olabilir (PostgreSQL'de geri alınan
+                    # transaction'lar da sıra atlatır, o zaman yükleme gerekmez)
+                    en_eski = arka_uc.en_eski_sira()
+                    if en_eski is not None and self._son_sira < en_eski - 1:
+                        self._yukle()
+                        return
+                for sira, veri in olaylar:
+                    self._uygula(veri)
+                self._son_sira = olaylar[-1][0]
+
+    # --- Sorgulama ---
+
+    def coz(self, kodlar):
+        """Her kod için (kod, ekipman id veya None, 'barkod' | 'seri_no' | None)"""
+        self._guncelle()
+        barkod, seri = self._barkod, self._seri
+        sonuc = []
+        for kod in kodlar:
+            id = barkod.get(kod)
+            if id is not None:
+                sonuc.append((kod, id, 'barkod'))
+                continue
+            id = seri.get(kod)
+            sonuc.append((kod, id, 'seri_no' if id is not None else None))
+        bulunan = sum(1 for _, id, _ in sonuc if id is not None)
+        self.isabet += bulunan
+        self.iskalama += len(sonuc) - bulunan
+        return sonuc
+
+    def kodlar(self, id):
+        """Ekipmanın (barkod, seri no) çifti"""
+        return self._kodlar.get(id, (None, None))
+
+    def boyut(self):
+        return len(self._kodlar)
+
+
+def aktif_kayit():
+    """Geçerli uygulamanın tarama indeksi (app context içinde)"""
+    return current_app.extensions['tarama']
+
+
+@events.commit_dinleyicisi_ekle
+def _kirlet():
+    kayit = current_app.extensions.get('tarama')
+    if kayit is not None:
+        kayit.kirlet()
+
+
+def cozum_sozlukleri(cozulen):
+    return [{'kod': kod, 'ekipman_id': id, 'eslesme': eslesme} for kod, id, eslesme in cozulen]
+
+
+# --- Stok sayımı ---
+
+def okuma_ekle(oturum, kodlar):
+    """Kodları oturuma ekle ve çözümlerini döndür (çağıran commit eder)"""
+    simdi = datetime.utcnow()
+    db.session.execute(insert(SayimOkuma), [
+        {'oturum_id': oturum.id, 'kod': kod, 'tarih': simdi} for kod in kodlar
+    ])
+    return aktif_kayit().coz(kodlar)
+
+
+def beklenen_sorgusu(oturum):
+    """Oturumun beklenen kümesi: kategori / lokasyondaki 'Depoda' ekipmanlar"""
+    sorgu = db.select(Ekipman.id).where(Ekipman.durum == BEKLENEN_DURUM)
+    if oturum.kategori:
+        sorgu = sorgu.where(Ekipman.kategori == oturum.kategori)
+    if oturum.lokasyon:
+        sorgu = sorgu.join(EkipmanZimmet, EkipmanZimmet.ekipman_id == Ekipman.id) \
+            .where(EkipmanZimmet.lokasyon == oturum.lokasyon)
+    return sorgu
+
+
+def _ozet(kayit, id):
+    barkod, seri_no = kayit.kodlar(id)
+    return {'ekipman_id': id, 'barkod': barkod, 'seri_no': seri_no}
+
+
+def sayim_raporu(oturum):
+    """Okunanlar ile beklenen küme arasındaki fark (beklenen küme güncel durumdan)"""
+    okunan_kodlar = db.session.scalars(
+        db.select(SayimOkuma.kod).where(SayimOkuma.oturum_id == oturum.id).order_by(SayimOkuma.id)
+    ).all()
+    kayit = aktif_kayit()
+    cozulen = kayit.coz(okunan_kodlar)
+    okunan = Counter(id for _, id, _ in cozulen if id is not None)
+    bilinmeyen = Counter(kod for kod, id, _ in cozulen if id is None)
+    beklenen = set(db.session.scalars(beklenen_sorgusu(oturum)))
+
+    eksik = beklenen - okunan.keys()
+    beklenmeyen = okunan.keys() - beklenen
+    # Beklenmeyenlerin neden beklenmediği (durum / kategori) tek sorguda
+    nedenler = {}
+    if beklenmeyen:
+        nedenler = {id: (kategori, durum) for id, kategori, durum in db.session.execute(
+            db.select(Ekipman.id, Ekipman.kategori, Ekipman.durum).where(Ekipman.id.in_(beklenmeyen))
+        )}
+
+    return {
+        'okuma': len(okunan_kodlar),
+        'beklenen': len(beklenen),
+        'eslesen': len(beklenen & okunan.keys()),
+        'eksik': [_ozet(kayit, id) for id in sorted(eksik)],
+        'beklenmeyen': [
+            {**_ozet(kayit, id), 'kategori': nedenler.get(id, (None, None))[0],
+             'durum': nedenler.get(id, (None, None))[1]}
+            for id in sorted(beklenmeyen)
+        ],
+        'tekrar': [{**_ozet(kayit, id), 'adet': adet} for id, adet in sorted(okunan.items()) if adet > 1],
+        'bilinmeyen': [{'kod': kod, 'adet': adet} for kod, adet in sorted(bilinmeyen.items())],
+    }
+
+
+def _on_yukle(app):
+    try:
+        with app.app_context():
+            aktif_kayit().yukle()
+    except Exception as e:
+        # Tablolar henüz yoksa (ör. init_db öncesi) ilk okumada yüklenir
+        logger.warning('Tarama indeksi önceden yüklenemedi: %s', getattr(e, 'orig', e))
+
+
+def init_app(app):
+    """İndeksi kur ve arka planda yüklemeye başla (events.init_app'ten sonra)"""
+    app.extensions['tarama'] = TaramaIndeksi()
+    if app.config.get('TARAMA_ON_YUKLEME', True):
+        threading.Thread(target=_on_yukle, args=(app,), name='tarama-indeksi', daemon=True).start()
+
+
+@metrics.toplayici_ekle
+def _tarama_metrikleri():
+    kayit = aktif_kayit()
+    yield ('stok_tarama_index_size', 'gauge',
+           'Tarama indeksindeki ekipman sayısı', [({}, kayit.boyut())])
+    yield ('stok_tarama_index_loads_total', 'counter',
+           'Tarama indeksinin baştan yüklenme sayısı', [({}, kayit.yukleme)])
+    yield ('stok_tarama_lookups_total', 'counter', 'Çözülen kodlar',
+           [({'sonuc': 'bulundu'}, kayit.isabet), ({'sonuc': 'bulunamadi'}, kayit.iskalama)])
@@ -0,0 +1,213 @@
+"""Ekipman araması: SQLite FTS5 tam metin indeksi ve Türkçe harf katlama"""
+import re
+
+from flask import current_app
+from sqlalchemy import event, text
+from models import db, Ekipman
+
+FTS_TABLO = 'ekipman_fts'
+FTS_KOLONLAR = ('marka', 'model', 'seri_no', 'barkod')
+
+# Türkçe büyük/küçük harf ve aksan katlama: "İSTANBUL", "istanbul" ve
+# "ıstanbul" aynı anahtara düşer. str.lower() tek başına İ -> "i̇" üretir.
+_TR_BUYUK = str.maketrans({'İ': 'i', 'I': 'i'})
+_TR_KUCUK = str.maketrans({
+    'ı': 'i', 'ş': 's', 'ğ': 'g', 'ç': 'c', 'ö': 'o', 'ü': 'u',
+    'â': 'a', 'î': 'i', 'û': 'u',
+})
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def tr_fold(deger):
+    """Metni arama anahtarına çevir (Türkçe duyarlı katlama)"""
+    if not deger:
+        return ''
+    return deger.translate(_TR_BUYUK).lower().translate(_TR_KUCUK)
+
+
+def fts_destekleniyor():
+    """FTS5 sadece SQLite üzerinde kullanılır; diğer veritabanları LIKE'a düşer"""
+    return db.engine.dialect.name == 'sqlite'
+
+
+def _index_hazir(connection):
+    """FTS tablosu var mı? Olumlu sonuç uygulama başına önbelleğe alınır"""
+    durum = current_app.extensions['arama']
+    if durum['index_var']:
+        return True
+    if connection.dialect.name != 'sqlite':
+        return False
+    durum['index_var'] = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:ad"),
+        {'ad': FTS_TABLO}
+    ).first() is not None
+    return durum['index_var']
+
+
+def _satir(kaynak):
+    """Ekipman satırından (id + arama kolonları) FTS satırı üret"""
+    satir = {'rowid': kaynak['id']}
+    for kolon in FTS_KOLONLAR:
+        satir[kolon] = tr_fold(kaynak.get(kolon))
+    return satir
+
+
+def _nesne_satiri(ekipman):
+    return {k: getattr(ekipman, k) for k in ('id',) + FTS_KOLONLAR}
+
+
+_INSERT = text(
+    f"INSERT INTO {FTS_TABLO}(rowid, {', '.join(FTS_KOLONLAR)}) "
+    f"VALUES (:rowid, {', '.join(':' + k for k in FTS_KOLONLAR)})"
+)
+_DELETE = text(f"DELETE FROM {FTS_TABLO} WHERE rowid = :rowid")
+
+
+def index_guncelle(connection, satirlar):
+    """Verilen ekipman satırlarını (id + arama kolonları) indekse yaz/yenile"""
+    if not satirlar or not _index_hazir(connection):
+        return
+    veriler = [_satir(s) for s in satirlar]
+    connection.execute(_DELETE, [{'rowid': v['rowid']} for v in veriler])
+    connection.execute(_INSERT, veriler)
+
+
+def index_sil(connection, ekipman_idleri):
+    """Verilen ekipmanları indeksten çıkar"""
+    if not ekipman_idleri or not _index_hazir(connection):
+        return
+    connection.execute(_DELETE, [{'rowid': i} for i in ekipman_idleri])
+
+
+@event.listens_for(Ekipman, 'after_insert')
+def _ekipman_eklendi(mapper, connection, target):
+    index_guncelle(connection, [_nesne_satiri(target)])
+
+
+@event.listens_for(Ekipman, 'after_update')
+def _ekipman_guncellendi(mapper, connection, target):
+    index_guncelle(connection, [_nesne_satiri(target)])
+
+
+@event.listens_for(Ekipman, 'after_delete')
+def _ekipman_silindi(mapper, connection, target):
+    index_sil(connection, [target.id])
+
+
+def index_olustur(connection):
+    """FTS5 sanal tablosunu oluştur (yoksa). Yeni oluşturulduysa True döner"""
+    if connection.dialect.name != 'sqlite':
+        return False
+    mevcut = _index_hazir(connection)
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLO} USING fts5("
+        f"{', '.join(FTS_KOLONLAR)}, tokenize='unicode61 remove_diacritics 2')"
+    ))
+    return not mevcut
+
+
+def index_yeniden_olustur(connection, batch_size=1000):
+    """İndeksi Ekipman tablosundan baştan kur. Eklenen satır sayısını döner"""
+    index_olustur(connection)
+    connection.execute(text(f"DELETE FROM {FTS_TABLO}"))
+    kolonlar = [Ekipman.id] + [getattr(Ekipman, k) for k in FTS_KOLONLAR]
+    sonuc = connection.execution_options(yield_per=batch_size).execute(
+        db.select(*kolonlar)
+    )
+    toplam = 0
+    for parca in sonuc.partitions():
+        veriler = [_satir(satir._mapping) for satir in parca]
+        connection.execute(_INSERT, veriler)
+        toplam += len(veriler)
+    return toplam
+
+
+def _fts_sorgusu(terim):
+    """Kullanıcı girdisini güvenli bir FTS5 önek sorgusuna çevir"""
+    tokenler = _TOKEN.findall(tr_fold(terim))
+    if not tokenler:
+        return None
+    return ' '.join(f'"{t}"*' for t in tokenler)
+
+
+def _index_kullanilabilir():
+    return fts_destekleniyor() and _index_hazir(db.session.connection())
+
+
+def arama_filtresi(terim):
+    """get_ekipman için arama filtresi: FTS varsa indeks, yoksa LIKE"""
+    if _index_kullanilabilir():
+        sorgu = _fts_sorgusu(terim)
+        if sorgu is None:
+            return db.false()
+        eslesenler = text(
+            f"SELECT rowid FROM {FTS_TABLO} WHERE {FTS_TABLO} MATCH :fts_sorgu"
+        ).bindparams(fts_sorgu=sorgu).columns(rowid=db.Integer)
+        return Ekipman.id.in_(eslesenler)
+
+    search_pattern = f'%{terim}%'
+    return db.or_(
+        Ekipman.marka.like(search_pattern),
+        Ekipman.model.like(search_pattern),
+        Ekipman.seri_no.like(search_pattern),
+        Ekipman.barkod.like(search_pattern)
+    )
+
+
+def ekipman_filtreleri(args):
+    """kategori / durum / arama parametrelerinden filtre listesi oluştur"""
+    kategori = args.get('kategori')
+    durum = args.get('durum')
+    arama = args.get('arama')
+
+    filtreler = []
+    if kategori:
+        filtreler.append(Ekipman.kategori == kategori)
+    if durum:
+        filtreler.append(Ekipman.durum == durum)
+    if arama:
+        filtreler.append(arama_filtresi(arama))
+    return filtreler
+
+
+def tam_eslesme(terim):
+    """Barkod/seri no için tam eşleşme (unique B-tree indeksi kullanır)"""
+    terim = terim.strip()
+    if not terim:
+        return None
+    return Ekipman.query.filter(
+        db.or_(Ekipman.barkod == terim, Ekipman.seri_no == terim)
+    ).first()
+
+
+def ara(terim, limit=20):
+    """
+    Sıralı arama. Önce barkod/seri no tam eşleşmesi denenir; yoksa FTS5
+    önek eşleşmesi bm25 sırasıyla döner. FTS yoksa LIKE sonucuna düşer.
+    Dönüş: (ekipman listesi, eşleşme türü)
+    """
+    ekipman = tam_eslesme(terim)
+    if ekipman is not None:
+        return [ekipman], 'tam'
+
+    if not _index_kullanilabilir():
+        sonuc = Ekipman.query.filter(arama_filtresi(terim)) \
+            .order_by(Ekipman.olusturma_tarihi.desc()).limit(limit).all()
+        return sonuc, 'like'
+
+    sorgu = _fts_sorgusu(terim)
+    if sorgu is None:
+        return [], 'fts'
+    idler = [satir[0] for satir in db.session.execute(
+        text(f"SELECT rowid FROM {FTS_TABLO} WHERE {FTS_TABLO} MATCH :q "
+             f"ORDER BY rank LIMIT :limit"),
+        {'q': sorgu, 'limit': limit}
+    )]
+    if not idler:
+        return [], 'fts'
+    ekipmanlar = {e.id: e for e in Ekipman.query.filter(Ekipman.id.in_(idler))}
+    return [ekipmanlar[i] for i in idler if i in ekipmanlar], 'fts'
+
+
+def init_app(app):
+    app.extensions['arama'] = {'index_var': False}
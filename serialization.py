@@ -0,0 +1,156 @@
+"""
+Hızlı JSON üretimi. Liste uçları satırları ORM nesnesi ve to_dict()
+kurmadan doğrudan Core sorgu demetlerinden üretir: kolon -> anahtar eşleşmesi
+ve tarih dönüşümleri yanıt başına bir kez hazırlanır (Eslestirme).
+
+orjson kuruluysa kodlama onunla yapılır, değilse standart json kullanılır.
+Çıktı her iki durumda da Flask jsonify ile bayt bayt aynıdır: anahtarlar
+sıralı, ayraçlar boşluksuz, ASCII dışı karakterler \\uXXXX kaçışlı ve
+sonda satır sonu. Çok büyük listeler NDJSON (satır başına bir nesne) olarak
+akıtılabilir.
+"""
+import codecs
+import json
+from datetime import date, datetime
+from json.encoder import encode_basestring_ascii
+
+from flask import Response, current_app, jsonify, stream_with_context
+from models import Ekipman, EkipmanHareket
+
+try:
+    import orjson
+except ImportError:  # opsiyonel bağımlılık
+    orjson = None
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def _kacis(hata):
+    """ASCII'ye kodlanamayan karakter dizisini json.dumps gibi \\uXXXX yaz (C kodlayıcı)"""
+    return encode_basestring_ascii(hata.object[hata.start:hata.end])[1:-1], hata.end
+
+
+# json.dumps(ensure_ascii=True) ASCII dışı karakterleri kaçışlı yazar, orjson yazmaz
+_KACIS = 'stok_json_kacis'
+codecs.register_error(_KACIS, _kacis)
+
+
+class _StdlibFloat(float):
+    """
+    float.__repr__'ın üslü yazdığı değerler (1e+16, 1e-05, nan). orjson bunları
+    farklı yazar; bu tip orjson'da hata verir ve yanıt standart json ile kodlanır.
+    """
+
+
+def _float(deger):
+    if deger is None or (deger == 0 or 1e-4 <= abs(deger) < 1e16):
+        return deger
+    return _StdlibFloat(deger)
+
+
+def _tarih(deger):
+    return None if deger is None else deger.isoformat()
+
+
+def _donusturucu(kolon):
+    try:
+        python_tipi = kolon.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+    if issubclass(python_tipi, (datetime, date)):
+        return _tarih
+    if python_tipi is float:
+        return _float
+    return None
+
+
+class Eslestirme:
+    """Sorgu demeti -> dict. Dönüşüm gerektiren kolonlar önceden belirlenir"""
+
+    def __init__(self, ciftler):
+        """ciftler: [(anahtar, kolon)] - sorgudaki kolon sırasıyla"""
+        self.anahtarlar = tuple(anahtar for anahtar, _ in ciftler)
+        self.kolonlar = tuple(kolon for _, kolon in ciftler)
+        self._donusumler = tuple(
+            (anahtar, f) for anahtar, f in
+            ((anahtar, _donusturucu(kolon)) for anahtar, kolon in ciftler) if f
+        )
+
+    @classmethod
+    def modelden(cls, model, alanlar=None):
+        alanlar = alanlar or [c.name for c in model.__table__.columns]
+        return cls([(a, getattr(model, a)) for a in alanlar])
+
+    def satir(self, satir):
+        veri = dict(zip(self.anahtarlar, satir))
+        for anahtar, donustur in self._donusumler:
+            veri[anahtar] = donustur(veri[anahtar])
+        return veri
+
+    def nesne(self, nesne):
+        """Yüklenmiş ORM nesnesi -> dict (to_dict ile aynı anahtarlar)"""
+        return self.satir([getattr(nesne, a) for a in self.anahtarlar])
+
+    def satirlar(self, satirlar):
+        anahtarlar, donusumler = self.anahtarlar, self._donusumler
+        sonuc = []
+        for satir in satirlar:
+            veri = dict(zip(anahtarlar, satir))
+            for anahtar, donustur in donusumler:
+                veri[anahtar] = donustur(veri[anahtar])
+            sonuc.append(veri)
+        return sonuc
+
+
+# Tüm kolonlar (to_dict çıktısıyla aynı)
+EKIPMAN = Eslestirme.modelden(Ekipman)
+HAREKET = Eslestirme.modelden(EkipmanHareket)
+
+
+def _stdlib_dumps(veri):
+    return json.dumps(veri, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode()
+
+
+def dumps(veri):
+    """
+    jsonify ile aynı kompakt JSON (bayt, satır sonu hariç). float değerler
+    Eslestirme'den geçmiş olmalı (üslü gösterimler standart json'a düşer).
+    """
+    if orjson is None:
+        return _stdlib_dumps(veri)
+    try:
+        govde = orjson.dumps(veri, option=orjson.OPT_SORT_KEYS)
+    except (orjson.JSONEncodeError, TypeError):
+        # 64 bitten büyük tam sayı, _StdlibFloat vb.
+        return _stdlib_dumps(veri)
+    if not govde.isascii():
+        govde = govde.decode().encode('ascii', _KACIS)
+    if b'\x7f' in govde:
+        govde = govde.replace(b'\x7f', b'\\u007f')
+    return govde
+
+
+def _varsayilan_ayarlar_mi():
+    """Uygulamanın JSON ayarları jsonify varsayılanlarıyla aynı mı"""
+    saglayici = current_app.json
+    kompakt = saglayici.compact if saglayici.compact is not None else not current_app.debug
+    return kompakt and getattr(saglayici, 'sort_keys', False) and getattr(saglayici, 'ensure_ascii', False)
+
+
+def json_yanit(veri, durum_kodu=200):
+    """jsonify yerine: aynı gövde, daha hızlı kodlama"""
+    if not _varsayilan_ayarlar_mi():
+        # Debug girintisi vb.: Flask'ın kendi kodlayıcısı
+        response = jsonify(veri)
+        response.status_code = durum_kodu
+        return response
+    return Response(dumps(veri) + b'\n', status=durum_kodu, mimetype=JSON_MIMETYPE)
+
+
+def ndjson_yanit(eslestirme, satirlar):
+    """Satırları okundukça NDJSON olarak akıt (bellekte liste kurulmaz)"""
+    def uret():
+        for satir in satirlar:
+            yield dumps(eslestirme.satir(satir)) + b'\n'
+    return Response(stream_with_context(uret()), mimetype=NDJSON_MIMETYPE)
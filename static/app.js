@@ -5,6 +5,16 @@ const API_URL = '/api';
 let kategoriler = [];
 let ekipmanlar = [];
 let hareketler = [];
+let ekipmanFiltreler = {};
+let ekipmanSonrakiImlec = null;
+let ekipmanToplam = 0;
+let aramaZamanlayici = null;
+let olayAkisi = null;
+let olayAkisiAcik = false;
+
+// Sayfa boyutları (sunucu keyset sayfalama)
+const EKIPMAN_SAYFA_BOYUTU = 100;
+const HAREKET_SAYFA_BOYUTU = 50;
 
 // DOM Ready
 document.addEventListener('DOMContentLoaded', () => {
@@ -14,6 +24,8 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // Initialize App
 async function initApp() {
+    // Akış önce açılır: ilk yükleme sırasında olan değişiklikler de gelir
+    baslatOlayAkisi();
     await loadKategoriler();
     populateKategoriSelects();
     await loadIstatistikler();
@@ -37,9 +49,15 @@ function setupEventListeners() {
     document.getElementById('kategori-form').addEventListener('submit', handleKategoriSubmit);
 
     // Filters
-    document.getElementById('search-input').addEventListener('input', filterEkipman);
+    document.getElementById('search-input').addEventListener('input', () => {
+        // Her tuşta değil, yazma durunca ara
+        clearTimeout(aramaZamanlayici);
+        aramaZamanlayici = setTimeout(filterEkipman, 250);
+    });
     document.getElementById('kategori-filter').addEventListener('change', filterEkipman);
     document.getElementById('durum-filter').addEventListener('change', filterEkipman);
+    document.getElementById('ekipman-daha-fazla').addEventListener('click', loadDahaFazlaEkipman);
+    document.getElementById('export-pdf').addEventListener('click', exportPdf);
 
     // Modal
     document.querySelector('.close').addEventListener('click', closeModal);
@@ -262,37 +280,40 @@ function setupSearchableDropdown() {
 async function loadIstatistikler() {
     try {
         const response = await fetch(`${API_URL}/istatistikler`);
-        const data = await response.json();
-
-        document.getElementById('stat-toplam').textContent = data.toplam_ekipman;
-        document.getElementById('stat-depoda').textContent = data.depodaki;
-        document.getElementById('stat-kullanimda').textContent = data.kullanimda;
-        document.getElementById('stat-arizali').textContent = data.arizali;
-
-        // Kategori dağılımı
-        const dagilimDiv = document.getElementById('kategori-dagilim');
-        dagilimDiv.innerHTML = '';
-
-        Object.entries(data.kategori_dagilim).forEach(([kategori, adet]) => {
-            const item = document.createElement('div');
-            item.className = 'kategori-item';
-            item.innerHTML = `
-                <span>${kategori}</span>
-                <span>${adet}</span>
-            `;
-            dagilimDiv.appendChild(item);
-        });
+        renderIstatistikler(await response.json());
     } catch (error) {
         console.error('İstatistikler yüklenemedi:', error);
     }
 }
 
-// Load Ekipmanlar
-async function loadEkipmanlar(filters = {}) {
+// İstatistik kartları ve kategori dağılımı
+function renderIstatistikler(data) {
+    document.getElementById('stat-toplam').textContent = data.toplam_ekipman;
+    document.getElementById('stat-depoda').textContent = data.depodaki;
+    document.getElementById('stat-kullanimda').textContent = data.kullanimda;
+    document.getElementById('stat-arizali').textContent = data.arizali;
+
+    // Kategori dağılımı
+    const dagilimDiv = document.getElementById('kategori-dagilim');
+    dagilimDiv.innerHTML = '';
+
+    Object.entries(data.kategori_dagilim).forEach(([kategori, adet]) => {
+        const item = document.createElement('div');
+        item.className = 'kategori-item';
+        item.innerHTML = `
+            <span>${kategori}</span>
+            <span>${adet}</span>
+        `;
+        dagilimDiv.appendChild(item);
+    });
+}
+
+// Load Ekipmanlar (ilk sayfa)
+async function loadEkipmanlar(filters = ekipmanFiltreler) {
+    ekipmanFiltreler = filters;
     try {
-        const params = new URLSearchParams(filters);
-        const response = await fetch(`${API_URL}/ekipman?${params}`);
-        ekipmanlar = await response.json();
+        const sayfa = await fetchEkipmanSayfasi(null);
+        ekipmanlar = sayfa.items;
         displayEkipmanlar();
     } catch (error) {
         console.error('Ekipmanlar yüklenemedi:', error);
@@ -300,9 +321,38 @@ async function loadEkipmanlar(filters = {}) {
     }
 }
 
+// Sonraki sayfayı mevcut listeye ekle
+async function loadDahaFazlaEkipman() {
+    if (!ekipmanSonrakiImlec) return;
+    try {
+        const sayfa = await fetchEkipmanSayfasi(ekipmanSonrakiImlec);
+        ekipmanlar = ekipmanlar.concat(sayfa.items);
+        displayEkipmanlar();
+    } catch (error) {
+        console.error('Ekipmanlar yüklenemedi:', error);
+        showAlert('Ekipmanlar yüklenemedi!', 'error');
+    }
+}
+
+// Tek sayfa ekipman getir, imleç ve toplamı sakla
+async function fetchEkipmanSayfasi(cursor) {
+    const params = new URLSearchParams(ekipmanFiltreler);
+    params.set('limit', EKIPMAN_SAYFA_BOYUTU);
+    if (cursor) params.set('cursor', cursor);
+
+    const response = await fetch(`${API_URL}/ekipman?${params}`);
+    const items = await response.json();
+    ekipmanSonrakiImlec = response.headers.get('X-Next-Cursor');
+    ekipmanToplam = parseInt(response.headers.get('X-Total-Count') || items.length);
+    return { items };
+}
+
 // Display Ekipmanlar
 function displayEkipmanlar() {
     const tbody = document.getElementById('ekipman-tbody');
+    const dahaFazla = document.getElementById('ekipman-daha-fazla');
+    dahaFazla.style.display = ekipmanSonrakiImlec ? 'inline-block' : 'none';
+    dahaFazla.textContent = `Daha fazla yükle (${ekipmanlar.length} / ${ekipmanToplam})`;
     
     if (ekipmanlar.length === 0) {
         tbody.innerHTML = '<tr><td colspan="7" class="loading">Ekipman bulunamadı.</td></tr>';
@@ -337,9 +387,50 @@ function filterEkipman() {
     if (kategori) filters.kategori = kategori;
     if (durum) filters.durum = durum;
 
+    updateExportLinks(filters);
     loadEkipmanlar(filters);
 }
 
+// PDF arka planda hazırlanır: iş başlat, durumunu sorgula, hazır olunca indir
+async function exportPdf(e) {
+    e.preventDefault();
+    const link = e.currentTarget;
+    const url = new URL(link.href, window.location.origin);
+    url.searchParams.set('async', '1');
+
+    try {
+        link.classList.add('disabled');
+        const response = await fetch(url);
+        let isi = await response.json();
+        showAlert('PDF hazırlanıyor...', 'info');
+
+        while (isi.durum === 'bekliyor' || isi.durum === 'calisiyor') {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const durumRes = await fetch(`${API_URL}/export/jobs/${isi.id}`);
+            isi = await durumRes.json();
+        }
+
+        if (isi.durum === 'tamamlandi') {
+            window.location.href = isi.indir_url;
+        } else {
+            showAlert('PDF oluşturulamadı: ' + (isi.hata || isi.error), 'error');
+        }
+    } catch (error) {
+        console.error('PDF oluşturulamadı:', error);
+        showAlert('PDF oluşturulurken bir hata oluştu!', 'error');
+    } finally {
+        link.classList.remove('disabled');
+    }
+}
+
+// Dışa aktarma bağlantıları mevcut filtreleri kullansın
+function updateExportLinks(filters) {
+    const params = new URLSearchParams(filters).toString();
+    const sorgu = params ? `?${params}` : '';
+    document.getElementById('export-excel').href = `${API_URL}/export/excel${sorgu}`;
+    document.getElementById('export-pdf').href = `${API_URL}/export/pdf${sorgu}`;
+}
+
 // Handle Ekipman Submit
 async function handleEkipmanSubmit(e) {
     e.preventDefault();
@@ -375,8 +466,10 @@ async function handleEkipmanSubmit(e) {
             await loadKategoriler();
             populateKategoriSelects();
             
-            await loadEkipmanlar();
-            await loadIstatistikler();
+            if (!olayAkisiAcik) {
+                await loadEkipmanlar();
+                await loadIstatistikler();
+            }
         } else {
             showAlert('Hata: ' + result.error, 'error');
         }
@@ -389,12 +482,10 @@ async function handleEkipmanSubmit(e) {
 // Show Ekipman Detail
 async function showEkipmanDetail(id) {
     try {
-        const response = await fetch(`${API_URL}/ekipman/${id}`);
+        // Ekipman ve son hareketleri tek istekte
+        const response = await fetch(`${API_URL}/ekipman/${id}?include=hareketler&hareket_limit=${HAREKET_SAYFA_BOYUTU}`);
         const ekipman = await response.json();
-
-        // Get hareketler for this ekipman
-        const hareketResponse = await fetch(`${API_URL}/hareket?ekipman_id=${id}`);
-        const ekipmanHareketler = await hareketResponse.json();
+        const ekipmanHareketler = ekipman.hareketler;
 
         const modalBody = document.getElementById('modal-body');
         modalBody.innerHTML = `
@@ -437,6 +528,7 @@ async function showEkipmanDetail(id) {
                             `).join('')}
                         </tbody>
                     </table>
+                    ${ekipman.hareketler_kesildi ? `<p style="margin-top: 0.5rem; color: #999;">Son ${ekipmanHareketler.length} hareket gösteriliyor.</p>` : ''}
                 ` : '<p style="margin-top: 1rem; color: #999;">Henüz hareket kaydı yok.</p>'}
             </div>
         `;
@@ -548,8 +640,10 @@ async function handleEditSubmit(e) {
         if (result.success) {
             showAlert('Ekipman başarıyla güncellendi!', 'success');
             closeEditModal();
-            await loadEkipmanlar();
-            await loadIstatistikler();
+            if (!olayAkisiAcik) {
+                await loadEkipmanlar();
+                await loadIstatistikler();
+            }
         } else {
             showAlert('Hata: ' + result.error, 'error');
         }
@@ -574,8 +668,10 @@ async function deleteEkipman(id) {
 
         if (result.success) {
             showAlert('Ekipman başarıyla silindi!', 'success');
-            await loadEkipmanlar();
-            await loadIstatistikler();
+            if (!olayAkisiAcik) {
+                await loadEkipmanlar();
+                await loadIstatistikler();
+            }
         } else {
             showAlert('Hata: ' + result.error, 'error');
         }
@@ -590,17 +686,13 @@ async function deleteEkipman(id) {
 // Kategoriler sekmesi yükle
 async function loadKategorilerTab() {
     try {
-        const [katRes, ekpRes] = await Promise.all([
-            fetch(`${API_URL}/kategoriler`),
-            fetch(`${API_URL}/ekipman`)
-        ]);
+        const katRes = await fetch(`${API_URL}/kategoriler?with_counts=1`);
         const katList = await katRes.json();
-        const ekpList = await ekpRes.json();
 
-        // Her kategoride kaç ekipman var say
+        // Her kategorideki ekipman sayısı (sunucudaki sayaç tablosundan)
         const sayac = {};
-        ekpList.forEach(e => {
-            sayac[e.kategori] = (sayac[e.kategori] || 0) + 1;
+        katList.forEach(kat => {
+            sayac[kat.ad] = kat.ekipman_sayisi || 0;
         });
 
         const tbody = document.getElementById('kategoriler-tbody');
@@ -685,7 +777,7 @@ async function deleteKategori(id, ad, ekipmanSayisi) {
 // Load Hareketler
 async function loadHareketler() {
     try {
-        const response = await fetch(`${API_URL}/hareket`);
+        const response = await fetch(`${API_URL}/hareket?limit=${HAREKET_SAYFA_BOYUTU}`);
         hareketler = await response.json();
         displayHareketler();
     } catch (error) {
@@ -702,7 +794,7 @@ function displayHareketler() {
         return;
     }
 
-    tbody.innerHTML = hareketler.slice(0, 50).map(hareket => `
+    tbody.innerHTML = hareketler.map(hareket => `
         <tr>
             <td>${new Date(hareket.tarih).toLocaleString('tr-TR')}</td>
             <td>${hareket.ekipman_id}</td>
@@ -714,6 +806,26 @@ function displayHareketler() {
     `).join('');
 }
 
+// Ağ hatasında aynı Idempotency-Key ile bir kez daha dene
+async function postIdempotent(url, data, key, denemeler = 2) {
+    for (let i = 0; ; i++) {
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': key
+                },
+                body: JSON.stringify(data)
+            });
+            return await response.json();
+        } catch (error) {
+            if (i + 1 >= denemeler) throw error;
+            await new Promise(resolve => setTimeout(resolve, 500));
+        }
+    }
+}
+
 // Handle Hareket Submit
 async function handleHareketSubmit(e) {
     e.preventDefault();
@@ -730,23 +842,21 @@ async function handleHareketSubmit(e) {
         aciklama: document.getElementById('hareket-aciklama').value
     };
 
-    try {
-        const response = await fetch(`${API_URL}/hareket`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(formData)
-        });
+    // Aynı gönderimin tekrarları aynı anahtarı taşır; sunucu ikinci kaydı oluşturmaz
+    const idempotencyKey = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random()}`;
 
-        const result = await response.json();
+    try {
+        const result = await postIdempotent(`${API_URL}/hareket`, formData, idempotencyKey);
 
         if (result.success) {
             showAlert('Hareket başarıyla kaydedildi!', 'success');
             document.getElementById('hareket-form').reset();
-            await loadHareketler();
-            await loadEkipmanlar();
-            await loadIstatistikler();
+            // Akış açıksa listeler olaylarla güncellenir
+            if (!olayAkisiAcik) {
+                await loadHareketler();
+                await loadEkipmanlar();
+                await loadIstatistikler();
+            }
         } else {
             showAlert('Hata: ' + result.error, 'error');
         }
@@ -756,6 +866,70 @@ async function handleHareketSubmit(e) {
     }
 }
 
+// ---- OLAY AKIŞI (SSE) ----
+
+// Sunucudaki değişiklikleri dinle; bağlantı koparsa tarayıcı Last-Event-ID ile devam eder
+function baslatOlayAkisi() {
+    if (!window.EventSource) return;
+    olayAkisi = new EventSource(`${API_URL}/olaylar`);
+    olayAkisi.onopen = () => { olayAkisiAcik = true; };
+    olayAkisi.onerror = () => { olayAkisiAcik = false; };
+    olayAkisi.onmessage = (e) => olayUygula(JSON.parse(e.data));
+    // Kaçırılan olaylar artık sunucuda yok: her şeyi baştan yükle
+    olayAkisi.addEventListener('yeniden-yukle', async () => {
+        await loadKategoriler();
+        populateKategoriSelects();
+        await loadIstatistikler();
+        await loadEkipmanlar();
+        await loadHareketler();
+    });
+}
+
+function filtreAktifMi() {
+    return Object.values(ekipmanFiltreler).some(v => v);
+}
+
+// Tek olayı yerel duruma uygula
+function olayUygula(olay) {
+    if (olay.varlik === 'ekipman') {
+        if (olay.islem === 'eklendi') {
+            // Filtreli listede yeni kaydın eşleşip eşleşmediği bilinmez
+            if (!filtreAktifMi() && !ekipmanlar.some(e => e.id === olay.id)) {
+                ekipmanlar.unshift(olay.alanlar);
+                ekipmanToplam++;
+            }
+        } else if (olay.islem === 'guncellendi') {
+            const ekipman = ekipmanlar.find(e => e.id === olay.id);
+            if (ekipman) Object.assign(ekipman, olay.alanlar);
+        } else if (olay.islem === 'silindi') {
+            const onceki = ekipmanlar.length;
+            ekipmanlar = ekipmanlar.filter(e => e.id !== olay.id);
+            ekipmanToplam -= onceki - ekipmanlar.length;
+        } else if (olay.islem === 'toplu') {
+            loadKategoriler().then(populateKategoriSelects);
+            loadEkipmanlar();
+        }
+        displayEkipmanlar();
+    } else if (olay.varlik === 'hareket') {
+        if (olay.islem === 'eklendi') {
+            if (!hareketler.some(h => h.id === olay.id)) {
+                hareketler.unshift(olay.alanlar);
+                hareketler = hareketler.slice(0, HAREKET_SAYFA_BOYUTU);
+            }
+        } else {
+            loadHareketler();
+            loadEkipmanlar();
+        }
+        displayHareketler();
+    } else if (olay.varlik === 'kategori') {
+        loadKategoriler().then(populateKategoriSelects);
+        if (document.getElementById('kategoriler').classList.contains('active')) {
+            loadKategorilerTab();
+        }
+    }
+    if (olay.sayaclar) renderIstatistikler(olay.sayaclar);
+}
+
 // Modal Functions
 function closeModal() {
     document.getElementById('modal').style.display = 'none';
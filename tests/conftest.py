@@ -0,0 +1,74 @@
+"""
+Ortak test fikstürleri. Her test geçici bir SQLite dosyasında init_db ile
+kurulmuş boş bir veritabanı ve yeni bir uygulama örneği alır.
+
+Çalıştırma (depo kökünden):
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOK)
+
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+import init_db  # noqa: E402
+
+
+def _uygulama(dizin):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{dizin / "stok.db"}',
+        'EXPORT_CACHE_DIR': str(dizin / 'export'),
+        'TARAMA_ON_YUKLEME': False,
+    })
+    with app.app_context():
+        init_db.veritabani_kur()
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = _uygulama(tmp_path)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def ikinci_app(app, tmp_path):
+    """Aynı süreçte, ayrı veritabanıyla sonradan kurulan ikinci uygulama"""
+    dizin = tmp_path / 'ikinci'
+    dizin.mkdir()
+    ikinci = _uygulama(dizin)
+    yield ikinci
+    with ikinci.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def ekipman_ekle(client):
+    """POST /api/ekipman ile ekipman ekleyip id'sini döndüren yardımcı"""
+    def ekle(**alanlar):
+        yanit = client.post('/api/ekipman', json={'kategori': 'Laptop', 'marka': 'Dell', **alanlar})
+        assert yanit.status_code == 201, yanit.get_json()
+        return yanit.get_json()['id']
+    return ekle
+
+
+@pytest.fixture
+def hareket_ekle(client):
+    """POST /api/hareket yanıtını döndüren yardımcı"""
+    def ekle(ekipman_id, hareket_tipi, headers=None, **alanlar):
+        return client.post('/api/hareket', headers=headers or {}, json={
+            'ekipman_id': ekipman_id, 'hareket_tipi': hareket_tipi, **alanlar,
+        })
+    return ekle
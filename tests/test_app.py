@@ -0,0 +1,51 @@
+"""Uygulama fabrikası: blueprint kayıtları ve ağır kütüphanelerin tembel yüklenmesi"""
+import json
+import os
+import subprocess
+import sys
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(KOK, 'benchmarks'))
+import startup  # noqa: E402
+
+
+def test_ayri_orneklerin_ayarlari_karismaz(app, tmp_path):
+    from app import create_app
+    diger = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "diger.db"}'})
+    assert diger is not app
+    assert diger.config['SQLALCHEMY_DATABASE_URI'] != app.config['SQLALCHEMY_DATABASE_URI']
+    kurallar = {k.rule for k in diger.url_map.iter_rules()}
+    assert {'/api/ekipman', '/api/hareket', '/api/kategoriler', '/api/export/excel',
+            '/api/raporlar/hareket', '/api/tara', '/api/olaylar', '/metrics'} <= kurallar
+
+
+def test_ornekler_onbellekleri_paylasmaz(app, ikinci_app, client, ekipman_ekle):
+    from sqlalchemy import text
+    from models import db
+    ekipman_ekle(kategori='Akıllı Tahta', barkod='ORTAK', marka='Işıklı')
+    with ikinci_app.app_context():
+        db.session.execute(text('DROP TABLE ekipman_fts'))
+        db.session.commit()
+    ikinci = ikinci_app.test_client()
+
+    assert client.get('/api/ekipman/ara?q=isik').get_json()['eslesme'] == 'fts'
+    # İlk uygulamanın "FTS tablosu var" bilgisi ikinciye taşınmaz: LIKE'a düşer
+    assert ikinci.get('/api/ekipman/ara?q=isik').get_json()['eslesme'] == 'like'
+    assert 'Akıllı Tahta' not in [k['ad'] for k in ikinci.get('/api/kategoriler').get_json()]
+    tarama = ikinci.post('/api/tara', json={'kodlar': ['ORTAK']}).get_json()['sonuclar']
+    assert tarama[0]['ekipman_id'] is None
+    for ad in ('kategoriler', 'tarama', 'degerleme', 'arama', 'olaylar'):
+        assert app.extensions[ad] is not ikinci_app.extensions[ad], ad
+
+
+def test_acilista_agir_kutuphaneler_yuklenmez(tmp_path):
+    betik = (
+        'import json, sys\n'
+        'from app import create_app\n'
+        'create_app()\n'
+        f'print(json.dumps([m for m in {startup.AGIR_MODULLER!r} if m in sys.modules]))\n'
+    )
+    ortam = {**os.environ, 'DATABASE_URL': f'sqlite:///{tmp_path / "stok.db"}'}
+    cikti = subprocess.run([sys.executable, '-c', betik], cwd=KOK, env=ortam,
+                           capture_output=True, text=True, check=True).stdout
+    assert json.loads(cikti.strip().splitlines()[-1]) == []
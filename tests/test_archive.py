@@ -0,0 +1,127 @@
+"""Hareket arşivleme ve aylık özet: taşıma, zimmet kaynağının korunması, özet tutarlılığı"""
+from models import db
+import archive
+import init_db
+import rollups
+
+
+def _gecmis_ekle(client, ekipman_id, *satirlar):
+    yanit = client.post('/api/hareket/toplu', json=[
+        {'ekipman_id': ekipman_id, 'hareket_tipi': tip, 'tarih': tarih, 'birim': 'Hukuk'}
+        for tip, tarih in satirlar
+    ])
+    assert yanit.status_code == 201, yanit.get_json()
+
+
+def _rapor(client, sorgu=''):
+    yanit = client.get(f'/api/raporlar/hareket{sorgu}')
+    assert yanit.status_code == 200
+    return yanit.get_json()
+
+
+def _yeniden_hesaplanan_rapor(app, client):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            rollups.ozet_yeniden_hesapla(connection)
+    return _rapor(client)
+
+
+def _tipler(client, sorgu):
+    return [h['hareket_tipi'] for h in client.get(f'/api/hareket?{sorgu}').get_json()]
+
+
+def test_arsivleme_tasir_zimmet_kaynagini_korur(app, client, ekipman_ekle, hareket_ekle):
+    a = ekipman_ekle()
+    _gecmis_ekle(client, a, ('Çıkış', '2020-01-05'), ('İade', '2020-02-05'), ('Çıkış', '2020-03-05'))
+    hareket_ekle(a, 'İade')
+    # Sadece eski hareketleri olan ekipman: en yenisi zimmet kaynağıdır
+    b = ekipman_ekle(kategori='Monitör')
+    _gecmis_ekle(client, b, ('Çıkış', '2020-01-10'), ('İade', '2020-01-20'))
+    rapor = _rapor(client)
+
+    with app.app_context():
+        # Parça boyutu 2: birden çok transaction
+        assert archive.hareketleri_arsivle(365, parca=2) == 4
+
+    assert _tipler(client, f'ekipman_id={a}') == ['İade']
+    assert _tipler(client, f'ekipman_id={b}') == ['İade']
+    arsiv = client.get('/api/hareket?arsiv=1').get_json()
+    assert sorted((h['ekipman_id'], h['tarih'][:10]) for h in arsiv) == [
+        (a, '2020-01-05'), (a, '2020-02-05'), (a, '2020-03-05'), (b, '2020-01-10'),
+    ]
+    assert _tipler(client, f'arsiv=1&ekipman_id={b}') == ['Çıkış']
+    assert client.get(f'/api/ekipman/{b}/zimmet').get_json()['tarih'].startswith('2020-01-20')
+
+    # Özet taşımadan etkilenmez ve yeniden kurulumla aynıdır
+    assert _rapor(client) == rapor
+    assert _yeniden_hesaplanan_rapor(app, client) == rapor
+
+    with app.app_context():
+        assert archive.hareketleri_arsivle(365) == 0
+
+
+def test_ozet_artimli_ve_yeniden_kurulum_esit(app, client, ekipman_ekle, hareket_ekle):
+    idler = [ekipman_ekle(kategori=k) for k in ('Laptop', 'Laptop', 'Monitör')]
+    _gecmis_ekle(client, idler[0], ('Çıkış', '2024-01-15'), ('İade', '2024-02-01'))
+    for id in idler:
+        hareket_ekle(id, 'Çıkış', birim='Kütüphane')
+    hareket_ekle(idler[2], 'Arıza')
+    # Silinen ekipmanın hareketleri özetten düşer
+    assert client.delete(f'/api/ekipman/{idler[1]}').status_code == 200
+
+    artimli = _rapor(client)
+    assert _yeniden_hesaplanan_rapor(app, client) == artimli
+    assert artimli['toplam'] == 5
+
+
+def test_rapor_filtreleri(client, ekipman_ekle):
+    id = ekipman_ekle()
+    _gecmis_ekle(client, id, ('Çıkış', '2024-01-15'), ('İade', '2024-02-01'),
+                 ('Çıkış', '2024-02-20'), ('İade', '2024-03-01'))
+    assert _rapor(client, '?grupla=ay&baslangic=2024-02&bitis=2024-02')['satirlar'] == \
+        [{'ay': '2024-02', 'adet': 2}]
+    assert _rapor(client, '?grupla=hareket_tipi&hareket_tipi=%C3%87%C4%B1k%C4%B1%C5%9F')['toplam'] == 2
+    assert _rapor(client, '?grupla=birim')['satirlar'] == [{'birim': 'Hukuk', 'adet': 4}]
+    assert client.get('/api/raporlar/hareket?baslangic=2024-13').status_code == 400
+    assert client.get('/api/raporlar/hareket?grupla=gun').status_code == 400
+
+
+def test_kategori_degisse_de_silinen_hareket_eklendigi_hucreden_duser(app, client, ekipman_ekle,
+                                                                      hareket_ekle):
+    a, b, c = ekipman_ekle(), ekipman_ekle(), ekipman_ekle(kategori='Monitör')
+    _gecmis_ekle(client, a, ('Çıkış', '2024-01-15'), ('İade', '2024-02-01'))
+    hareket_ekle(b, 'Çıkış', birim='Hukuk')
+    assert client.post('/api/hareket/toplu-cikis',
+                       json={'ekipman_idler': [a, c], 'birim': 'Hukuk'}).status_code == 201
+    # Hareketler Laptop hücresine sayıldıktan sonra kategori değişir
+    for id in (a, b):
+        assert client.put(f'/api/ekipman/{id}', json={'kategori': 'Monitör'}).status_code == 200
+    assert client.get(f'/api/hareket?ekipman_id={a}').get_json()[0]['kategori'] == 'Laptop'
+    assert _rapor(client, '?grupla=kategori')['satirlar'] == [
+        {'kategori': 'Laptop', 'adet': 4}, {'kategori': 'Monitör', 'adet': 1},
+    ]
+
+    assert client.delete(f'/api/ekipman/{a}').status_code == 200
+    with app.app_context():
+        assert db.session.query(rollups._ozet).filter(rollups._ozet.c.adet < 0).count() == 0
+    rapor = _rapor(client, '?grupla=kategori')
+    assert rapor['satirlar'] == [{'kategori': 'Laptop', 'adet': 1}, {'kategori': 'Monitör', 'adet': 1}]
+    assert _yeniden_hesaplanan_rapor(app, client) == _rapor(client)
+
+
+def test_kategorisiz_eski_hareketler(app, client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış', birim='Hukuk')
+    # Kolon eklenmeden önceki veritabanı: init_kolonlar kolonu geri ekler, satır boş kalır
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(db.text('ALTER TABLE ekipman_hareket DROP COLUMN kategori'))
+        init_db.init_kolonlar()
+        kolonlar = {k['name'] for k in db.inspect(db.engine).get_columns('ekipman_hareket')}
+    assert 'kategori' in kolonlar
+    assert client.get(f'/api/hareket?ekipman_id={id}').get_json()[0]['kategori'] is None
+
+    # Kategorisi boş hareketler güncel ekipman kategorisiyle sayılır ve düşülür
+    assert _yeniden_hesaplanan_rapor(app, client)['satirlar'][0]['kategori'] == 'Laptop'
+    assert client.delete(f'/api/ekipman/{id}').status_code == 200
+    assert _rapor(client)['satirlar'] == []
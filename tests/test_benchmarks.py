@@ -0,0 +1,45 @@
+"""Benchmark tohumlama: sentetik geçmiş durum makinesine ve türetilmiş tablolara uygun"""
+import os
+import sys
+
+from models import db, Ekipman, EkipmanHareket, EkipmanZimmet
+import counters
+import movements
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'benchmarks'))
+import measure  # noqa: E402
+import seed  # noqa: E402
+
+
+def test_tohum_tutarli(app, client):
+    ekipman, hareket = seed.tohumla(app, 60, hareket_orani=4, cikti=lambda _: None)
+    assert ekipman == 60
+
+    with app.app_context():
+        assert EkipmanHareket.query.count() == hareket
+        durumlar = dict(db.session.query(Ekipman.id, Ekipman.durum))
+        gecmisler = {}
+        for h in EkipmanHareket.query.order_by(EkipmanHareket.tarih, EkipmanHareket.id):
+            gecmisler.setdefault(h.ekipman_id, []).append(h.hareket_tipi)
+        # Her geçmiş POST /api/hareket ile de kaydedilebilirdi
+        for ekipman_id, tipler in gecmisler.items():
+            durum = None
+            for tip in tipler:
+                assert durum in movements.GECISLER[tip].kaynaklar, (ekipman_id, tipler)
+                durum = movements.GECISLER[tip].hedef
+            assert durumlar[ekipman_id] == durum
+        assert EkipmanZimmet.query.count() == 60
+        matris = counters.sayac_matrisi()
+        with db.engine.begin() as connection:
+            counters.sayaclari_yeniden_hesapla(connection)
+        assert counters.sayac_matrisi() == matris
+
+    # Tohumlanan veritabanı API'den okunabilir
+    assert len(client.get('/api/ekipman?limit=100').get_json()) == 60
+
+
+def test_yuzdelik():
+    assert measure.yuzdelik([], 0.5) is None
+    assert measure.yuzdelik([0.003, 0.001, 0.002], 0.5) == 2.0
+    assert measure.yuzdelik([0.001] * 99 + [1.0], 0.99) == 1000.0
@@ -0,0 +1,59 @@
+"""Süreç içi kategori önbelleği: yazımlarla ve başka işçilerin sürüm artışıyla yenilenme"""
+from sqlalchemy import insert
+
+from models import db, EkipmanSayac, Kategori
+import categories
+
+
+def _adlar(client):
+    return [k['ad'] for k in client.get('/api/kategoriler').get_json()]
+
+
+def test_ekleme_ve_silme_listeye_yansir(client, ekipman_ekle):
+    assert client.post('/api/kategoriler', json={'ad': 'Tablet'}).status_code == 201
+    assert 'Tablet' in _adlar(client)
+    assert client.post('/api/kategoriler', json={'ad': 'Tablet'}).status_code == 400
+
+    tablet = next(k for k in client.get('/api/kategoriler').get_json() if k['ad'] == 'Tablet')
+    id = ekipman_ekle(kategori='Tablet')
+    # Ekipmanı olan kategori silinemez
+    assert client.delete(f'/api/kategoriler/{tablet["id"]}').status_code == 400
+    client.delete(f'/api/ekipman/{id}')
+    assert client.delete(f'/api/kategoriler/{tablet["id"]}').status_code == 200
+    assert 'Tablet' not in _adlar(client)
+
+
+def test_sayac_kaysa_da_ekipmanli_kategori_silinmez(app, client, ekipman_ekle):
+    monitor = next(k for k in client.get('/api/kategoriler').get_json() if k['ad'] == 'Monitör')
+    ekipman_ekle(kategori='Monitör')
+    # Sayaç tablosu ekipmanla uyumsuz (ör. yeniden kurulmamış)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(EkipmanSayac.__table__.delete())
+    yanit = client.delete(f'/api/kategoriler/{monitor["id"]}')
+    assert yanit.status_code == 400
+    assert '1 adet ekipman' in yanit.get_json()['error']
+
+
+def test_baska_iscinin_degisikligi_surumle_gorulur(app, client, monkeypatch):
+    monkeypatch.setattr(categories, 'KONTROL_ARALIGI', 0)
+    _adlar(client)
+    iskalama = app.extensions['kategoriler'].iskalama
+    # Sürüm değişmedikçe liste veritabanından yeniden okunmaz
+    _adlar(client)
+    assert app.extensions['kategoriler'].iskalama == iskalama
+
+    # Başka bir işçi: ORM'siz ekleme + aynı transaction'da sürüm artışı
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(insert(Kategori), [{'ad': 'Drone', 'aciklama': ''}])
+            categories.surum_artir(connection)
+    assert 'Drone' in _adlar(client)
+    assert app.extensions['kategoriler'].iskalama == iskalama + 1
+
+
+def test_yeni_ekipman_kategorisi_kaydedilir(app, client, ekipman_ekle):
+    ekipman_ekle(kategori='Akıllı Tahta')
+    with app.app_context():
+        assert app.extensions['kategoriler'].id_bul('Akıllı Tahta') is not None
+    assert 'Akıllı Tahta' in _adlar(client)
@@ -0,0 +1,45 @@
+"""Kategori x durum sayaç tablosu: ORM ve Core yazım yollarında artımlı güncelleme"""
+from models import db
+import counters
+
+
+def _matris(client):
+    yanit = client.get('/api/istatistikler')
+    assert yanit.status_code == 200
+    return yanit.get_json()['kategori_durum_matrisi']
+
+
+def _yeniden_hesaplanan(app):
+    with app.app_context():
+        with db.engine.begin() as connection:
+            counters.sayaclari_yeniden_hesapla(connection)
+        return counters.sayac_matrisi()
+
+
+def test_sayaclar_yazimlarla_esit_kalir(app, client, ekipman_ekle, hareket_ekle):
+    laptoplar = [ekipman_ekle() for _ in range(3)]
+    monitor = ekipman_ekle(kategori='Monitör')
+    assert _matris(client) == {'Laptop': {'Depoda': 3}, 'Monitör': {'Depoda': 1}}
+
+    # Core koşullu UPDATE (hareket), toplu çıkış, ORM güncelleme ve silme
+    assert hareket_ekle(laptoplar[0], 'Çıkış', birim='Hukuk').status_code == 201
+    assert client.post('/api/hareket/toplu-cikis', json={
+        'ekipman_idler': laptoplar[1:], 'birim': 'Mühendislik',
+    }).status_code == 201
+    assert client.put(f'/api/ekipman/{monitor}', json={'kategori': 'Laptop'}).status_code == 200
+    assert hareket_ekle(laptoplar[2], 'Arıza').status_code == 201
+    assert client.delete(f'/api/ekipman/{laptoplar[0]}').status_code == 200
+
+    beklenen = {'Laptop': {'Kullanımda': 1, 'Arızalı': 1, 'Depoda': 1}}
+    assert _matris(client) == beklenen
+    assert _yeniden_hesaplanan(app) == beklenen
+
+
+def test_ozet_alanlari(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    ekipman_ekle(kategori='Monitör')
+    hareket_ekle(id, 'Çıkış')
+    ozet = client.get('/api/istatistikler').get_json()
+    assert (ozet['toplam_ekipman'], ozet['depodaki'], ozet['kullanimda'], ozet['arizali']) == \
+        (2, 1, 1, 0)
+    assert ozet['kategori_dagilim'] == {'Laptop': 1, 'Monitör': 1}
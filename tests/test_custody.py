@@ -0,0 +1,77 @@
+"""Güncel zimmet projeksiyonu: hareketlerle artımlı güncelleme, sorgular ve yeniden kurulum"""
+from models import db, Ekipman, EkipmanHareket, EkipmanZimmet
+import custody
+
+
+def _zimmetliler(client, **filtre):
+    yanit = client.get('/api/zimmet', query_string=filtre)
+    assert yanit.status_code == 200
+    return [z['ekipman_id'] for z in yanit.get_json()]
+
+
+def _projeksiyon(app):
+    with app.app_context():
+        return sorted(z.to_dict().items() for z in EkipmanZimmet.query.all())
+
+
+def test_zimmet_hareketleri_izler(client, ekipman_ekle, hareket_ekle):
+    a, b = ekipman_ekle(), ekipman_ekle()
+    hareket_ekle(a, 'Çıkış', kullanici_adi='Ayşe Yılmaz', kullanici_personel_no='P1',
+                 birim='Hukuk', lokasyon='A-101')
+    hareket_ekle(b, 'Çıkış', kullanici_adi='Ayşe Yılmaz', kullanici_personel_no='P1',
+                 birim='Hukuk', lokasyon='A-102')
+    assert sorted(_zimmetliler(client, personel_no='P1')) == [a, b]
+
+    # Transfer kişiyi değiştirir, İade kişiyi temizler ama yer bilgisi kalır
+    hareket_ekle(a, 'Transfer', kullanici_adi='Can Demir', kullanici_personel_no='P2',
+                 birim='İletişim', lokasyon='B-201')
+    hareket_ekle(b, 'İade', birim='Hukuk', lokasyon='Depo')
+    assert _zimmetliler(client, personel_no='P1') == []
+    assert _zimmetliler(client, personel_no='P2') == [a]
+    assert _zimmetliler(client, birim='Hukuk') == [b]
+
+    zimmet = client.get(f'/api/ekipman/{b}/zimmet').get_json()
+    assert (zimmet['hareket_tipi'], zimmet['kullanici_personel_no'], zimmet['lokasyon']) == \
+        ('İade', None, 'Depo')
+
+
+def test_hareketsiz_ve_olmayan_ekipman(client, ekipman_ekle):
+    id = ekipman_ekle()
+    assert client.get(f'/api/ekipman/{id}/zimmet').get_json()['hareket_id'] is None
+    assert client.get('/api/ekipman/9999/zimmet').status_code == 404
+    assert client.get('/api/zimmet').status_code == 400
+
+
+def test_silinen_ekipmanin_zimmeti_kalkar(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış', kullanici_personel_no='P9')
+    assert client.delete(f'/api/ekipman/{id}').status_code == 200
+    assert _zimmetliler(client, personel_no='P9') == []
+
+
+def test_core_silmede_zimmet_cascade_ile_kalkar(app, client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış', kullanici_personel_no='P8')
+    # Mapper olayları çalışmaz: temizliği veritabanının ON DELETE CASCADE'i yapar
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(EkipmanHareket.__table__.delete().where(EkipmanHareket.ekipman_id == id))
+            connection.execute(Ekipman.__table__.delete().where(Ekipman.id == id))
+        assert db.session.get(EkipmanZimmet, id) is None
+
+
+def test_artimli_projeksiyon_yeniden_kurulumla_esit(app, client, ekipman_ekle, hareket_ekle):
+    idler = [ekipman_ekle() for _ in range(3)]
+    for i, id in enumerate(idler):
+        hareket_ekle(id, 'Çıkış', kullanici_personel_no=f'P{i}', birim='Hukuk')
+    hareket_ekle(idler[0], 'İade')
+    hareket_ekle(idler[1], 'Arıza')
+    assert client.post('/api/hareket/toplu-cikis', json={
+        'ekipman_idler': [idler[0]], 'birim': 'Kütüphane', 'kullanici_personel_no': 'P7',
+    }).status_code == 201
+
+    artimli = _projeksiyon(app)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            assert custody.zimmet_yeniden_olustur(connection, batch_size=2) == 3
+    assert _projeksiyon(app) == artimli
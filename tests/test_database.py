@@ -0,0 +1,73 @@
+"""Engine profili: SQLite pragmaları, havuz ayarları ve meşgul hatasında yazma tekrarı"""
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import database
+from models import db
+
+
+def _hata(mesaj):
+    return OperationalError('UPDATE ekipman ...', {}, sqlite3.OperationalError(mesaj))
+
+
+def test_dosya_sqlite_pragmalari(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert connection.execute(text('PRAGMA busy_timeout')).scalar() == \
+                app.config['SQLITE_BUSY_TIMEOUT_MS']
+            assert connection.execute(text('PRAGMA foreign_keys')).scalar() == 1
+
+
+def test_engine_secenekleri():
+    config = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}
+    database.varsayilan_ayarlar(config)
+    # Bellek içi SQLite: Flask-SQLAlchemy'nin kendi havuzu kalır
+    assert database.engine_secenekleri(config) == {}
+    config['SQLALCHEMY_DATABASE_URI'] = database.veritabani_adresi('postgres://k:s@db/stok')
+    assert config['SQLALCHEMY_DATABASE_URI'] == 'postgresql://k:s@db/stok'
+    assert database.engine_secenekleri(config)['pool_pre_ping'] is True
+
+
+@pytest.mark.parametrize('hatalar', [0, 2])
+def test_mesgul_hatasi_yeniden_denenir(app, monkeypatch, hatalar):
+    monkeypatch.setitem(app.config, 'DB_RETRY_BACKOFF_MS', 0)
+    cagrilar = []
+
+    @database.yazma_tekrar_dene
+    def gorunum():
+        cagrilar.append(1)
+        if len(cagrilar) <= hatalar:
+            raise _hata('database is locked')
+        return 'tamam'
+
+    with app.test_request_context():
+        assert gorunum() == 'tamam'
+    assert len(cagrilar) == hatalar + 1
+
+
+def test_tekrar_siniri_ve_diger_hatalar(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'DB_RETRY_BACKOFF_MS', 0)
+    monkeypatch.setitem(app.config, 'DB_WRITE_RETRIES', 2)
+    cagrilar = []
+
+    @database.yazma_tekrar_dene
+    def mesgul():
+        cagrilar.append(1)
+        raise _hata('database is locked')
+
+    @database.yazma_tekrar_dene
+    def bozuk():
+        cagrilar.append(1)
+        raise _hata('no such table: yok')
+
+    with app.test_request_context():
+        with pytest.raises(OperationalError):
+            mesgul()
+        assert len(cagrilar) == 3
+        with pytest.raises(OperationalError):
+            bozuk()
+        assert len(cagrilar) == 4
@@ -0,0 +1,55 @@
+"""Ekipman detayı ve çoklu getirme: ekipman başına son N hareket tek ek sorguda"""
+from sqlalchemy import event
+
+from models import db
+
+
+def _gecmis(client, ekipman_id):
+    return [h['id'] for h in client.get(f'/api/hareket?ekipman_id={ekipman_id}&limit=100').get_json()]
+
+
+def test_ekipman_basina_son_n_hareket(app, client, ekipman_ekle, hareket_ekle):
+    a, b, c = ekipman_ekle(), ekipman_ekle(), ekipman_ekle()
+    for _ in range(3):
+        hareket_ekle(a, 'Çıkış')
+        hareket_ekle(a, 'İade')
+    hareket_ekle(b, 'Arıza')
+
+    sorgular = []
+    with app.app_context():
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def kaydet(conn, cursor, sql, *args):
+            if sql.lstrip().upper().startswith('SELECT') and 'olay_gunlugu' not in sql:
+                sorgular.append(sql)
+        try:
+            yanit = client.get(f'/api/ekipman?ids={c},{a},{b},999&include=hareketler&hareket_limit=4')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', kaydet)
+    assert yanit.status_code == 200
+    # Ekipmanlar + geçmişler: iki sorgu
+    assert len(sorgular) == 2
+
+    veri = yanit.get_json()
+    assert [e['id'] for e in veri] == [c, a, b]
+    detay = {e['id']: e for e in veri}
+    assert [h['id'] for h in detay[a]['hareketler']] == _gecmis(client, a)[:4]
+    assert detay[a]['hareketler_kesildi'] is True
+    assert [h['hareket_tipi'] for h in detay[b]['hareketler']] == ['Arıza']
+    assert detay[b]['hareketler_kesildi'] is False
+    assert detay[c]['hareketler'] == []
+
+
+def test_tek_ekipman_detayi(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış')
+    hareket_ekle(id, 'İade')
+    veri = client.get(f'/api/ekipman/{id}?include=hareketler&hareket_limit=1').get_json()
+    assert [h['hareket_tipi'] for h in veri['hareketler']] == ['İade']
+    assert veri['hareketler_kesildi'] is True
+
+
+def test_gecersiz_parametreler(client, ekipman_ekle):
+    id = ekipman_ekle()
+    assert client.get(f'/api/ekipman/{id}?include=yorumlar').status_code == 400
+    assert client.get(f'/api/ekipman/{id}?include=hareketler&hareket_limit=0').status_code == 400
+    assert client.get('/api/ekipman?ids=a,b').status_code == 400
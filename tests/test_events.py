@@ -0,0 +1,85 @@
+"""Olay günlüğü: transaction içinde kayıt, Last-Event-ID ile devam ve abonesiz budama"""
+import json
+
+from models import db, Olay
+import events
+import init_db
+
+
+def _olaylar(app):
+    with app.app_context():
+        return [json.loads(o.veri) for o in Olay.query.order_by(Olay.sira)]
+
+
+def _akis(client, son_sira, adet):
+    """SSE akışından ilk `adet` parçayı oku ve bağlantıyı kapat"""
+    yanit = client.get('/api/olaylar', headers={'Last-Event-ID': str(son_sira)}, buffered=False)
+    assert yanit.mimetype == 'text/event-stream'
+    parcalar = iter(yanit.response)
+    try:
+        return [next(parcalar) for _ in range(adet)]
+    finally:
+        yanit.close()
+
+
+def test_yazim_olay_uretir_geri_alinan_uretmez(app, client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış')
+    assert hareket_ekle(id, 'Çıkış').status_code == 409
+    # Kurulumdaki varsayılan kategori olayları hariç
+    olaylar = [o for o in _olaylar(app) if o['varlik'] != 'kategori']
+    assert [(o['varlik'], o['islem']) for o in olaylar] == [
+        ('ekipman', 'eklendi'), ('ekipman', 'guncellendi'), ('hareket', 'eklendi'),
+    ]
+    assert olaylar[-1]['sayaclar']['kullanimda'] == 1
+
+
+def test_last_event_id_sonrasi_gonderilir(app, client, ekipman_ekle):
+    ekipman_ekle()
+    with app.app_context():
+        son = app.extensions['olaylar'].arka_uc.son_sira()
+    ids = [ekipman_ekle(barkod=f'E{i}') for i in range(2)]
+
+    parcalar = _akis(client, son, 3)
+    assert parcalar[0] == b'retry: 3000\n\n'
+    gonderilen = [p.decode().split('\n') for p in parcalar[1:]]
+    assert [satirlar[0] for satirlar in gonderilen] == [f'id: {son + 1}', f'id: {son + 2}']
+    assert [json.loads(satirlar[1][len('data: '):])['id'] for satirlar in gonderilen] == ids
+    assert app.extensions['olaylar'].abone_sayisi() == 0
+
+
+def test_budanmis_gunlukte_yeniden_yukleme_istenir(app, client, ekipman_ekle):
+    for _ in range(3):
+        ekipman_ekle()
+    app.extensions['olaylar'].arka_uc.buda(1)
+    assert _akis(client, 1, 2)[1] == b'event: yeniden-yukle\ndata: {}\n\n'
+    assert client.get('/api/olaylar', headers={'Last-Event-ID': 'x'}).status_code == 400
+
+
+def test_abone_yokken_yazimlar_gunlugu_budar(app, ekipman_ekle, monkeypatch):
+    broker = app.extensions['olaylar']
+    monkeypatch.setattr(broker, 'saklanacak', 3)
+    monkeypatch.setattr(broker, 'budama_araligi', 0)
+    for _ in range(6):
+        ekipman_ekle()
+    assert broker.abone_sayisi() == 0
+    with app.app_context():
+        siralar = [s for s, in db.session.query(Olay.sira).order_by(Olay.sira)]
+        assert siralar == [events.son_sira() - 2, events.son_sira() - 1, events.son_sira()]
+
+    # Aralık dolmadan tekrar budanmaz
+    monkeypatch.setattr(broker, 'budama_araligi', 3600)
+    ekipman_ekle()
+    assert len(_olaylar(app)) == 4
+
+
+def test_bakim_komutu_budar(app, ekipman_ekle, monkeypatch, capsys):
+    broker = app.extensions['olaylar']
+    monkeypatch.setattr(broker, 'budama_araligi', 3600)
+    for _ in range(4):
+        ekipman_ekle()
+    monkeypatch.setattr(broker, 'saklanacak', 1)
+    with app.app_context():
+        init_db.olaylari_buda()
+    assert 'silindi' in capsys.readouterr().out
+    assert len(_olaylar(app)) == 1
@@ -0,0 +1,83 @@
+"""Excel / PDF dışa aktarma: akışlı üretim, filtreler ve veri sürümüne bağlı dosya önbelleği"""
+import io
+import re
+import time
+
+import pytest
+
+import exporters
+
+
+@pytest.fixture
+def envanter(ekipman_ekle):
+    return [ekipman_ekle(kategori='Monitör' if i % 3 == 0 else 'Laptop', barkod=f'BK{i}')
+            for i in range(30)]
+
+
+def test_excel_filtreli_satirlar(client, envanter):
+    openpyxl = pytest.importorskip('openpyxl')
+    yanit = client.get('/api/export/excel?kategori=Monitör')
+    assert yanit.status_code == 200
+    assert yanit.mimetype == exporters.XLSX_MIMETYPE
+    sayfa = openpyxl.load_workbook(io.BytesIO(yanit.data), read_only=True).active
+    satirlar = list(sayfa.iter_rows(values_only=True))
+    assert list(satirlar[0][:len(exporters.EXCEL_BASLIKLAR)]) == exporters.EXCEL_BASLIKLAR
+    assert len(satirlar) - 1 == 10
+    assert {s[1] for s in satirlar[1:]} == {'Monitör'}
+
+
+def test_excel_veri_degisince_yeniden_uretilir(client, envanter):
+    pytest.importorskip('openpyxl')
+    ilk = client.get('/api/export/excel').data
+    assert client.get('/api/export/excel').data == ilk
+    client.put(f'/api/ekipman/{envanter[0]}', json={'marka': 'Yeni Marka'})
+    assert client.get('/api/export/excel').data != ilk
+
+
+def test_pdf_senkron(client, envanter):
+    pytest.importorskip('reportlab')
+    # 30 satır: tablo birden çok sayfalık parçaya bölünür
+    yanit = client.get('/api/export/pdf')
+    assert yanit.status_code == 200
+    assert yanit.mimetype == exporters.PDF_MIMETYPE
+    assert yanit.data.startswith(b'%PDF')
+
+
+def test_pdf_parcalari_sayfaya_sigar(monkeypatch):
+    pytest.importorskip('reportlab')
+    from reportlab.platypus import Table
+    # Her parça tek sayfaya sığmalı: reportlab hiçbir tabloyu sayfa ortasında bölmez
+    bolunen = []
+    split = Table.split
+
+    def izle(self, *args, **kwargs):
+        parcalar = split(self, *args, **kwargs)
+        bolunen.extend(parcalar)
+        return parcalar
+    monkeypatch.setattr(Table, 'split', izle)
+
+    def sayfa_sayisi(adet):
+        hedef = io.BytesIO()
+        satirlar = [(i, 'Laptop', 'Dell', 'M1', f'SN{i}', 'Depoda', None, None) for i in range(adet)]
+        exporters.pdf_yaz(satirlar, hedef, adet)
+        return int(re.search(rb'/Count (\d+)', hedef.getvalue()).group(1))
+
+    # Başlıklı ilk sayfaya 22, sonrakilere 26 satır sığar (yatay A4)
+    assert [sayfa_sayisi(n) for n in (22, 23, 48, 49)] == [1, 2, 2, 3]
+    assert bolunen == []
+
+
+def test_pdf_arka_plan_isi(client, envanter):
+    pytest.importorskip('reportlab')
+    yanit = client.get('/api/export/pdf?async=1&kategori=Monitör')
+    assert yanit.status_code in (200, 202)
+    durum_url = yanit.get_json()['durum_url']
+    son = time.monotonic() + 60
+    while yanit.get_json()['durum'] != 'tamamlandi':
+        assert yanit.get_json()['durum'] != 'hata', yanit.get_json()
+        assert time.monotonic() < son, 'PDF işi zamanında bitmedi'
+        time.sleep(0.2)
+        yanit = client.get(durum_url)
+    dosya = client.get(yanit.get_json()['indir_url'])
+    assert dosya.status_code == 200
+    assert dosya.data.startswith(b'%PDF')
@@ -0,0 +1,132 @@
+"""Koşullu GET: olay günlüğü sırasından ETag, 304, yazımlarla geçersizleşme ve sıkıştırma"""
+import gzip
+
+from sqlalchemy import event
+
+from models import db
+import archive
+import events
+import jobs
+import valuation
+
+
+def _etag(client, url):
+    yanit = client.get(url)
+    assert yanit.status_code == 200
+    return yanit.headers['ETag']
+
+
+def _kosullu(client, url, etag):
+    return client.get(url, headers={'If-None-Match': etag})
+
+
+def test_eslesen_etag_304(client, ekipman_ekle):
+    id = ekipman_ekle()
+    for url in ('/api/ekipman', f'/api/ekipman/{id}', '/api/istatistikler', '/api/kategoriler'):
+        yanit = _kosullu(client, url, _etag(client, url))
+        assert yanit.status_code == 304, url
+        assert yanit.data == b''
+
+
+def test_eslesen_etag_304_ve_tablo_sorgusu_yok(app, client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış', birim='Hukuk')
+    etag = _etag(client, '/api/ekipman')
+
+    sorgular = []
+    with app.app_context():
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def kaydet(conn, cursor, sql, *args):
+            sorgular.append(sql)
+        try:
+            yanit = _kosullu(client, '/api/ekipman', etag)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', kaydet)
+    assert yanit.status_code == 304
+    assert yanit.data == b''
+    # Damga sadece olay günlüğünden okunur: ekipman / hareket tabloları taranmaz
+    assert sorgular and all('olay_gunlugu' in s for s in sorgular)
+
+
+def test_yazim_etag_degistirir(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    urller = ['/api/ekipman', f'/api/ekipman/{id}', '/api/hareket', '/api/istatistikler',
+              '/api/kategoriler?with_counts=1']
+    etaglar = {u: _etag(client, u) for u in urller}
+
+    assert client.put(f'/api/ekipman/{id}', json={'marka': 'HP'}).status_code == 200
+    assert hareket_ekle(id, 'Çıkış', birim='Hukuk').status_code == 201
+    for url, etag in etaglar.items():
+        assert _kosullu(client, url, etag).status_code == 200, url
+
+
+def test_core_yazimi_etag_degistirir(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    urller = ['/api/ekipman', '/api/hareket', '/api/istatistikler',
+              '/api/kategoriler?with_counts=1', '/api/raporlar/hareket']
+    etaglar = {u: _etag(client, u) for u in urller}
+    assert all(_kosullu(client, u, e).status_code == 304 for u, e in etaglar.items())
+
+    # Hareket ekleme Core koşullu UPDATE + INSERT ile yapılır
+    assert hareket_ekle(id, 'Çıkış', birim='Hukuk').status_code == 201
+    for url, etag in etaglar.items():
+        assert _kosullu(client, url, etag).status_code == 200, url
+
+
+def test_parametreler_etage_girer(client, ekipman_ekle):
+    ekipman_ekle()
+    assert _etag(client, '/api/ekipman?limit=1') != _etag(client, '/api/ekipman?limit=2')
+
+
+def test_uygulamalar_kendi_olay_gunlugunu_kullanir(app, ikinci_app, client, ekipman_ekle):
+    etag = _etag(client, '/api/ekipman')
+    ekipman_ekle()
+    # Sonradan kurulan uygulama ilkinin damgalarını kendi veritabanından okutmaz
+    assert _kosullu(client, '/api/ekipman', etag).status_code == 200
+    damgalar = []
+    for uygulama in (app, ikinci_app):
+        with uygulama.app_context():
+            damgalar.append((events.son_sira(), jobs.veri_surumu(), valuation.rapor_damgasi()))
+    assert damgalar[0] != damgalar[1]
+    assert damgalar[0][0] == damgalar[1][0] + 1
+
+
+def test_arsivleme_etag_degistirir(app, client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış', birim='Hukuk')
+    hareket_ekle(id, 'İade')
+    canli, arsiv = _etag(client, '/api/hareket'), _etag(client, '/api/hareket?arsiv=1')
+
+    with app.app_context():
+        # Negatif gün: ufuk gelecekte, zimmet kaynağı (İade) dışındaki her şey taşınır
+        assert archive.hareketleri_arsivle(-1) == 1
+    assert _kosullu(client, '/api/hareket', canli).status_code == 200
+    yanit = _kosullu(client, '/api/hareket?arsiv=1', arsiv)
+    assert yanit.status_code == 200
+    assert [h['hareket_tipi'] for h in yanit.get_json()] == ['Çıkış']
+
+
+def test_hatali_istek_onbellege_alinmaz(client):
+    yanit = client.get('/api/ekipman?limit=0')
+    assert yanit.status_code == 400
+    assert 'ETag' not in yanit.headers
+
+
+def test_hatali_rapor_istegi_onbellege_alinmaz(client):
+    yanit = client.get('/api/raporlar/hareket?grupla=yok')
+    assert yanit.status_code == 400
+    assert 'ETag' not in yanit.headers
+
+
+def test_buyuk_yanit_sikistirilir(client, ekipman_ekle):
+    for i in range(20):
+        ekipman_ekle(barkod=f'GZ{i}')
+    duz = client.get('/api/ekipman')
+    yanit = client.get('/api/ekipman', headers={'Accept-Encoding': 'gzip'})
+    assert yanit.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in yanit.headers['Vary']
+    assert gzip.decompress(yanit.data) == duz.data
+
+    # Eşiğin altındaki yanıtlar olduğu gibi gönderilir
+    kucuk = client.get('/api/ekipman?limit=1', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in kucuk.headers
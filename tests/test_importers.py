@@ -0,0 +1,201 @@
+"""Toplu içe aktarma: atomik / kısmi mod, satır hataları, CSV, hareketler, türetilmiş tablolar"""
+import io
+
+from sqlalchemy import insert
+
+from models import db, Ekipman
+import importers
+import rollups
+
+
+def _liste(client):
+    return client.get('/api/ekipman?limit=1000').get_json()
+
+
+def test_atomik_modda_tek_hata_hepsini_geri_alir(client):
+    yanit = client.post('/api/ekipman/toplu?batch_size=2', json=[
+        {'kategori': 'Laptop', 'barkod': 'A1'},
+        {'kategori': 'Laptop', 'barkod': 'A2'},
+        {'marka': 'kategorisiz'},
+        {'kategori': 'Laptop', 'barkod': 'A1'},
+    ])
+    assert yanit.status_code == 400
+    sonuc = yanit.get_json()
+    assert (sonuc['mod'], sonuc['toplam'], sonuc['eklenen']) == ('atomik', 4, 0)
+    assert sonuc['hatalar'] == [
+        {'satir': 3, 'hata': 'kategori zorunlu.'},
+        {'satir': 4, 'hata': 'barkod zaten kayıtlı: A1'},
+    ]
+    assert _liste(client) == []
+
+
+def test_atomik_modda_ekleme_cakismasi_satir_hatasidir(client, monkeypatch):
+    dogrula = importers._EkipmanParcasi.__call__
+
+    def yarisan(self, parca, sonuc, gorulen):
+        hazir = dogrula(self, parca, sonuc, gorulen)
+        # Doğrulamadan sonra başka bir işçi aynı barkodu ekler
+        with db.engine.begin() as connection:
+            connection.execute(insert(Ekipman), [{'kategori': 'Laptop', 'barkod': 'A2'}])
+        return hazir
+    monkeypatch.setattr(importers._EkipmanParcasi, '__call__', yarisan)
+
+    yanit = client.post('/api/ekipman/toplu', json=[
+        {'kategori': 'Laptop', 'barkod': 'A1'},
+        {'kategori': 'Laptop', 'barkod': 'A2'},
+    ])
+    assert yanit.status_code == 400
+    sonuc = yanit.get_json()
+    assert (sonuc['success'], sonuc['eklenen']) == (False, 0)
+    assert [h['satir'] for h in sonuc['hatalar']] == [1, 2]
+    assert all(h['hata'].startswith('Parça eklenemedi') for h in sonuc['hatalar'])
+    assert [e['barkod'] for e in _liste(client)] == ['A2']
+
+
+def test_kismi_modda_gecerliler_eklenir(client, ekipman_ekle):
+    ekipman_ekle(barkod='VAR')
+    yanit = client.post('/api/ekipman/toplu?mod=kismi&batch_size=2', json=[
+        {'kategori': 'Yeni Kategori', 'barkod': 'K1', 'temin_fiyati': '1250,5'},
+        {'kategori': 'Laptop', 'barkod': 'VAR'},
+        {'kategori': 'Laptop', 'temin_tarihi': 'dün'},
+        {'kategori': 'Laptop', 'barkod': 'K2', 'temin_tarihi': '01.02.2024'},
+    ])
+    assert yanit.status_code == 201
+    sonuc = yanit.get_json()
+    assert (sonuc['eklenen'], sonuc['hatali']) == (2, 2)
+    assert [h['satir'] for h in sonuc['hatalar']] == [2, 3]
+
+    eklenenler = {e['barkod']: e for e in _liste(client)}
+    assert set(eklenenler) == {'VAR', 'K1', 'K2'}
+    assert eklenenler['K1']['temin_fiyati'] == 1250.5
+    assert eklenenler['K2']['temin_tarihi'].startswith('2024-02-01')
+    # Yeni kategori, sayaçlar ve arama indeksi Core eklemesiyle birlikte güncellenir
+    assert 'Yeni Kategori' in [k['ad'] for k in client.get('/api/kategoriler').get_json()]
+    assert client.get('/api/istatistikler').get_json()['kategori_dagilim'] == \
+        {'Laptop': 2, 'Yeni Kategori': 1}
+    assert client.get('/api/ekipman/ara?q=K2').get_json()['eslesme'] == 'tam'
+
+
+def test_csv_basliklari_eslenir(client):
+    csv = 'Kategori;Marka;Barkod;Temin Fiyatı (₺)\nMonitör;Dell;C1;100\nMonitör;LG;C2;\n'
+    yanit = client.post('/api/ekipman/toplu', data={
+        'dosya': (io.BytesIO(csv.encode('utf-8-sig')), 'ekipman.csv'),
+    }, content_type='multipart/form-data')
+    assert yanit.status_code == 201, yanit.get_json()
+    assert {(e['marka'], e['temin_fiyati']) for e in _liste(client)} == {('Dell', 100.0), ('LG', None)}
+
+
+def test_gecersiz_istekler(client):
+    assert client.post('/api/ekipman/toplu', json={'kategori': 'Laptop'}).status_code == 400
+    assert client.post('/api/ekipman/toplu?mod=yarim', json=[]).status_code == 400
+    for url in ('/api/ekipman/toplu', '/api/hareket/toplu'):
+        yanit = client.post(url, json=[])
+        assert yanit.status_code == 400
+        assert yanit.get_json() == {'success': False, 'error': 'İçe aktarılacak satır yok.'}
+    yanit = client.post('/api/ekipman/toplu', data={'dosya': (io.BytesIO(b'x'), 'a.txt')},
+                        content_type='multipart/form-data')
+    assert yanit.status_code == 400
+
+
+def test_hareket_aktarimi_ekipmani_cozer_ve_durumu_gunceller(client, ekipman_ekle):
+    a = ekipman_ekle(barkod='H1')
+    b = ekipman_ekle(seri_no='SN-H2')
+    yanit = client.post('/api/hareket/toplu?mod=kismi&batch_size=2', json=[
+        {'barkod': 'H1', 'hareket_tipi': 'Çıkış', 'birim': 'Hukuk', 'tarih': '2024-02-01'},
+        {'seri_no': 'SN-H2', 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-01'},
+        {'barkod': 'YOK', 'hareket_tipi': 'Çıkış'},
+        {'ekipman_id': b, 'hareket_tipi': 'İade', 'tarih': '2024-02-02'},
+    ])
+    assert yanit.status_code == 201
+    sonuc = yanit.get_json()
+    assert sonuc['eklenen'] == 3
+    assert sonuc['hatalar'] == [{'satir': 3, 'hata': 'Ekipman bulunamadı.'}]
+    assert [client.get(f'/api/ekipman/{i}').get_json()['durum'] for i in (a, b)] == \
+        ['Kullanımda', 'Depoda']
+    assert client.get('/api/istatistikler').get_json()['kullanimda'] == 1
+
+
+def _hareket_aktar(client, satirlar, mod='atomik'):
+    return client.post(f'/api/hareket/toplu?mod={mod}&batch_size=2', json=satirlar)
+
+
+def test_hareket_aktarimi_durum_makinesini_uygular(client, ekipman_ekle):
+    id = ekipman_ekle(barkod='H1')
+    yanit = _hareket_aktar(client, [
+        {'barkod': 'H1', 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-01'},
+        {'barkod': 'H1', 'hareket_tipi': 'Kayıp', 'tarih': '2024-02-02'},
+        {'barkod': 'H1', 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-03'},
+    ])
+    assert yanit.status_code == 400
+    hatalar = yanit.get_json()['hatalar']
+    assert [h['satir'] for h in hatalar] == [2, 3]
+    assert hatalar[0]['hata'].startswith('Geçersiz hareket tipi: Kayıp')
+    assert hatalar[1]['hata'] == 'Çıkış hareketi Kullanımda durumundaki ekipmana uygulanamaz.'
+    # Atomik: hiçbiri uygulanmaz
+    assert client.get(f'/api/ekipman/{id}').get_json()['durum'] == 'Depoda'
+
+    # Kısmi: uygunsuz satır atlanır, sonraki satırlar yeni duruma göre denetlenir
+    yanit = _hareket_aktar(client, [
+        {'barkod': 'H1', 'hareket_tipi': 'İade', 'tarih': '2024-02-01'},
+        {'barkod': 'H1', 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-02'},
+        {'barkod': 'H1', 'hareket_tipi': 'Transfer', 'tarih': '2024-02-03'},
+    ], mod='kismi')
+    assert yanit.status_code == 201
+    assert [h['satir'] for h in yanit.get_json()['hatalar']] == [1]
+    assert client.get(f'/api/ekipman/{id}').get_json()['durum'] == 'Kullanımda'
+
+
+def test_sirasiz_dosyada_son_durum_zimmetle_tutarli(client, ekipman_ekle):
+    id = ekipman_ekle()
+    # Parçalar arasında tarih sırası karışık: geçişler tarih sırasıyla uygulanır
+    yanit = _hareket_aktar(client, [
+        {'ekipman_id': id, 'hareket_tipi': 'İade', 'tarih': '2024-03-01'},
+        {'ekipman_id': id, 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-01',
+         'kullanici_personel_no': 'P1'},
+        {'ekipman_id': id, 'hareket_tipi': 'Arıza', 'tarih': '2024-04-01T10:00:00+03:00'},
+    ])
+    assert yanit.status_code == 201, yanit.get_json()
+    assert client.get(f'/api/ekipman/{id}').get_json()['durum'] == 'Arızalı'
+    zimmet = client.get(f'/api/ekipman/{id}/zimmet').get_json()
+    assert (zimmet['hareket_tipi'], zimmet['tarih']) == ('Arıza', '2024-04-01T07:00:00')
+    assert client.get('/api/istatistikler').get_json()['arizali'] == 1
+
+
+def test_eski_tarihli_satirlar_gecmis_kaydidir(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    hareket_ekle(id, 'Çıkış', kullanici_personel_no='P1')
+    # Son hareketten eski satırlar denetlenmez; durum ve zimmet değişmez
+    yanit = _hareket_aktar(client, [
+        {'ekipman_id': id, 'hareket_tipi': 'İade', 'tarih': '2020-01-01'},
+        {'ekipman_id': id, 'hareket_tipi': 'İade', 'tarih': '2020-01-02'},
+    ])
+    assert yanit.status_code == 201, yanit.get_json()
+    assert client.get(f'/api/ekipman/{id}').get_json()['durum'] == 'Kullanımda'
+    assert client.get(f'/api/ekipman/{id}/zimmet').get_json()['kullanici_personel_no'] == 'P1'
+    assert len(client.get(f'/api/hareket?ekipman_id={id}').get_json()) == 3
+
+
+def test_kismi_modda_geri_alinan_parcanin_gecisleri_unutulur(client, ekipman_ekle, monkeypatch):
+    id = ekipman_ekle(barkod='H1')
+    ozete_ekle = rollups.ozete_ekle
+    cagri = []
+
+    def ilkinde_hata(*args):
+        cagri.append(1)
+        if len(cagri) == 1:
+            raise RuntimeError('disk dolu')
+        return ozete_ekle(*args)
+    monkeypatch.setattr(rollups, 'ozete_ekle', ilkinde_hata)
+
+    yanit = _hareket_aktar(client, [
+        {'barkod': 'H1', 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-01'},
+        {'barkod': 'YOK', 'hareket_tipi': 'Çıkış'},
+        {'barkod': 'H1', 'hareket_tipi': 'Çıkış', 'tarih': '2024-02-02'},
+    ], mod='kismi')
+    assert yanit.status_code == 201
+    hatalar = {h['satir']: h['hata'] for h in yanit.get_json()['hatalar']}
+    assert sorted(hatalar) == [1, 2]
+    assert hatalar[1].startswith('Parça eklenemedi')
+    # İlk parçanın Çıkış'ı geri alındı: ikinci parçadaki Çıkış Depoda'ya uygulanır
+    assert client.get(f'/api/ekipman/{id}').get_json()['durum'] == 'Kullanımda'
+    assert len(client.get(f'/api/hareket?ekipman_id={id}').get_json()) == 1
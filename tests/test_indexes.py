@@ -0,0 +1,40 @@
+"""Bileşik indeksler: API sorgularının planı ve eksik indekslerin sonradan kurulması"""
+from models import db, EkipmanHareket
+import archive
+import init_db
+import query_plan
+
+
+def test_api_sorgulari_indeks_kullanir(app, client, ekipman_ekle, hareket_ekle):
+    for i in range(5):
+        id = ekipman_ekle(kategori='Monitör' if i % 2 else 'Laptop', barkod=f'QP{i}')
+        hareket_ekle(id, 'Çıkış', birim='Hukuk', kullanici_personel_no=f'P{i}',
+                     lokasyon='A Blok')
+        hareket_ekle(id, 'İade')
+    with app.app_context():
+        archive.hareketleri_arsivle(-1)
+
+    sorunlar = query_plan.kontrol_et(app)
+    assert sorunlar == [], [' '.join(sql.split()) for _, sql, _ in sorunlar]
+
+
+def test_eksik_indeks_olusturulur(app):
+    indeks = next(i for i in EkipmanHareket.__table__.indexes if i.name == 'ix_hareket_ekipman_tarih')
+    with app.app_context():
+        with db.engine.begin() as connection:
+            indeks.drop(connection)
+        init_db.init_indeksler()
+        mevcut = {i['name'] for i in db.inspect(db.engine).get_indexes('ekipman_hareket')}
+    assert indeks.name in mevcut
+
+
+def test_tam_tarama_eski_ve_yeni_plan_bicimi():
+    # SQLite >= 3.36
+    assert query_plan.tam_taramalar(['SCAN ekipman']) == ['ekipman']
+    assert query_plan.tam_taramalar(['SCAN ekipman USING INDEX ix_ekipman_kategori']) == []
+    # SQLite < 3.36
+    assert query_plan.tam_taramalar(['SCAN TABLE ekipman_hareket']) == ['ekipman_hareket']
+    assert query_plan.tam_taramalar(['SCAN TABLE ekipman AS e']) == ['ekipman']
+    assert query_plan.tam_taramalar(['SEARCH TABLE ekipman USING INTEGER PRIMARY KEY (rowid=?)',
+                                     'SCAN TABLE kategori']) == []
+    assert query_plan.tam_taramalar(['MATERIALIZE anon_1', 'SCAN anon_1']) == []
@@ -0,0 +1,43 @@
+"""İstek ölçümleme: Server-Timing, /metrics, yavaş sorgu / N+1 günlüğü ve istek profili"""
+import logging
+
+import instrumentation
+
+
+def test_server_timing_ve_metrikler(client, ekipman_ekle):
+    ekipman_ekle()
+    yanit = client.get('/api/ekipman')
+    zamanlama = yanit.headers['Server-Timing']
+    assert zamanlama.startswith('db;dur=') and 'sorgu"' in zamanlama and ', app;dur=' in zamanlama
+
+    metin = client.get('/metrics').get_data(as_text=True)
+    assert 'stok_http_requests_total{' in metin
+    assert 'route="/api/ekipman"' in metin
+    assert 'stok_sql_statements_per_request_bucket{' in metin
+
+
+def test_sorgu_sekli_parametre_listelerini_birlestirir():
+    assert instrumentation.sorgu_sekli('SELECT *\n  FROM t WHERE id IN (?, ?,?)') == \
+        'SELECT * FROM t WHERE id IN (?)'
+    assert instrumentation.sorgu_sekli('WHERE a IN (%(a_1)s, %(a_2)s)') == 'WHERE a IN (?)'
+
+
+def test_yavas_sorgu_ve_n_arti_bir_gunlugu(app, client, ekipman_ekle, caplog, monkeypatch):
+    ekipman_ekle()
+    monkeypatch.setitem(app.config, 'YAVAS_SORGU_MS', 0)
+    monkeypatch.setitem(app.config, 'N_ARTI_BIR_ESIGI', 1)
+    with caplog.at_level(logging.WARNING, logger='instrumentation'):
+        client.get('/api/istatistikler')
+    mesajlar = [k.getMessage() for k in caplog.records]
+    assert any(m.startswith('Yavaş sorgu') and '/api/istatistikler' in m for m in mesajlar)
+    assert any(m.startswith('Olası N+1') for m in mesajlar)
+
+
+def test_istek_profili(app, client, monkeypatch):
+    assert client.get('/api/kategoriler?_profile=1').status_code == 403
+    monkeypatch.setitem(app.config, 'ISTEK_PROFILI', True)
+    yanit = client.get('/api/kategoriler?_profile=cprofile')
+    assert yanit.status_code == 200
+    assert yanit.mimetype == 'text/plain'
+    assert yanit.headers['X-Profil-Durum'] == '200'
+    assert '--- cprofile ---' in yanit.get_data(as_text=True)
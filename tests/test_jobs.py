@@ -0,0 +1,103 @@
+"""Dışa aktarma işleri: önbellek anahtarı, LRU budama, iş kayıtlarının süre ve adet sınırı"""
+import os
+import time
+
+import pytest
+
+import jobs
+
+
+def test_anahtar_filtre_ve_veri_surumune_bagli(app, ekipman_ekle):
+    ekipman_ekle()
+    with app.app_context():
+        anahtar = jobs.is_anahtari('excel', {'kategori': 'Laptop', 'limit': '5'})
+        # Filtre dışı parametreler anahtara girmez
+        assert anahtar == jobs.is_anahtari('excel', {'kategori': 'Laptop'})
+        assert anahtar != jobs.is_anahtari('excel', {'kategori': 'Monitör'})
+        assert anahtar != jobs.is_anahtari('pdf', {'kategori': 'Laptop'})
+    ekipman_ekle()
+    with app.app_context():
+        assert anahtar != jobs.is_anahtari('excel', {'kategori': 'Laptop'})
+
+
+def test_boyut_siniri_en_eski_kullanilani_siler(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'EXPORT_CACHE_MAX_MB', 1)
+    dizin = jobs.onbellek_dizini(app)
+    simdi = time.time()
+    yollar = []
+    for i in range(3):
+        yol = os.path.join(dizin, f'excel-{i:032x}.xlsx')
+        with open(yol, 'wb') as f:
+            f.write(b'x' * 400 * 1024)
+        os.utime(yol, (simdi - 30 + i * 10, simdi - 30 + i * 10))
+        yollar.append(yol)
+    # En eski dosya yeniden kullanılınca LRU sırasında sona geçer
+    assert jobs._onbellekte_mi(yollar[0])
+
+    jobs.onbellegi_buda(app)
+    assert [os.path.exists(y) for y in yollar] == [True, False, True]
+
+
+
+@pytest.fixture
+def isler(app, monkeypatch):
+    monkeypatch.setattr(jobs, '_isler', jobs.OrderedDict())
+
+    def ekle(no, durum, once_sn=0):
+        isi = jobs.ExportIsi(f'pdf-{no:032x}', 'pdf', jobs._dosya_yolu(app, f'pdf-{no:032x}'))
+        isi.durum = durum
+        if isi.bitti_mi():
+            isi.bitis = time.monotonic() - once_sn
+        jobs._isler[isi.id] = isi
+        return isi
+    return ekle
+
+
+def test_suresi_dolan_hatali_is_atilir(app, client, isler):
+    eski = isler(1, 'hata', once_sn=jobs.IS_SAKLAMA_SN + 1)
+    yeni = isler(2, 'hata')
+    calisan = isler(3, 'calisiyor')
+    with open(jobs._ilerleme_dosyasi(eski.dosya_yolu), 'w') as f:
+        f.write('0.5')
+
+    # Atılmamış hatalı iş durum ucundan sorgulanabilir
+    yanit = client.get(f'/api/export/jobs/{yeni.id}')
+    assert yanit.get_json()['durum'] == 'hata'
+    assert list(jobs._isler) == [calisan.id, yeni.id]
+    assert not os.path.exists(jobs._ilerleme_dosyasi(eski.dosya_yolu))
+    assert client.get(f'/api/export/jobs/{eski.id}').status_code == 404
+
+
+def test_adet_siniri_en_eski_kullanilandan_atar(app, isler, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAKS_IS', 3)
+    calisan = isler(1, 'calisiyor')
+    ilk, ikinci = isler(2, 'hata'), isler(3, 'hata')
+    # Kullanılan kayıt sona taşınır
+    assert jobs.is_getir(app, ilk.id) is ilk
+    son = isler(4, 'hata')
+    assert jobs.is_getir(app, son.id) is son
+    assert list(jobs._isler) == [calisan.id, ilk.id, son.id]
+    assert ikinci.id not in jobs._isler
+
+
+def test_calisan_isler_siniri_asabilir(app, isler, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAKS_IS', 1)
+    calisanlar = [isler(i, 'calisiyor') for i in range(3)]
+    with jobs._kilit:
+        jobs._isleri_buda()
+    assert list(jobs._isler) == [i.id for i in calisanlar]
+
+
+def test_isci_arama_filtresiyle_uretir(app, ekipman_ekle, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, '_isci_app', None)
+    ekipman_ekle(marka='Işıklı')
+    ekipman_ekle(marka='Dell')
+    with app.app_context():
+        config = jobs._isci_config(app)
+    hedef = str(tmp_path / 'arama.xlsx')
+    # İşçinin kendi uygulaması da arama indeksi durumunu taşır
+    jobs._isci_calistir('excel', {'arama': 'isik'}, hedef, config)
+
+    from openpyxl import load_workbook
+    satirlar = list(load_workbook(hedef).active.iter_rows(values_only=True))
+    assert [s for s in satirlar if 'Işıklı' in s] and not [s for s in satirlar if 'Dell' in s]
@@ -0,0 +1,95 @@
+"""Hareket durum makinesi: geçersiz geçişlerde 409, toplu çıkışta hepsi ya da hiçbiri, Idempotency-Key"""
+import pytest
+
+import idempotency
+
+
+def _durum(client, id):
+    return client.get(f'/api/ekipman/{id}').get_json()['durum']
+
+
+def test_gecisler_ve_409(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    assert hareket_ekle(id, 'İade').status_code == 409
+    assert hareket_ekle(id, 'Transfer').status_code == 409
+    assert _durum(client, id) == 'Depoda'
+
+    assert hareket_ekle(id, 'Çıkış', birim='Hukuk').status_code == 201
+    yanit = hareket_ekle(id, 'Çıkış')
+    assert yanit.status_code == 409
+    assert yanit.get_json()['uygunsuz'] == [{'ekipman_id': id, 'durum': 'Kullanımda'}]
+
+    for tip, durum in (('Transfer', 'Kullanımda'), ('Arıza', 'Arızalı'),
+                       ('Giriş', 'Depoda'), ('Hurda', 'Hurda')):
+        assert hareket_ekle(id, tip).status_code == 201, tip
+        assert _durum(client, id) == durum
+    # Hurda son durumdur
+    assert hareket_ekle(id, 'Giriş').status_code == 409
+    # Reddedilen hareketler kaydedilmez
+    assert len(client.get(f'/api/hareket?ekipman_id={id}').get_json()) == 5
+
+
+def test_gecersiz_istekler(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    assert hareket_ekle(id, 'Kayıp').status_code == 400
+    assert hareket_ekle(9999, 'Çıkış').status_code == 404
+    assert client.post('/api/hareket', json={'ekipman_id': id}).status_code == 400
+
+
+def test_toplu_cikis_hepsi_ya_da_hicbiri(client, ekipman_ekle, hareket_ekle):
+    a, b, c = ekipman_ekle(), ekipman_ekle(), ekipman_ekle()
+    hareket_ekle(c, 'Arıza')
+    yanit = client.post('/api/hareket/toplu-cikis', json={'ekipman_idler': [a, b, c]})
+    assert yanit.status_code == 409
+    assert yanit.get_json()['uygunsuz'] == [{'ekipman_id': c, 'durum': 'Arızalı'}]
+    assert [_durum(client, i) for i in (a, b)] == ['Depoda', 'Depoda']
+    assert client.get('/api/hareket').get_json()[0]['hareket_tipi'] == 'Arıza'
+
+    yanit = client.post('/api/hareket/toplu-cikis', json={'ekipman_idler': [a, b], 'birim': 'Hukuk'})
+    assert yanit.status_code == 201
+    assert yanit.get_json()['adet'] == 2
+    assert [_durum(client, i) for i in (a, b)] == ['Kullanımda', 'Kullanımda']
+
+
+def test_idempotency_key_tekrari(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    baslik = {'Idempotency-Key': 'cikis-1'}
+    ilk = hareket_ekle(id, 'Çıkış', headers=baslik, birim='Hukuk')
+    assert ilk.status_code == 201
+    assert 'Idempotent-Replayed' not in ilk.headers
+
+    # Aynı istek yeniden işlenmez: saklanan yanıt döner, 409 değil
+    tekrar = hareket_ekle(id, 'Çıkış', headers=baslik, birim='Hukuk')
+    assert tekrar.status_code == 201
+    assert tekrar.headers['Idempotent-Replayed'] == 'true'
+    assert tekrar.get_json() == ilk.get_json()
+    assert len(client.get(f'/api/hareket?ekipman_id={id}').get_json()) == 1
+
+    # Aynı anahtar farklı gövdeyle kullanılamaz
+    assert hareket_ekle(id, 'İade', headers=baslik).status_code == 422
+
+
+def test_yanit_kaydedilmeden_kesilen_istek_tekrarlanabilir(client, ekipman_ekle, hareket_ekle,
+                                                          monkeypatch):
+    id = ekipman_ekle()
+    baslik = {'Idempotency-Key': 'cikis-2'}
+    # Görünüm döndükten sonra, yanıt saklanmadan süreç ölmüş gibi
+    with monkeypatch.context() as m:
+        m.setattr(idempotency, 'make_response', lambda yanit: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            hareket_ekle(id, 'Çıkış', headers=baslik, birim='Hukuk')
+    # Hareket ve anahtar birlikte geri alındı: tekrar 409 değil, ilk kez işlenir
+    assert _durum(client, id) == 'Depoda'
+    yanit = hareket_ekle(id, 'Çıkış', headers=baslik, birim='Hukuk')
+    assert yanit.status_code == 201
+    assert 'Idempotent-Replayed' not in yanit.headers
+    assert len(client.get(f'/api/hareket?ekipman_id={id}').get_json()) == 1
+
+
+def test_basarisiz_istegin_anahtari_saklanmaz(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    baslik = {'Idempotency-Key': 'iade-1'}
+    assert hareket_ekle(id, 'İade', headers=baslik).status_code == 409
+    hareket_ekle(id, 'Çıkış')
+    # Durum uygun hale gelince aynı anahtarla tekrar denenebilir
+    assert hareket_ekle(id, 'İade', headers=baslik).status_code == 201
@@ -0,0 +1,55 @@
+"""Keyset sayfalama, X-Total-Count ve alan projeksiyonu (/api/ekipman, /api/hareket)"""
+
+
+def _tum_sayfalar(client, yol):
+    idler, sayfa, imlec = [], 0, None
+    while True:
+        yanit = client.get(yol + (f'&cursor={imlec}' if imlec else ''))
+        assert yanit.status_code == 200
+        idler += [s['id'] for s in yanit.get_json()]
+        toplam = int(yanit.headers['X-Total-Count'])
+        imlec = yanit.headers.get('X-Next-Cursor')
+        sayfa += 1
+        if not imlec:
+            return idler, toplam, sayfa
+
+
+def test_imlec_tum_kayitlari_bir_kez_dolasir(client, ekipman_ekle):
+    # Aynı saniyede eklenenler: sıralama eşitliği id ile bozulur
+    eklenen = [ekipman_ekle(barkod=f'BK{i}') for i in range(7)]
+    idler, toplam, sayfa = _tum_sayfalar(client, '/api/ekipman?limit=3')
+    assert idler == sorted(eklenen, reverse=True)
+    assert toplam == 7
+    assert sayfa == 3
+
+
+def test_toplam_filtreyi_izler(client, ekipman_ekle):
+    for i in range(4):
+        ekipman_ekle(kategori='Monitör' if i % 2 else 'Laptop')
+    yanit = client.get('/api/ekipman?kategori=Monitör&limit=1')
+    assert yanit.headers['X-Total-Count'] == '2'
+    assert len(yanit.get_json()) == 1
+    assert 'X-Next-Cursor' in yanit.headers
+
+
+def test_hareket_listesi_sayfalanir(client, ekipman_ekle, hareket_ekle):
+    id = ekipman_ekle()
+    for tip in ('Çıkış', 'İade', 'Çıkış', 'İade'):
+        assert hareket_ekle(id, tip).status_code == 201
+    idler, toplam, _ = _tum_sayfalar(client, f'/api/hareket?ekipman_id={id}&limit=3')
+    assert toplam == 4
+    assert len(set(idler)) == 4
+
+
+def test_alan_secimi(client, ekipman_ekle):
+    ekipman_ekle(barkod='BK1')
+    satir, = client.get('/api/ekipman?fields=id,barkod').get_json()
+    assert set(satir) == {'id', 'barkod'}
+    assert satir['barkod'] == 'BK1'
+
+
+def test_gecersiz_parametreler_400(client):
+    for sorgu in ('cursor=bozuk!', 'limit=0', 'limit=abc', 'fields=id,yok'):
+        yanit = client.get(f'/api/ekipman?{sorgu}')
+        assert yanit.status_code == 400, sorgu
+        assert yanit.get_json()['success'] is False
@@ -0,0 +1,93 @@
+"""Barkod tarama: bellek içi kod indeksinin güncel kalması ve stok sayımı fark raporu"""
+from sqlalchemy import insert
+
+from models import db, Ekipman
+import events
+import scanner
+
+
+def _coz(client, *kodlar):
+    yanit = client.get('/api/tara', query_string=[('kod', k) for k in kodlar])
+    assert yanit.status_code == 200
+    return {s['kod']: s['ekipman_id'] for s in yanit.get_json()['sonuclar']}
+
+
+def test_indeks_put_ve_silme_sonrasi_guncel(client, ekipman_ekle):
+    id = ekipman_ekle(barkod='ESKI', seri_no='SN-1')
+    assert _coz(client, 'ESKI', 'SN-1') == {'ESKI': id, 'SN-1': id}
+
+    assert client.put(f'/api/ekipman/{id}', json={'barkod': 'YENI'}).status_code == 200
+    assert _coz(client, 'ESKI', 'YENI', 'SN-1') == {'ESKI': None, 'YENI': id, 'SN-1': id}
+
+    client.delete(f'/api/ekipman/{id}')
+    assert _coz(client, 'YENI', 'SN-1') == {'YENI': None, 'SN-1': None}
+
+
+def test_baska_iscinin_ve_toplu_aktarimin_kodlari(app, client, ekipman_ekle, monkeypatch):
+    monkeypatch.setattr(scanner, 'KONTROL_ARALIGI', 0)
+    ekipman_ekle(barkod='ILK')
+    _coz(client, 'ILK')
+    yukleme = app.extensions['tarama'].yukleme
+
+    # Başka bir işçi: Core ekleme + aynı transaction'da olay (bu sürecin commit dinleyicisi çalışmaz)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            id = connection.execute(insert(Ekipman).returning(Ekipman.id),
+                                    [{'kategori': 'Laptop', 'barkod': 'DIS', 'durum': 'Depoda'}]
+                                    ).scalar_one()
+            events.olaylari_yaz(connection, [
+                {'varlik': 'ekipman', 'id': id, 'islem': 'eklendi', 'alanlar': {'barkod': 'DIS'}}
+            ])
+    assert _coz(client, 'DIS') == {'DIS': id}
+
+    client.post('/api/ekipman/toplu', json=[{'kategori': 'Laptop', 'barkod': f'T{i}'} for i in range(3)])
+    assert None not in _coz(client, 'T0', 'T1', 'T2').values()
+    # Hepsi artımlı uygulandı: baştan yükleme yok
+    assert app.extensions['tarama'].yukleme == yukleme
+
+
+def test_budanan_gunlukte_bosluk_indeksi_yeniden_yukler(app, client, ekipman_ekle, monkeypatch):
+    monkeypatch.setattr(scanner, 'KONTROL_ARALIGI', 0)
+    monkeypatch.setattr(app.extensions['olaylar'], 'budama_araligi', 3600)
+    _coz(client, 'X')
+    yukleme = app.extensions['tarama'].yukleme
+    ids = [ekipman_ekle(barkod=f'B{i}') for i in range(3)]
+    with app.app_context():
+        app.extensions['olaylar'].arka_uc.buda(1)
+    assert _coz(client, 'B0', 'B2') == {'B0': ids[0], 'B2': ids[2]}
+    assert app.extensions['tarama'].yukleme == yukleme + 1
+
+
+def test_detay_ve_gecersiz_istekler(client, ekipman_ekle):
+    ekipman_ekle(barkod='D1', marka='HP')
+    yanit = client.post('/api/tara?detay=1', json={'kodlar': [' D1\n', 'YOK']}).get_json()
+    assert (yanit['bulunan'], yanit['bulunamayan']) == (1, 1)
+    assert yanit['sonuclar'][0]['ekipman']['marka'] == 'HP'
+    assert yanit['sonuclar'][0]['eslesme'] == 'barkod'
+    assert yanit['sonuclar'][1]['ekipman'] is None
+    assert client.get('/api/tara').status_code == 400
+    assert client.post('/api/tara', json={'kodlar': 5}).status_code == 400
+
+
+def test_sayim_fark_raporu(client, ekipman_ekle, hareket_ekle):
+    a = ekipman_ekle(barkod='A')
+    b = ekipman_ekle(barkod='B')
+    c = ekipman_ekle(barkod='C')
+    ekipman_ekle(barkod='M', kategori='Monitör')
+    hareket_ekle(c, 'Çıkış')
+
+    oturum = client.post('/api/tara/sayim', json={'kategori': 'Laptop'}).get_json()['data']['id']
+    yanit = client.post(f'/api/tara/sayim/{oturum}/okuma', json={'kodlar': ['A', 'C', 'A', 'XYZ']})
+    assert yanit.status_code == 201
+    assert [s['ekipman_id'] for s in yanit.get_json()['sonuclar']] == [a, c, a, None]
+
+    rapor = client.post(f'/api/tara/sayim/{oturum}/kapat').get_json()['rapor']
+    assert (rapor['okuma'], rapor['beklenen'], rapor['eslesen']) == (4, 2, 1)
+    assert [e['ekipman_id'] for e in rapor['eksik']] == [b]
+    assert [(e['ekipman_id'], e['durum']) for e in rapor['beklenmeyen']] == [(c, 'Kullanımda')]
+    assert rapor['tekrar'] == [{'ekipman_id': a, 'barkod': 'A', 'seri_no': None, 'adet': 2}]
+    assert rapor['bilinmeyen'] == [{'kod': 'XYZ', 'adet': 1}]
+
+    # Kapalı oturuma okuma eklenmez
+    assert client.post(f'/api/tara/sayim/{oturum}/okuma', json={'kodlar': ['B']}).status_code == 409
+    assert client.get(f'/api/tara/sayim/{oturum}').get_json()['rapor'] == rapor
@@ -0,0 +1,51 @@
+"""FTS5 araması: Türkçe harf katlama, önek eşleşmesi ve indeksin yazımlarla güncel kalması"""
+import pytest
+
+import search
+
+
+@pytest.mark.parametrize('girdi', ['İSTANBUL', 'istanbul', 'ıstanbul', 'Istanbul', 'İstanbul'])
+def test_tr_fold_buyuk_kucuk_harf(girdi):
+    assert search.tr_fold(girdi) == 'istanbul'
+
+
+def test_tr_fold_aksanlar():
+    assert search.tr_fold('ŞĞÇÖÜ şğçöü âîû') == 'sgcou sgcou aiu'
+    assert search.tr_fold(None) == ''
+
+
+def _ara(client, terim):
+    yanit = client.get('/api/ekipman/ara', query_string={'q': terim})
+    assert yanit.status_code == 200
+    veri = yanit.get_json()
+    return veri['eslesme'], [e['id'] for e in veri['sonuclar']]
+
+
+def test_turkce_katlamali_onek_arama(client, ekipman_ekle):
+    id = ekipman_ekle(marka='IŞIKLI', model='Görüntü 24')
+    diger = ekipman_ekle(marka='Dell', model='Latitude')
+    for terim in ('ışıklı', 'isik', 'IŞI', 'goruntu', 'GÖRÜN'):
+        assert _ara(client, terim) == ('fts', [id]), terim
+    assert _ara(client, 'latit') == ('fts', [diger])
+    # Liste ucundaki ?arama= aynı indeksi kullanır
+    liste = client.get('/api/ekipman', query_string={'arama': 'Işık'}).get_json()
+    assert [e['id'] for e in liste] == [id]
+
+
+def test_barkod_tam_eslesme_once_gelir(client, ekipman_ekle):
+    id = ekipman_ekle(barkod='GS-0042', seri_no='SN42')
+    assert _ara(client, 'GS-0042') == ('tam', [id])
+    assert _ara(client, 'SN42') == ('tam', [id])
+
+
+def test_indeks_guncelleme_ve_silme_ile_esitlenir(client, ekipman_ekle):
+    id = ekipman_ekle(marka='Lenovo')
+    assert client.put(f'/api/ekipman/{id}', json={'marka': 'Çınar'}).status_code == 200
+    assert _ara(client, 'lenovo') == ('fts', [])
+    assert _ara(client, 'cinar') == ('fts', [id])
+    assert client.delete(f'/api/ekipman/{id}').status_code == 200
+    assert _ara(client, 'cinar') == ('fts', [])
+
+
+def test_bos_terim_400(client):
+    assert client.get('/api/ekipman/ara?q=%20').status_code == 400
@@ -0,0 +1,45 @@
+"""Hızlı JSON kodlama: orjson kurulu olsun olmasın jsonify ile bayt bayt aynı çıktı"""
+import json
+from datetime import datetime
+
+import pytest
+
+import serialization
+
+ORNEKLER = [
+    {'ad': 'Işık Ölçer', 'not': 'çğıöşü İĞ', 'sil': '\x7f', 'emoji': '🖥'},
+    {'b': 1, 'a': [0.1, 2.5, 1e16, 1e-05, 123456789.125], 'c': None, 'd': True},
+    {'buyuk': 2 ** 70, 'negatif': -(2 ** 63)},
+    [{'tarih': serialization._tarih(datetime(2024, 2, 29, 13, 5, 7, 120))}],
+]
+
+
+def _jsonify_govdesi(app, veri):
+    with app.test_request_context():
+        return app.json.response(veri).get_data()
+
+
+@pytest.fixture(params=['stdlib', 'orjson'])
+def kodlayici(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(serialization, 'orjson', None)
+    elif serialization.orjson is None:
+        pytest.skip('orjson kurulu değil')
+    return request.param
+
+
+@pytest.mark.parametrize('veri', ORNEKLER)
+def test_jsonify_ile_ayni(app, kodlayici, veri):
+    if isinstance(veri, dict) and 'a' in veri:
+        veri = {**veri, 'a': [serialization._float(f) for f in veri['a']]}
+    assert serialization.dumps(veri) + b'\n' == _jsonify_govdesi(app, veri)
+
+
+def test_liste_ve_ndjson_ayni_kayitlar(client, ekipman_ekle, kodlayici):
+    for i in range(3):
+        ekipman_ekle(marka='Çağ Bilişim', temin_fiyati=1e-05 * i, barkod=f'S{i}')
+    liste = client.get('/api/ekipman')
+    assert liste.data.endswith(b'\n') and liste.data.isascii()
+    ndjson = client.get('/api/ekipman?format=ndjson')
+    assert ndjson.mimetype == serialization.NDJSON_MIMETYPE
+    assert [json.loads(s) for s in ndjson.data.splitlines()] == liste.get_json()
@@ -0,0 +1,66 @@
+"""Varlık değerleme: NumPy ve saf Python motorlarının aynı sonucu vermesi, NumPy'sız yedek"""
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import valuation
+
+SORGULAR = ('grupla=kategori,durum&tarih=2026-01-01',
+            'grupla=birim&yontem=azalan&omur=4&kalinti=0.1&tarih=2026-01-01',
+            'grupla=kategori&durum=Depoda&kovalar=1,3&tahmin_yil=3&tarih=2026-01-01')
+
+
+def _parametreler(sorgu):
+    return valuation.parametreleri_oku(MultiDict(kv.split('=', 1) for kv in sorgu.split('&')))
+
+
+@pytest.fixture
+def envanter(ekipman_ekle, hareket_ekle):
+    idler = [
+        ekipman_ekle(temin_fiyati=30000, temin_tarihi='2021-03-01'),
+        ekipman_ekle(temin_fiyati=12000, temin_tarihi='2024-06-15'),
+        ekipman_ekle(kategori='Monitör', temin_fiyati=5000, temin_tarihi='2019-01-10'),
+        ekipman_ekle(kategori='Monitör'),  # fiyatı / tarihi bilinmiyor
+    ]
+    hareket_ekle(idler[0], 'Çıkış', birim='Hukuk')
+    hareket_ekle(idler[2], 'Arıza')
+    return idler
+
+
+def test_numpy_ve_python_motorlari_ayni(app, envanter):
+    pytest.importorskip('numpy')
+    with app.app_context():
+        anlik = valuation.AnlikGoruntu(0).yukle()
+    assert anlik.adet == 4
+    for sorgu in SORGULAR:
+        p = _parametreler(sorgu)
+        vektorel = valuation.hesapla(anlik, p, 'numpy')
+        yedek = valuation.hesapla(anlik, p, 'python')
+        assert vektorel['gruplar']
+        assert _yaklasik(vektorel, yedek), sorgu
+
+
+def _yaklasik(a, b):
+    # Toplama sırası farklı: ondalıklar yaklaşık karşılaştırılır, motor adı hariç
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_yaklasik(a[k], b[k]) for k in a if k != 'motor')
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_yaklasik(x, y) for x, y in zip(a, b))
+    if isinstance(a, float):
+        return a == pytest.approx(b)
+    return a == b
+
+
+def test_numpy_yoksa_saf_python_yedegi(app, client, envanter, monkeypatch):
+    monkeypatch.setattr(valuation, '_numpy_modulu', None)
+    assert valuation.numpy_modulu() is None
+    with app.app_context():
+        anlik = valuation.AnlikGoruntu(0).yukle()
+    assert isinstance(anlik.fiyat, list) and anlik.adet == 4
+
+    sonuc = valuation.hesapla(anlik, _parametreler(SORGULAR[0]))
+    assert sonuc['motor'] == 'python'
+    assert sonuc['toplam']['adet'] == 4
+
+    yanit = client.get('/api/raporlar/varlik?grupla=kategori&tarih=2026-01-01')
+    assert yanit.status_code == 200
+    assert yanit.get_json()['motor'] == 'python'
@@ -0,0 +1,449 @@
+"""
+Varlık değerleme ve yaş raporu (/api/raporlar/varlik). temin_fiyati,
+temin_tarihi, durum, kategori ve güncel zimmet birimi tek sorguda
+sütunsal bir anlık görüntüye (NumPy dizileri) okunur. Amortisman (doğrusal
+veya azalan bakiyeler), yaş dağılımı ve yenileme tahmini bu diziler
+üzerinde vektörel hesaplanır.
+
+Anlık görüntü ve hesaplanan raporlar veri sürümüne (olay günlüğündeki son
+sıra) bağlı önbellekte tutulur: veri değişmedikçe aynı rapor tekrar
+hesaplanmaz, değiştiğinde görüntü bir kez yeniden okunur. Önbellek
+uygulama başınadır (app.extensions['degerleme']).
+
+NumPy kurulu değilse aynı hesap saf Python ile yapılır; sonuçlar aynıdır.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from models import db, Ekipman, EkipmanZimmet
+import events
+import metrics
+
+logger = logging.getLogger(__name__)
+
+BOYUTLAR = ('kategori', 'durum', 'birim')
+YONTEMLER = ('dogrusal', 'azalan')
+# Defter değeri sıfır sayılan, yenileme tahminine girmeyen durumlar
+DEFTER_DISI_DURUMLAR = ('Hurda',)
+YIL_GUN = 365.25
+VARSAYILAN_KOVALAR = (1, 2, 3, 5, 8)
+YUKLEME_PARCASI = 50000
+# Boyut kodlarının çarpımı bunu aşmazsa gruplama np.unique yerine bincount ile
+YOGUN_GRUP_SINIRI = 1 << 20
+# Bellekte tutulan en fazla hesaplanmış rapor (parametre kombinasyonu)
+MAKS_SONUC = 64
+_EPOCH = date(1970, 1, 1)
+_YOK = object()
+_numpy_modulu = _YOK
+
+Parametreler = namedtuple('Parametreler',
+                          'yontem omur kalinti oran tarih grupla filtreler kovalar tahmin_yil')
+
+
+class DegerlemeHatasi(ValueError):
+    """Geçersiz rapor parametresi"""
+
+
+# --- Parametreler ---
+
+def _sayi(args, ad, varsayilan, en_az, en_cok, alt_dahil=True):
+    deger = args.get(ad)
+    if deger in (None, ''):
+        return varsayilan
+    try:
+        sayi = float(deger)
+    except ValueError:
+        raise DegerlemeHatasi(f'{ad} bir sayı olmalı.')
+    if not (en_az <= sayi if alt_dahil else en_az < sayi) or sayi > en_cok or math.isnan(sayi):
+        raise DegerlemeHatasi(f'{ad} {en_az} ile {en_cok} arasında olmalı.')
+    return sayi
+
+
+def parametreleri_oku(args):
+    """Sorgu parametrelerini doğrula; önbellek anahtarı olarak da kullanılır"""
+    yontem = args.get('yontem') or 'dogrusal'
+    if yontem not in YONTEMLER:
+        raise DegerlemeHatasi(f'yontem şunlardan biri olmalı: {", ".join(YONTEMLER)}')
+    omur = _sayi(args, 'omur', 5.0, 0, 100, alt_dahil=False)
+    kalinti = _sayi(args, 'kalinti', 0.0, 0, 1)
+    # Azalan bakiyeler oranı; varsayılan çift azalan (2 / ömür)
+    oran = None
+    if yontem == 'azalan':
+        oran = _sayi(args, 'oran', min(2 / omur, 1.0), 0, 1, alt_dahil=False)
+
+    try:
+        tarih = date.fromisoformat(args['tarih']) if args.get('tarih') else datetime.utcnow().date()
+    except ValueError:
+        raise DegerlemeHatasi('tarih YYYY-AA-GG biçiminde olmalı.')
+
+    grupla = [g.strip() for g in args.get('grupla', 'kategori').split(',') if g.strip()]
+    bilinmeyen = [g for g in grupla if g not in BOYUTLAR]
+    if bilinmeyen:
+        raise DegerlemeHatasi(f'Bilinmeyen grup(lar): {", ".join(bilinmeyen)}. '
+                              f'Geçerli gruplar: {", ".join(BOYUTLAR)}')
+
+    try:
+        kovalar = tuple(float(k) for k in args['kovalar'].split(',') if k.strip()) \
+            if args.get('kovalar') else VARSAYILAN_KOVALAR
+    except ValueError:
+        raise DegerlemeHatasi('kovalar virgülle ayrılmış sayılar olmalı.')
+    if not kovalar or any(k <= 0 for k in kovalar) or list(kovalar) != sorted(set(kovalar)):
+        raise DegerlemeHatasi('kovalar pozitif ve artan sırada olmalı.')
+
+    tahmin_yil = int(_sayi(args, 'tahmin_yil', 5, 1, 30))
+    # birim='' : zimmeti olmayanlar
+    filtreler = tuple((ad, args[ad]) for ad in BOYUTLAR if ad in args)
+    return Parametreler(yontem, omur, kalinti, oran, tarih, tuple(dict.fromkeys(grupla)),
+                        filtreler, kovalar, tahmin_yil)
+
+
+def kova_etiketleri(kovalar):
+    sinirlar = (0,) + kovalar
+    etiketler = [f'{a:g}-{b:g}' for a, b in zip(sinirlar, sinirlar[1:])]
+    return etiketler + [f'{kovalar[-1]:g}+']
+
+
+# --- Anlık görüntü ---
+
+def _gun_ifadesi(connection, kolon):
+    """Tarih kolonunu 1970-01-01'den beri (ondalıklı) gün olarak seç"""
+    if connection.dialect.name == 'postgresql':
+        return db.extract('epoch', kolon) / 86400.0
+    return db.func.julianday(kolon) - 2440587.5
+
+
+class _Sozluk(dict):
+    """Değer -> kod; ilk kez görülen değer sıradaki kodu alır"""
+
+    def __missing__(self, deger):
+        kod = self[deger] = len(self)
+        return kod
+
+
+def numpy_modulu():
+    """NumPy'ı ilk kullanımda içe aktar; kurulu değilse None (opsiyonel bağımlılık)"""
+    global _numpy_modulu
+    if _numpy_modulu is _YOK:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_modulu = numpy
+    return _numpy_modulu
+
+
+class AnlikGoruntu:
+    """Değerleme kolonlarının sütunsal kopyası; boyutlar sözlük kodlu"""
+
+    def __init__(self, surum):
+        self.surum = surum
+        self.fiyat = []  # None / NaN: fiyatı bilinmiyor
+        self.gun = []    # 1970'ten beri gün; None / NaN: tarihi bilinmiyor
+        self.kodlar = {ad: [] for ad in BOYUTLAR}
+        self.sozluk = {ad: _Sozluk() for ad in BOYUTLAR}  # ad -> kod ('' = boş)
+
+    @property
+    def adet(self):
+        return len(self.fiyat)
+
+    def adlar(self, boyut):
+        return list(self.sozluk[boyut])
+
+    def yukle(self):
+        numpy = numpy_modulu()
+        parcalar = []
+        with db.engine.connect() as connection:
+            # Boş boyutlar SQL'de '' yapılır: kodlama satır başına tek sözlük erişimi
+            sorgu = db.select(
+                Ekipman.temin_fiyati, _gun_ifadesi(connection, Ekipman.temin_tarihi),
+                *(db.func.coalesce(kolon, '') for kolon in (
+                    Ekipman.kategori, Ekipman.durum, EkipmanZimmet.birim)),
+            ).select_from(Ekipman).outerjoin(EkipmanZimmet, EkipmanZimmet.ekipman_id == Ekipman.id)
+            sonuc = connection.execution_options(yield_per=YUKLEME_PARCASI).execute(sorgu)
+            for parca in sonuc.partitions():
+                fiyat, gun, *boyutlar = zip(*parca)
+                kodlar = [map(self.sozluk[ad].__getitem__, degerler)
+                          for ad, degerler in zip(BOYUTLAR, boyutlar)]
+                if numpy is not None:
+                    # Parça parça diziye çevrilir: 1M satırlık ara Python listesi tutulmaz
+                    parcalar.append((numpy.array(fiyat, dtype=numpy.float64),
+                                     numpy.array(gun, dtype=numpy.float64),
+                                     *(numpy.fromiter(k, numpy.int32, len(fiyat)) for k in kodlar)))
+                else:
+                    self.fiyat.extend(fiyat)
+                    self.gun.extend(gun)
+                    for ad, k in zip(BOYUTLAR, kodlar):
+                        self.kodlar[ad].extend(k)
+        if numpy is not None:
+            sutunlar = list(zip(*parcalar)) if parcalar else [()] * (2 + len(BOYUTLAR))
+            self.fiyat = _birlestir(sutunlar[0], numpy.float64)
+            self.gun = _birlestir(sutunlar[1], numpy.float64)
+            for ad, diziler in zip(BOYUTLAR, sutunlar[2:]):
+                self.kodlar[ad] = _birlestir(diziler, numpy.int32)
+        return self
+
+
+def _birlestir(diziler, tip):
+    numpy = numpy_modulu()
+    return numpy.concatenate(diziler) if diziler else numpy.empty(0, dtype=tip)
+
+
+# --- Hesaplama ---
+
+def _referans_gunu(p):
+    return float((p.tarih - _EPOCH).days)
+
+
+def _secici(maske):
+    # Maske her satırı seçiyorsa kopyalamadan aynı dizi kullanılır
+    if maske.all():
+        return lambda dizi: dizi
+    return lambda dizi: dizi[maske]
+
+
+def _hesapla_numpy(anlik, p):
+    """Vektörel hesap: grup başına toplamlar bincount ile"""
+    np = numpy_modulu()
+    secili = np.ones(anlik.adet, dtype=bool)
+    for ad, deger in p.filtreler:
+        kod = anlik.sozluk[ad].get(deger)
+        secili &= (anlik.kodlar[ad] == kod) if kod is not None else False
+    sec = _secici(secili)
+
+    fiyat = sec(anlik.fiyat)
+    gun = sec(anlik.gun)
+    durum = sec(anlik.kodlar['durum'])
+    if p.grupla:
+        sekil = [len(anlik.sozluk[g]) for g in p.grupla]
+        birlesik = np.ravel_multi_index([sec(anlik.kodlar[g]) for g in p.grupla], sekil)
+        if math.prod(sekil) <= YOGUN_GRUP_SINIRI:
+            # Sıralamasız gruplama: olası tüm kombinasyonlar sayılır, boş olanlar atılır
+            gruplar = np.flatnonzero(np.bincount(birlesik, minlength=math.prod(sekil)))
+            konum = np.zeros(math.prod(sekil), dtype=np.intp)
+            konum[gruplar] = np.arange(len(gruplar))
+            grup = konum[birlesik]
+        else:
+            gruplar, grup = np.unique(birlesik, return_inverse=True)
+        grup_kodlari = list(zip(*(k.tolist() for k in np.unravel_index(gruplar, sekil))))
+    else:
+        grup = np.zeros(len(fiyat), dtype=np.intp)
+        grup_kodlari = [()] if len(fiyat) else []
+    g_adet = len(grup_kodlari)
+
+    disarida = np.isin(durum, [anlik.sozluk['durum'][d] for d in DEFTER_DISI_DURUMLAR
+                               if d in anlik.sozluk['durum']])
+    sec = _secici(~(np.isnan(fiyat) | np.isnan(gun)))
+    fiyat, gun, disarida, g = sec(fiyat), sec(gun), sec(disarida), sec(grup)
+
+    referans = _referans_gunu(p)
+    yas = np.maximum((referans - gun) / YIL_GUN, 0.0)
+    kalinti = fiyat * p.kalinti
+    if p.yontem == 'dogrusal':
+        defter = fiyat - (fiyat - kalinti) * np.minimum(yas / p.omur, 1.0)
+    else:
+        defter = np.where(yas >= p.omur, kalinti, np.maximum(fiyat * (1 - p.oran) ** yas, kalinti))
+    defter = np.where(disarida, 0.0, defter)
+
+    k_adet = len(p.kovalar) + 1
+    kova = np.searchsorted(np.asarray(p.kovalar), yas, side='right')
+    dagilim = np.bincount(g * k_adet + kova, minlength=g_adet * k_adet).reshape(g_adet, k_adet)
+
+    # Yenileme dönemi: 0 = ömrü dolmuş, i = referans yılından i-1 yıl sonra dolacak
+    bitis = gun + p.omur * YIL_GUN
+    d_adet = p.tahmin_yil + 1
+    yil_baslari = [float((date(p.tarih.year + i, 1, 1) - _EPOCH).days) for i in range(1, d_adet)]
+    donem = np.where(bitis <= referans, 0,
+                     1 + np.searchsorted(np.asarray(yil_baslari), np.floor(bitis), side='right'))
+    planli = ~disarida & (donem < d_adet)
+    yenileme_indeksi = g[planli] * d_adet + donem[planli]
+
+    adet = np.bincount(grup, minlength=g_adet)
+    degerlenen = np.bincount(g, minlength=g_adet)
+    maliyet = np.bincount(g, weights=fiyat, minlength=g_adet)
+    defter_toplam = np.bincount(g, weights=defter, minlength=g_adet)
+    yas_toplam = np.bincount(g, weights=yas, minlength=g_adet)
+    yenileme_adet = np.bincount(yenileme_indeksi, minlength=g_adet * d_adet).reshape(g_adet, d_adet)
+    yenileme_maliyet = np.bincount(yenileme_indeksi, weights=fiyat[planli],
+                                   minlength=g_adet * d_adet).reshape(g_adet, d_adet)
+    return [
+        (grup_kodlari[i], int(adet[i]), int(degerlenen[i]), float(maliyet[i]),
+         float(defter_toplam[i]), float(yas_toplam[i]), dagilim[i].tolist(),
+         yenileme_adet[i].tolist(), yenileme_maliyet[i].tolist())
+        for i in range(g_adet)
+    ]
+
+
+def _bos_mu(deger):
+    return deger is None or deger != deger
+
+
+def _hesapla_python(anlik, p):
+    """NumPy yokken aynı hesap, satır satır"""
+    liste = (lambda d: d) if isinstance(anlik.fiyat, list) else (lambda d: d.tolist())
+    kodlar = {ad: liste(anlik.kodlar[ad]) for ad in BOYUTLAR}
+    istenen = [(kodlar[ad], anlik.sozluk[ad].get(deger)) for ad, deger in p.filtreler]
+    disarida = {anlik.sozluk['durum'][d] for d in DEFTER_DISI_DURUMLAR if d in anlik.sozluk['durum']}
+    grup_kolonlari = [kodlar[g] for g in p.grupla]
+    referans = _referans_gunu(p)
+    k_adet, d_adet = len(p.kovalar) + 1, p.tahmin_yil + 1
+
+    gruplar = {}
+    for i, (fiyat, gun) in enumerate(zip(liste(anlik.fiyat), liste(anlik.gun))):
+        if any(kolon[i] != kod for kolon, kod in istenen):
+            continue
+        anahtar = tuple(kolon[i] for kolon in grup_kolonlari)
+        t = gruplar.get(anahtar)
+        if t is None:
+            t = gruplar[anahtar] = [0, 0, 0.0, 0.0, 0.0, [0] * k_adet, [0] * d_adet, [0.0] * d_adet]
+        t[0] += 1
+        if _bos_mu(fiyat) or _bos_mu(gun):
+            continue
+        hurda = kodlar['durum'][i] in disarida
+        yas = max((referans - gun) / YIL_GUN, 0.0)
+        kalinti = fiyat * p.kalinti
+        if hurda:
+            defter = 0.0
+        elif p.yontem == 'dogrusal':
+            defter = fiyat - (fiyat - kalinti) * min(yas / p.omur, 1.0)
+        else:
+            defter = kalinti if yas >= p.omur else max(fiyat * (1 - p.oran) ** yas, kalinti)
+        t[1] += 1
+        t[2] += fiyat
+        t[3] += defter
+        t[4] += yas
+        t[5][sum(1 for k in p.kovalar if yas >= k)] += 1
+        bitis = gun + p.omur * YIL_GUN
+        donem = 0 if bitis <= referans else \
+            (_EPOCH + timedelta(days=math.floor(bitis))).year - p.tarih.year + 1
+        if not hurda and donem < d_adet:
+            t[6][donem] += 1
+            t[7][donem] += fiyat
+    return [(anahtar, *t[:5], *t[5:]) for anahtar, t in gruplar.items()]
+
+
+def _ozet(adet, degerlenen, maliyet, defter, yas_toplam, dagilim, yenileme_adet, yenileme_maliyet):
+    return {
+        'adet': adet,
+        'degerlenen': degerlenen,
+        'eksik_veri': adet - degerlenen,  # fiyatı veya temin tarihi olmayanlar
+        'maliyet': round(maliyet, 2),
+        'defter_degeri': round(defter, 2),
+        'birikmis_amortisman': round(maliyet - defter, 2),
+        'ortalama_yas': round(yas_toplam / degerlenen, 2) if degerlenen else None,
+        'yas_dagilimi': dagilim,
+        'yenileme_adet': yenileme_adet,
+        'yenileme_maliyet': [round(m, 2) for m in yenileme_maliyet],
+    }
+
+
+def hesapla(anlik, p, motor=None):
+    """Raporu anlık görüntüden hesapla; motor: 'numpy' | 'python' (varsayılan: kuruluysa numpy)"""
+    motor = motor or ('numpy' if numpy_modulu() is not None else 'python')
+    satirlar = (_hesapla_numpy if motor == 'numpy' else _hesapla_python)(anlik, p)
+
+    adlar = {g: anlik.adlar(g) for g in p.grupla}
+    gruplar = []
+    toplam = [0, 0, 0.0, 0.0, 0.0, [0] * (len(p.kovalar) + 1), [0] * (p.tahmin_yil + 1),
+              [0.0] * (p.tahmin_yil + 1)]
+    for kodlar, *degerler in satirlar:
+        grup = {g: adlar[g][k] or None for g, k in zip(p.grupla, kodlar)}
+        gruplar.append((tuple(v or '' for v in grup.values()), {**grup, **_ozet(*degerler)}))
+        for i, deger in enumerate(degerler):
+            toplam[i] = [a + b for a, b in zip(toplam[i], deger)] if isinstance(deger, list) \
+                else toplam[i] + deger
+    return {
+        'parametreler': {
+            'yontem': p.yontem, 'omur': p.omur, 'kalinti': p.kalinti,
+            'oran': p.oran,
+            'tarih': p.tarih.isoformat(), 'grupla': list(p.grupla),
+            'filtreler': dict(p.filtreler),
+        },
+        'yas_kovalari': kova_etiketleri(p.kovalar),
+        'yenileme_donemleri': ['gecikmis'] + [p.tarih.year + i for i in range(p.tahmin_yil)],
+        'gruplar': [g for _, g in sorted(gruplar, key=lambda x: x[0])],
+        'toplam': _ozet(*toplam),
+        'motor': motor,
+    }
+
+
+# --- Önbellek ---
+
+def veri_surumu():
+    """Ekipman / zimmet değişikliklerinin hepsi olay günlüğüne düşer: son sıra yeterli"""
+    return events.son_sira()
+
+
+def rapor_damgasi():
+    # Tarih verilmezse rapor bugüne göre hesaplanır: gün değişince damga da değişir
+    return f'v{veri_surumu()}.{datetime.utcnow().date().isoformat()}', None
+
+
+class DegerlemeOnbellegi:
+    """Tek anlık görüntü + (sürüm, parametreler) anahtarlı LRU sonuç önbelleği"""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._anlik = None
+        self._sonuclar = OrderedDict()
+        self.yukleme = 0
+        self.son_yukleme_sn = 0.0
+        self.isabet = 0
+        self.iskalama = 0
+
+    def anlik(self, surum):
+        """Sürüme ait görüntü; eskiyse yeniden okunur (kilit altında, tek sefer)"""
+        if self._anlik is None or self._anlik.surum != surum:
+            baslangic = time.perf_counter()
+            self._anlik = AnlikGoruntu(surum).yukle()
+            self._sonuclar.clear()
+            self.yukleme += 1
+            self.son_yukleme_sn = time.perf_counter() - baslangic
+            logger.info('Değerleme görüntüsü yüklendi: %d ekipman, %.0f ms',
+                        self._anlik.adet, self.son_yukleme_sn * 1000)
+        return self._anlik
+
+    def rapor(self, p):
+        surum = veri_surumu()
+        anahtar = (surum, p)
+        with self._kilit:
+            sonuc = self._sonuclar.get(anahtar)
+            if sonuc is not None:
+                self._sonuclar.move_to_end(anahtar)
+                self.isabet += 1
+                return sonuc
+            self.iskalama += 1
+            sonuc = {**hesapla(self.anlik(surum), p), 'surum': surum}
+            self._sonuclar[anahtar] = sonuc
+            if len(self._sonuclar) > MAKS_SONUC:
+                self._sonuclar.popitem(last=False)
+            return sonuc
+
+    def boyut(self):
+        return self._anlik.adet if self._anlik is not None else 0
+
+
+def aktif_onbellek():
+    """Geçerli uygulamanın değerleme önbelleği (app context içinde)"""
+    return current_app.extensions['degerleme']
+
+
+def init_app(app):
+    app.extensions['degerleme'] = DegerlemeOnbellegi()
+
+
+@metrics.toplayici_ekle
+def _degerleme_metrikleri():
+    onbellek = aktif_onbellek()
+    yield ('stok_varlik_snapshot_rows', 'gauge',
+           'Değerleme görüntüsündeki ekipman sayısı', [({}, onbellek.boyut())])
+    yield ('stok_varlik_snapshot_loads_total', 'counter',
+           'Değerleme görüntüsünün yeniden okunma sayısı', [({}, onbellek.yukleme)])
+    yield ('stok_varlik_snapshot_load_seconds', 'gauge',
+           'Son görüntü okumasının süresi', [({}, onbellek.son_yukleme_sn)])
+    yield ('stok_varlik_report_cache_total', 'counter', 'Rapor önbelleği erişimleri',
+           [({'sonuc': 'isabet'}, onbellek.isabet), ({'sonuc': 'iskalama'}, onbellek.iskalama)])